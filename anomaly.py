@@ -0,0 +1,149 @@
+"""
+Robot başına çevrimiçi anomali istatistikleri.
+
+Her metrik (sıcaklık, nem, hız, batarya) için üstel ağırlıklı hareketli
+ortalama ve varyans (EWMA), son değer, son değerin z-skoru ve dakikadaki
+değişim hızı tutulur. Her yeni okuma durumu O(1) günceller; geçmiş okumalar
+hiçbir zaman yeniden okunmaz.
+
+Değişim hızı ardışık iki örnekten değil, en az rate_window saniyelik bir
+pencereden ölçülür: pencerenin başındaki değer ve zamanı (çapa) saklanır,
+pencere dolunca eğim hesaplanıp çapa ilerletilir. Böylece sık gelen gürültülü
+örnekler (ör. saniyede bir) hız uyarısı üretmez.
+
+Durum sözlüğünün anahtarları robot_anomaly_state tablosunun sütunlarıdır:
+  <metrik>_mean, <metrik>_var, <metrik>_last, <metrik>_z, <metrik>_rate,
+  <metrik>_anchor, <metrik>_anchor_at   (hız penceresinin başı)
+  reading_count, reading_at   (sıcaklık/nem/hız okumaları)
+  battery_count, battery_at   (batarya değişiklikleri)
+"""
+
+import math
+
+GROUPS = {
+    'reading': ('temperature', 'humidity', 'speed'),
+    'battery': ('battery',),
+}
+METRICS = GROUPS['reading'] + GROUPS['battery']
+STATS = ('mean', 'var', 'last', 'z', 'rate', 'anchor', 'anchor_at')
+RATE_WINDOW_SECONDS = 60
+
+
+def empty_state(robot_id):
+    state = {'robot_id': robot_id}
+    for group in GROUPS:
+        state[f'{group}_count'] = 0
+        state[f'{group}_at'] = None
+    for metric in METRICS:
+        for stat in STATS:
+            state[f'{metric}_{stat}'] = None
+    return state
+
+
+def update(state, group, timestamp, values, alpha, rate_window=RATE_WINDOW_SECONDS):
+    """Bir örneği (zaman, {metrik: değer}) duruma işler"""
+    previous_at = state[f'{group}_at']
+    # Geç gelen (daha eski) örnek ortalamayı etkiler ama son değeri/hızı değiştirmez
+    current = previous_at is None or timestamp >= previous_at
+
+    for metric, value in values.items():
+        if value is None:
+            continue
+        mean = state[f'{metric}_mean']
+        if mean is None:
+            state[f'{metric}_mean'] = value
+            state[f'{metric}_var'] = 0.0
+            state[f'{metric}_last'] = value
+            state[f'{metric}_z'] = 0.0
+            state[f'{metric}_rate'] = 0.0
+            state[f'{metric}_anchor'] = value
+            state[f'{metric}_anchor_at'] = timestamp
+            continue
+
+        variance = state[f'{metric}_var']
+        diff = value - mean
+        increment = alpha * diff
+        state[f'{metric}_mean'] = mean + increment
+        state[f'{metric}_var'] = (1 - alpha) * (variance + diff * increment)
+        if current:
+            # z-skoru güncellemeden önceki dağılıma göre hesaplanır
+            std = math.sqrt(variance)
+            state[f'{metric}_z'] = diff / std if std > 1e-9 else 0.0
+            state[f'{metric}_last'] = value
+            anchor_at = state[f'{metric}_anchor_at']
+            if anchor_at is None:
+                # Çapası olmayan eski durum: pencere buradan başlar
+                state[f'{metric}_anchor'] = value
+                state[f'{metric}_anchor_at'] = timestamp
+                state[f'{metric}_rate'] = 0.0
+                continue
+            elapsed = (timestamp - anchor_at).total_seconds()
+            if elapsed >= rate_window:
+                state[f'{metric}_rate'] = (value - state[f'{metric}_anchor']) / elapsed * 60
+                state[f'{metric}_anchor'] = value
+                state[f'{metric}_anchor_at'] = timestamp
+
+    state[f'{group}_count'] += 1
+    if current:
+        state[f'{group}_at'] = timestamp
+
+
+def evaluate(state, status, battery, thresholds):
+    """Durumdan uyarı listesi üretir (veritabanına gitmez)"""
+    alerts = []
+    for metric in METRICS:
+        mean = state[f'{metric}_mean']
+        if mean is None:
+            continue
+        group = 'battery' if metric == 'battery' else 'reading'
+        z = state[f'{metric}_z'] or 0.0
+        if state[f'{group}_count'] >= thresholds['min_samples'] and abs(z) >= thresholds['z']:
+            alerts.append({
+                'type': 'zscore',
+                'metric': metric,
+                'value': state[f'{metric}_last'],
+                'mean': round(mean, 2),
+                'std': round(math.sqrt(state[f'{metric}_var']), 2),
+                'z': round(z, 2),
+                'severity': 'critical' if abs(z) >= 2 * thresholds['z'] else 'warning'
+            })
+        limit = thresholds['rates'].get(metric)
+        rate = state[f'{metric}_rate'] or 0.0
+        if limit and abs(rate) >= limit:
+            alerts.append({
+                'type': 'rate',
+                'metric': metric,
+                'value': state[f'{metric}_last'],
+                'rate_per_minute': round(rate, 2),
+                'limit': limit,
+                'severity': 'warning'
+            })
+
+    temperature = state['temperature_last']
+    if temperature is not None and temperature >= thresholds['max_temperature']:
+        alerts.append({
+            'type': 'overheating',
+            'metric': 'temperature',
+            'value': temperature,
+            'limit': thresholds['max_temperature'],
+            'severity': 'critical'
+        })
+    speed = state['speed_mean']
+    if (status == 'active' and speed is not None and state['reading_count'] >= thresholds['min_samples']
+            and speed < thresholds['stall_speed']):
+        alerts.append({
+            'type': 'stalled',
+            'metric': 'speed',
+            'value': state['speed_last'],
+            'mean': round(speed, 3),
+            'severity': 'warning'
+        })
+    if battery is not None and battery <= thresholds['low_battery']:
+        alerts.append({
+            'type': 'low_battery',
+            'metric': 'battery',
+            'value': battery,
+            'limit': thresholds['low_battery'],
+            'severity': 'critical' if battery <= thresholds['low_battery'] / 2 else 'warning'
+        })
+    return alerts
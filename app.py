@@ -1,33 +1,246 @@
-from flask import Flask, render_template, request, jsonify, redirect, url_for, flash, send_file
+from flask import Flask, Blueprint, Response, current_app, render_template, request, jsonify, redirect, url_for, flash, send_file
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
 from flask_login import LoginManager, UserMixin, login_user, logout_user, login_required, current_user
 from werkzeug.security import generate_password_hash, check_password_hash
-from datetime import datetime
+from werkzeug.local import LocalProxy
+from datetime import datetime, timedelta, timezone
+from collections import defaultdict, deque
 import random
+import math
 import os
 from dotenv import load_dotenv
-import io
-import xlsxwriter
+import tempfile
+import json
+import hashlib
+import threading
+import time
+import atexit
+import click
+from response_cache import create_cache
+from metrics import RequestMetrics, RowCountingConnection
+from compression import Compression, precompress
+from recent_readings import RecentReadings
+from write_behind import WriteBehindQueue, QueueFull
+from export_jobs import ExportJobs, evict as evict_export_files
+from fleet_simulator import FleetSimulator
+import bulk_import
+import anomaly
+import sketches
 
-load_dotenv()
+db = SQLAlchemy()
+# Uç ve komutlar bu blueprint'e kaydedilir; create_app() onu uygulamaya bağlar
+bp = Blueprint('main', __name__, cli_group=None)
+request_metrics = RequestMetrics()
+compression = Compression()
+login_manager = LoginManager()
+login_manager.login_view = 'main.login'
+login_manager.login_message = 'Bu sayfaya erişmek için giriş yapmalısınız.'
+login_manager.login_message_category = 'warning'
 
-app = Flask(__name__)
+# Worker başına nesneler create_app() içinde kurulur ve app.extensions'ta tutulur
+response_cache = LocalProxy(lambda: current_app.extensions['response_cache'])
+recent_readings = LocalProxy(lambda: current_app.extensions['recent_readings'])
+# Arka plan rapor işleri (aynı rapor + veri sürümü tek iş kimliği paylaşır)
+export_jobs = LocalProxy(lambda: current_app.extensions['export_jobs'])
 
-# Database configuration - Render PostgreSQL için
-DATABASE_URL = os.getenv('DATABASE_URL')
-if DATABASE_URL and DATABASE_URL.startswith('postgres://'):
-    DATABASE_URL = DATABASE_URL.replace('postgres://', 'postgresql://', 1)
+def create_app(config=None):
+    """Uygulamayı kurar. Veritabanına bağlanmaz ve tablo oluşturmaz (flask init-db);
+    gunicorn --preload ile ana süreçte çağrılıp fork edilen worker'larla paylaşılabilir."""
+    load_dotenv()
+    app = Flask(__name__)
 
-app.config['SQLALCHEMY_DATABASE_URI'] = DATABASE_URL or 'sqlite:///instance/robots.db'
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'dev-secret-key-change-in-production')
+    # Database configuration - Render PostgreSQL için
+    database_url = os.getenv('DATABASE_URL')
+    if database_url and database_url.startswith('postgres://'):
+        database_url = database_url.replace('postgres://', 'postgresql://', 1)
 
-db = SQLAlchemy(app)
-login_manager = LoginManager()
-login_manager.init_app(app)
-login_manager.login_view = 'login'
-login_manager.login_message = 'Bu sayfaya erişmek için giriş yapmalısınız.'
-login_manager.login_message_category = 'warning'
+    app.config['SQLALCHEMY_DATABASE_URI'] = database_url or 'sqlite:///instance/robots.db'
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'dev-secret-key-change-in-production')
+    # Toplu yüklemelerde tek INSERT ifadesine giden satır sayısı
+    app.config['INGEST_CHUNK_SIZE'] = int(os.getenv('INGEST_CHUNK_SIZE', 5000))
+    # Geçmiş grafiklerinde hedeflenen nokta sayısı (auto çözünürlük seçimi için)
+    app.config['HISTORY_MIN_POINTS'] = int(os.getenv('HISTORY_MIN_POINTS', 24))
+    app.config['HISTORY_MAX_POINTS'] = int(os.getenv('HISTORY_MAX_POINTS', 2000))
+    # /api/sensors/batch: tek istekte sorgulanabilecek en fazla robot
+    app.config['SENSOR_BATCH_MAX_ROBOTS'] = int(os.getenv('SENSOR_BATCH_MAX_ROBOTS', 500))
+    # Excel çıktılarının veri sürümüne göre saklandığı dizin
+    app.config['EXPORT_CACHE_DIR'] = os.getenv('EXPORT_CACHE_DIR', os.path.join(app.instance_path, 'export_cache'))
+    # Dizin bu boyutu aşınca en uzun süredir indirilmeyen dosyalar silinir; bu süreden eski dosyalar her durumda silinir
+    app.config['EXPORT_CACHE_MAX_BYTES'] = int(os.getenv('EXPORT_CACHE_MAX_BYTES', 512 * 1024 * 1024))
+    app.config['EXPORT_CACHE_MAX_AGE_SECONDS'] = int(os.getenv('EXPORT_CACHE_MAX_AGE_SECONDS', 86400))
+    # Arka plan rapor işleri: worker başına thread sayısı ve bu süreyi aşan işin bayat sayılması
+    app.config['EXPORT_WORKERS'] = int(os.getenv('EXPORT_WORKERS', 2))
+    app.config['EXPORT_JOB_TIMEOUT_SECONDS'] = int(os.getenv('EXPORT_JOB_TIMEOUT_SECONDS', 900))
+    # Rapor/istatistik yanıt önbelleği: memory (worker içi), file (worker'lar arası) veya none
+    app.config['RESPONSE_CACHE_BACKEND'] = os.getenv('RESPONSE_CACHE_BACKEND', 'memory')
+    app.config['RESPONSE_CACHE_DIR'] = os.getenv('RESPONSE_CACHE_DIR', os.path.join(app.instance_path, 'response_cache'))
+    app.config['RESPONSE_CACHE_MAX_ENTRIES'] = int(os.getenv('RESPONSE_CACHE_MAX_ENTRIES', 1024))
+    app.config['RESPONSE_CACHE_TTL'] = int(os.getenv('RESPONSE_CACHE_TTL', 300))
+    # Bu süreyi (ms) aşan istekler en yavaş SQL ifadesiyle loglanır (0 = kapalı)
+    app.config['SLOW_REQUEST_MS'] = int(os.getenv('SLOW_REQUEST_MS', 0))
+    # Ayarlanırsa /metrics yalnızca 'Authorization: Bearer <token>' ile okunabilir
+    app.config['METRICS_TOKEN'] = os.getenv('METRICS_TOKEN')
+    # Bu boyutun (byte) üzerindeki JSON/metin yanıtları gzip (brotli kuruluysa br) ile sıkıştırılır
+    app.config['COMPRESSION_MIN_SIZE'] = int(os.getenv('COMPRESSION_MIN_SIZE', 1024))
+    # gzip seviyesi (1-9, 0 = anlık sıkıştırma kapalı) ve brotli kalitesi (0-11)
+    app.config['COMPRESSION_LEVEL'] = int(os.getenv('COMPRESSION_LEVEL', 6))
+    app.config['COMPRESSION_BROTLI_QUALITY'] = int(os.getenv('COMPRESSION_BROTLI_QUALITY', 4))
+    # NDJSON akışında tek satır için izin verilen en büyük boyut (byte)
+    app.config['NDJSON_MAX_LINE_BYTES'] = int(os.getenv('NDJSON_MAX_LINE_BYTES', 64 * 1024))
+    # SSE kanalı: başka worker'larda yazılan olaylar için en uzun bekleme ve olay saklama süresi
+    app.config['EVENTS_POLL_SECONDS'] = float(os.getenv('EVENTS_POLL_SECONDS', 2))
+    app.config['EVENTS_RETENTION_MINUTES'] = int(os.getenv('EVENTS_RETENTION_MINUTES', 15))
+    # Grafik için robot başına bellekte tutulan son okuma sayısı ve en fazla robot (0 = kapalı)
+    app.config['RECENT_READINGS_SIZE'] = int(os.getenv('RECENT_READINGS_SIZE', 50))
+    app.config['RECENT_READINGS_MAX_ROBOTS'] = int(os.getenv('RECENT_READINGS_MAX_ROBOTS', 10000))
+    # Write-behind: simulate/yükleme okumaları kuyruğa alınır ve arka planda toplu commit edilir
+    app.config['WRITE_BEHIND'] = os.getenv('WRITE_BEHIND', '0').lower() in ('1', 'true', 'yes')
+    app.config['WRITE_BEHIND_MAX_READINGS'] = int(os.getenv('WRITE_BEHIND_MAX_READINGS', 100000))
+    app.config['WRITE_BEHIND_BATCH_READINGS'] = int(os.getenv('WRITE_BEHIND_BATCH_READINGS', 5000))
+    app.config['WRITE_BEHIND_INTERVAL_MS'] = int(os.getenv('WRITE_BEHIND_INTERVAL_MS', 20))
+    # ?ack= verilmezse kullanılan onay: committed (yazılınca) veya queued (kuyruğa alınınca)
+    app.config['WRITE_BEHIND_ACK'] = os.getenv('WRITE_BEHIND_ACK', 'committed')
+    app.config['WRITE_BEHIND_ACK_TIMEOUT'] = float(os.getenv('WRITE_BEHIND_ACK_TIMEOUT', 30))
+    # SQLite bağlantı ayarları: her yeni bağlantıda PRAGMA olarak uygulanır
+    app.config['SQLITE_JOURNAL_MODE'] = os.getenv('SQLITE_JOURNAL_MODE', 'WAL')
+    app.config['SQLITE_SYNCHRONOUS'] = os.getenv('SQLITE_SYNCHRONOUS', 'NORMAL')
+    app.config['SQLITE_MMAP_SIZE'] = int(os.getenv('SQLITE_MMAP_SIZE', 256 * 1024 * 1024))
+    # Negatif değer KiB cinsindendir (-65536 = 64 MB sayfa önbelleği)
+    app.config['SQLITE_CACHE_SIZE'] = int(os.getenv('SQLITE_CACHE_SIZE', -65536))
+    app.config['SQLITE_BUSY_TIMEOUT_MS'] = int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', 5000))
+    # Bağlantı havuzu (worker başına); pre-ping ve recycle yalnızca PostgreSQL'de kullanılır
+    app.config['DB_POOL_SIZE'] = int(os.getenv('DB_POOL_SIZE', 10))
+    app.config['DB_MAX_OVERFLOW'] = int(os.getenv('DB_MAX_OVERFLOW', 20))
+    app.config['DB_POOL_RECYCLE'] = int(os.getenv('DB_POOL_RECYCLE', 1800))
+    app.config['DB_POOL_PRE_PING'] = os.getenv('DB_POOL_PRE_PING', '1').lower() in ('1', 'true', 'yes')
+    # /api/simulate/fleet isteğinin üretebileceği en fazla okuma (robot × adım)
+    app.config['FLEET_SIMULATION_MAX_READINGS'] = int(os.getenv('FLEET_SIMULATION_MAX_READINGS', 200000))
+    # Anomali tespiti: EWMA ağırlığı ve /api/alerts eşikleri
+    app.config['ANOMALY_EWMA_ALPHA'] = float(os.getenv('ANOMALY_EWMA_ALPHA', 0.1))
+    app.config['ANOMALY_Z_THRESHOLD'] = float(os.getenv('ANOMALY_Z_THRESHOLD', 3))
+    app.config['ANOMALY_MIN_SAMPLES'] = int(os.getenv('ANOMALY_MIN_SAMPLES', 20))
+    app.config['ANOMALY_MAX_TEMPERATURE'] = float(os.getenv('ANOMALY_MAX_TEMPERATURE', 45))
+    app.config['ANOMALY_STALL_SPEED'] = float(os.getenv('ANOMALY_STALL_SPEED', 0.05))
+    app.config['ANOMALY_LOW_BATTERY'] = int(os.getenv('ANOMALY_LOW_BATTERY', 15))
+    # Dakikadaki değişim sınırları, ör. '{"temperature": 2, "battery": 5}'
+    app.config['ANOMALY_RATE_LIMITS'] = json.loads(os.getenv('ANOMALY_RATE_LIMITS', '{"temperature": 2, "humidity": 10, "battery": 5}'))
+    # Değişim hızının ölçüldüğü en kısa pencere (saniye); daha sık örnekler tek başına hız uyarısı üretmez
+    app.config['ANOMALY_RATE_WINDOW_SECONDS'] = float(os.getenv('ANOMALY_RATE_WINDOW_SECONDS', 60))
+    # Yüzdelik skeçleri: metrik -> kova genişliği (değiştirilirse flask rebuild-histograms çalıştırılmalı)
+    app.config['HISTOGRAM_BIN_WIDTHS'] = json.loads(os.getenv('HISTOGRAM_BIN_WIDTHS', '{"temperature": 0.5, "speed": 0.1}'))
+    # Bundan kısa aralıklarda yüzdelikler saatlik, daha uzunlarda günlük skeçlerden birleştirilir
+    app.config['HISTOGRAM_HOURLY_MAX_DAYS'] = int(os.getenv('HISTOGRAM_HOURLY_MAX_DAYS', 7))
+    app.config['LOG_LEVEL'] = os.getenv('LOG_LEVEL', 'INFO')
+    if config:
+        app.config.update(config)
+    app.logger.setLevel(app.config['LOG_LEVEL'])
+    if 'SQLALCHEMY_ENGINE_OPTIONS' not in (config or {}):
+        app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(app.config['SQLALCHEMY_DATABASE_URI'], app.config)
+
+    db.init_app(app)
+    with app.app_context():
+        # Motor oluşturulur ama bağlantı açılmaz; ilk bağlantı her worker'da ayrı açılır
+        if db.engine.dialect.name == 'sqlite':
+            event.listen(db.engine, 'connect', sqlite_connection_listener(sqlite_pragmas(app.config)))
+        # Her worker ilk bağlantısında (PRAGMA'lar uygulandıktan sonra) ayarları bir kez loglar
+        event.listen(db.engine, 'connect', engine_settings_logger(app, db.engine), once=True)
+    request_metrics.init_app(app, db.Model)
+    compression.init_app(app)
+    login_manager.init_app(app)
+
+    app.extensions['response_cache'] = create_cache(
+        app.config['RESPONSE_CACHE_BACKEND'],
+        directory=app.config['RESPONSE_CACHE_DIR'],
+        max_entries=app.config['RESPONSE_CACHE_MAX_ENTRIES'],
+        ttl=app.config['RESPONSE_CACHE_TTL']
+    )
+    app.extensions['recent_readings'] = RecentReadings(
+        capacity=app.config['RECENT_READINGS_SIZE'],
+        max_robots=app.config['RECENT_READINGS_MAX_ROBOTS']
+    )
+    app.extensions['export_jobs'] = ExportJobs(
+        app.config['EXPORT_CACHE_DIR'], workers=app.config['EXPORT_WORKERS'],
+        stale_after=app.config['EXPORT_JOB_TIMEOUT_SECONDS'], logger=app.logger
+    )
+    app.extensions['write_queue'] = None
+    if app.config['WRITE_BEHIND']:
+        # Yazıcı thread'i ilk işte başlar; fork öncesi ana süreçte thread açılmaz
+        write_queue = app.extensions['write_queue'] = WriteBehindQueue(
+            app, flush_write_jobs,
+            max_readings=app.config['WRITE_BEHIND_MAX_READINGS'],
+            batch_readings=app.config['WRITE_BEHIND_BATCH_READINGS'],
+            interval=app.config['WRITE_BEHIND_INTERVAL_MS'] / 1000
+        )
+        # Kapanışta kuyruktaki okumalar yazılmadan çıkılmaz
+        atexit.register(write_queue.close)
+
+    app.register_blueprint(bp)
+    return app
+
+def engine_options(uri, config):
+    """Veritabanı türüne göre SQLALCHEMY_ENGINE_OPTIONS"""
+    url = make_url(uri)
+    if url.get_backend_name() == 'sqlite':
+        # SQLite SELECT'lerde rowcount vermez; okunan satırlar metrikler için imleçte sayılır
+        connect_args = {'factory': RowCountingConnection}
+        if url.database in (None, '', ':memory:'):
+            # Bellek içi veritabanı tek bağlantıya bağlıdır; havuz ayarı uygulanmaz
+            return {'connect_args': connect_args}
+        return {'pool_size': config['DB_POOL_SIZE'], 'max_overflow': config['DB_MAX_OVERFLOW'],
+                'connect_args': connect_args}
+    return {
+        'pool_size': config['DB_POOL_SIZE'],
+        'max_overflow': config['DB_MAX_OVERFLOW'],
+        'pool_recycle': config['DB_POOL_RECYCLE'],
+        'pool_pre_ping': config['DB_POOL_PRE_PING']
+    }
+
+def sqlite_pragmas(config):
+    return (
+        ('journal_mode', config['SQLITE_JOURNAL_MODE']),
+        ('synchronous', config['SQLITE_SYNCHRONOUS']),
+        ('mmap_size', config['SQLITE_MMAP_SIZE']),
+        ('cache_size', config['SQLITE_CACHE_SIZE']),
+        ('busy_timeout', config['SQLITE_BUSY_TIMEOUT_MS']),
+    )
+
+def sqlite_connection_listener(pragmas):
+    def configure(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas:
+            cursor.execute(f'PRAGMA {name}={value}')
+        cursor.close()
+    return configure
+
+def engine_settings(engine, config, dbapi_connection=None):
+    """Veritabanı bağlantısının fiilen geçerli ayarları; SQLite PRAGMA'ları verilen
+    DBAPI bağlantısından, verilmezse havuzdan alınan bir bağlantıdan okunur"""
+    settings = {'backend': engine.dialect.name, 'pool': type(engine.pool).__name__}
+    if hasattr(engine.pool, 'size'):
+        settings['pool_size'] = engine.pool.size()
+    if engine.dialect.name == 'sqlite':
+        if dbapi_connection is None:
+            with engine.connect() as conn:
+                return engine_settings(engine, config, conn.connection.dbapi_connection)
+        cursor = dbapi_connection.cursor()
+        for name, _ in sqlite_pragmas(config):
+            # Bellek içi veritabanı bazı PRAGMA'lar için satır döndürmez (ör. mmap_size)
+            row = cursor.execute(f'PRAGMA {name}').fetchone()
+            settings[name] = row[0] if row else None
+        cursor.close()
+    else:
+        settings['pool_pre_ping'] = config['SQLALCHEMY_ENGINE_OPTIONS'].get('pool_pre_ping', False)
+    return settings
+
+def engine_settings_logger(app, engine):
+    """İlk bağlantıda fiilen geçerli veritabanı ayarlarını loglayan dinleyici"""
+    def log(dbapi_connection, connection_record):
+        settings = engine_settings(engine, app.config, dbapi_connection)
+        app.logger.info('Veritabanı ayarları: %s', ', '.join(f'{k}={v}' for k, v in settings.items()))
+    return log
 
 # Database Models
 class User(UserMixin, db.Model):
@@ -36,6 +249,8 @@ class User(UserMixin, db.Model):
     email = db.Column(db.String(120), unique=True, nullable=False)
     password_hash = db.Column(db.String(200), nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    # Kullanıcının robot/sensör verisi her değiştiğinde artar (ETag ve önbellek anahtarı)
+    data_version = db.Column(db.Integer, nullable=False, default=0, server_default='0')
     robots = db.relationship('Robot', backref='owner', lazy=True, cascade='all, delete-orphan')
     
     def set_password(self, password):
@@ -52,7 +267,18 @@ class Robot(db.Model):
     battery = db.Column(db.Integer, default=100)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    data_version = db.Column(db.Integer, nullable=False, default=0, server_default='0')
     sensors = db.relationship('SensorData', backref='robot', lazy=True, cascade='all, delete-orphan')
+    stats = db.relationship('RobotStats', backref='robot', uselist=False, lazy=True, cascade='all, delete-orphan')
+    rollups = db.relationship('SensorRollup', lazy=True, cascade='all, delete-orphan')
+    anomaly_state = db.relationship('RobotAnomalyState', uselist=False, lazy=True, cascade='all, delete-orphan')
+    histograms = db.relationship('SensorHistogram', lazy=True, cascade='all, delete-orphan')
+
+    # Robot listesi sayfalaması: durum filtresi ve ad öneki/ad sıralaması bu indekslerden okunur
+    __table_args__ = (
+        db.Index('ix_robot_user_id_status', 'user_id', 'status'),
+        db.Index('ix_robot_user_id_name', 'user_id', 'name'),
+    )
 
 class SensorData(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -62,21 +288,939 @@ class SensorData(db.Model):
     speed = db.Column(db.Float)
     timestamp = db.Column(db.DateTime, default=datetime.utcnow)
 
+    # Robot bazlı zaman sıralı okumalar (grafik, export, sayfalama) bu indeksten okunur
+    __table_args__ = (
+        db.Index('ix_sensor_data_robot_id_timestamp', 'robot_id', 'timestamp'),
+    )
+
+class RobotStats(db.Model):
+    """Robot başına artımlı sensör özeti (raporlar tüm okumaları taramadan buradan okur)"""
+    robot_id = db.Column(db.Integer, db.ForeignKey('robot.id'), primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
+    temperature_sum = db.Column(db.Float, nullable=False, default=0)
+    humidity_sum = db.Column(db.Float, nullable=False, default=0)
+    speed_sum = db.Column(db.Float, nullable=False, default=0)
+    temperature_min = db.Column(db.Float)
+    temperature_max = db.Column(db.Float)
+    humidity_min = db.Column(db.Float)
+    humidity_max = db.Column(db.Float)
+    speed_min = db.Column(db.Float)
+    speed_max = db.Column(db.Float)
+    last_reading = db.Column(db.DateTime)
+    # En son okumanın değerleri (robot listesi sensör tablosuna inmeden gösterir)
+    last_temperature = db.Column(db.Float)
+    last_humidity = db.Column(db.Float)
+    last_speed = db.Column(db.Float)
+
+    def average(self, field):
+        if not self.count:
+            return 0
+        return getattr(self, f'{field}_sum') / self.count
+
+class SensorRollup(db.Model):
+    """Dakika/saat/gün kovalarında robot başına sensör özeti (count, sum, min, max)"""
+    robot_id = db.Column(db.Integer, db.ForeignKey('robot.id'), primary_key=True)
+    resolution = db.Column(db.String(4), primary_key=True)
+    bucket = db.Column(db.DateTime, primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
+    temperature_sum = db.Column(db.Float, nullable=False, default=0)
+    temperature_min = db.Column(db.Float)
+    temperature_max = db.Column(db.Float)
+    humidity_sum = db.Column(db.Float, nullable=False, default=0)
+    humidity_min = db.Column(db.Float)
+    humidity_max = db.Column(db.Float)
+    speed_sum = db.Column(db.Float, nullable=False, default=0)
+    speed_min = db.Column(db.Float)
+    speed_max = db.Column(db.Float)
+
+class SensorHistogram(db.Model):
+    """Robot, zaman kovası ve metrik başına sabit aralıklı histogram (sketches.py); her satır bir kova"""
+    robot_id = db.Column(db.Integer, db.ForeignKey('robot.id'), primary_key=True)
+    resolution = db.Column(db.String(4), primary_key=True)
+    bucket = db.Column(db.DateTime, primary_key=True)
+    metric = db.Column(db.String(20), primary_key=True)
+    bin = db.Column(db.Integer, primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+class RobotAnomalyState(db.Model):
+    """Robot başına çevrimiçi EWMA istatistikleri (anomaly.py); /api/alerts yalnızca bunu okur"""
+    robot_id = db.Column(db.Integer, db.ForeignKey('robot.id'), primary_key=True)
+    reading_count = db.Column(db.Integer, nullable=False, default=0)
+    reading_at = db.Column(db.DateTime)
+    battery_count = db.Column(db.Integer, nullable=False, default=0)
+    battery_at = db.Column(db.DateTime)
+    temperature_mean = db.Column(db.Float)
+    temperature_var = db.Column(db.Float)
+    temperature_last = db.Column(db.Float)
+    temperature_z = db.Column(db.Float)
+    temperature_rate = db.Column(db.Float)
+    temperature_anchor = db.Column(db.Float)
+    temperature_anchor_at = db.Column(db.DateTime)
+    humidity_mean = db.Column(db.Float)
+    humidity_var = db.Column(db.Float)
+    humidity_last = db.Column(db.Float)
+    humidity_z = db.Column(db.Float)
+    humidity_rate = db.Column(db.Float)
+    humidity_anchor = db.Column(db.Float)
+    humidity_anchor_at = db.Column(db.DateTime)
+    speed_mean = db.Column(db.Float)
+    speed_var = db.Column(db.Float)
+    speed_last = db.Column(db.Float)
+    speed_z = db.Column(db.Float)
+    speed_rate = db.Column(db.Float)
+    speed_anchor = db.Column(db.Float)
+    speed_anchor_at = db.Column(db.DateTime)
+    battery_mean = db.Column(db.Float)
+    battery_var = db.Column(db.Float)
+    battery_last = db.Column(db.Float)
+    battery_z = db.Column(db.Float)
+    battery_rate = db.Column(db.Float)
+    battery_anchor = db.Column(db.Float)
+    battery_anchor_at = db.Column(db.DateTime)
+
+class ChangeEvent(db.Model):
+    """Kullanıcı başına değişiklik olayı; SSE kanalı panolara bunları iletir"""
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    kind = db.Column(db.String(30), nullable=False)
+    payload = db.Column(db.Text, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+
+    __table_args__ = (
+        db.Index('ix_change_event_user_id_id', 'user_id', 'id'),
+    )
+
+SENSOR_FIELDS = ('temperature', 'humidity', 'speed')
+
+def _least(column, value):
+    return db.case((column.is_(None), value), (column > value, value), else_=column)
+
+def _greatest(column, value):
+    return db.case((column.is_(None), value), (column < value, value), else_=column)
+
+def upsert_insert(table):
+    """Veritabanına uygun ON CONFLICT destekli INSERT ifadesi (SQLite / PostgreSQL)"""
+    if db.session.get_bind().dialect.name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert(table)
+
+def record_sensor_stats(readings_by_robot):
+    """Yeni okumaları robotların özet kayıtlarına ekler (tüm robotlar için tek upsert ifadesi)"""
+    values = []
+    for robot_id, readings in readings_by_robot.items():
+        if not readings:
+            continue
+        # Aynı zaman damgalı okumalardan en son yazılan geçerli sayılır
+        latest = max(reversed(readings), key=lambda r: r['timestamp'])
+        agg = {'robot_id': robot_id, 'count': len(readings), 'last_reading': latest['timestamp']}
+        for field in SENSOR_FIELDS:
+            column_values = [r[field] for r in readings if r[field] is not None]
+            agg[f'{field}_sum'] = sum(column_values)
+            agg[f'{field}_min'] = min(column_values) if column_values else None
+            agg[f'{field}_max'] = max(column_values) if column_values else None
+            agg[f'last_{field}'] = latest[field]
+        values.append(agg)
+    if not values:
+        return
+
+    table = RobotStats.__table__
+    stmt = upsert_insert(table)
+    excluded = stmt.excluded
+    set_ = {'count': table.c['count'] + excluded['count']}
+    for field in SENSOR_FIELDS:
+        set_[f'{field}_sum'] = table.c[f'{field}_sum'] + excluded[f'{field}_sum']
+        set_[f'{field}_min'] = _least(table.c[f'{field}_min'], excluded[f'{field}_min'])
+        set_[f'{field}_max'] = _greatest(table.c[f'{field}_max'], excluded[f'{field}_max'])
+    set_['last_reading'] = _greatest(table.c.last_reading, excluded.last_reading)
+    # SET ifadeleri eski satır değerlerini görür; son değerler yalnızca daha yeni okumada değişir
+    is_newer = db.or_(table.c.last_reading.is_(None), table.c.last_reading <= excluded.last_reading)
+    for field in SENSOR_FIELDS:
+        set_[f'last_{field}'] = db.case((is_newer, excluded[f'last_{field}']), else_=table.c[f'last_{field}'])
+    stmt = stmt.on_conflict_do_update(index_elements=['robot_id'], set_=set_)
+
+    chunk_size = current_app.config['INGEST_CHUNK_SIZE']
+    for start in range(0, len(values), chunk_size):
+        db.session.execute(stmt, values[start:start + chunk_size])
+
+def rebuild_robot_stats():
+    """Tüm özet kayıtlarını SensorData üzerinden tek GROUP BY sorgusuyla yeniden hesaplar"""
+    columns = [SensorData.robot_id, db.func.count(SensorData.id)]
+    for field in SENSOR_FIELDS:
+        column = getattr(SensorData, field)
+        columns += [db.func.coalesce(db.func.sum(column), 0), db.func.min(column), db.func.max(column)]
+    columns.append(db.func.max(SensorData.timestamp))
+
+    db.session.execute(db.delete(RobotStats))
+    rows = db.session.execute(db.select(*columns).group_by(SensorData.robot_id)).all()
+    for row in rows:
+        stats = RobotStats(robot_id=row[0], count=row[1], last_reading=row[-1])
+        for i, field in enumerate(SENSOR_FIELDS):
+            setattr(stats, f'{field}_sum', row[2 + i * 3])
+            setattr(stats, f'{field}_min', row[3 + i * 3])
+            setattr(stats, f'{field}_max', row[4 + i * 3])
+        db.session.add(stats)
+    db.session.flush()
+
+    # Son okuma değerleri: robot başına en büyük zaman damgasına sahip satır
+    last = (
+        db.select(SensorData.robot_id, db.func.max(SensorData.timestamp).label('timestamp'))
+        .group_by(SensorData.robot_id)
+        .subquery()
+    )
+    latest_rows = db.session.execute(
+        db.select(SensorData.robot_id, SensorData.temperature, SensorData.humidity, SensorData.speed)
+        .join(last, db.and_(SensorData.robot_id == last.c.robot_id, SensorData.timestamp == last.c.timestamp))
+        .order_by(SensorData.id)
+    ).all()
+    for robot_id, temperature, humidity, speed in latest_rows:
+        db.session.execute(
+            db.update(RobotStats).where(RobotStats.robot_id == robot_id)
+            .values(last_temperature=temperature, last_humidity=humidity, last_speed=speed)
+        )
+    db.session.commit()
+    return len(rows)
+
+def robot_summaries(user_id, histograms=None):
+    """Kullanıcının robotlarını özet kayıtlarıyla birlikte tek sorguda döndürür
+    (yüzdelikler için histogramlar ayrıca tek sorguda okunur)"""
+    rows = db.session.execute(
+        db.select(Robot, RobotStats)
+        .outerjoin(RobotStats, RobotStats.robot_id == Robot.id)
+        .where(Robot.user_id == user_id)
+        .order_by(Robot.id)
+    ).all()
+
+    if histograms is None:
+        histograms = load_histograms(user_id)
+    summaries = []
+    for robot, stats in rows:
+        stats = stats or RobotStats(robot_id=robot.id, count=0)
+        summaries.append({
+            'robot': robot,
+            'sensor_count': stats.count or 0,
+            'avg_temperature': round(stats.average('temperature'), 2),
+            'avg_humidity': round(stats.average('humidity'), 2),
+            'avg_speed': round(stats.average('speed'), 2),
+            'last_reading': stats.last_reading.strftime('%Y-%m-%d %H:%M:%S') if stats.last_reading else 'N/A',
+            'percentiles': histogram_percentiles(histograms.get(robot.id, {}))
+        })
+    return summaries
+
+# Zaman kovası çözünürlükleri: (kova uzunluğu saniye, kova başlangıcı)
+ROLLUP_RESOLUTIONS = {
+    '1m': (60, lambda ts: ts.replace(second=0, microsecond=0)),
+    '1h': (3600, lambda ts: ts.replace(minute=0, second=0, microsecond=0)),
+    '1d': (86400, lambda ts: ts.replace(hour=0, minute=0, second=0, microsecond=0)),
+}
+
+def record_rollups(rows):
+    """Okumaları kovalarda toplar ve rollup tablosuna tek seferde ekler (upsert)"""
+    buckets = {}
+    for row in rows:
+        for resolution, (_, truncate) in ROLLUP_RESOLUTIONS.items():
+            key = (row['robot_id'], resolution, truncate(row['timestamp']))
+            agg = buckets.get(key)
+            if agg is None:
+                agg = buckets[key] = {'robot_id': key[0], 'resolution': resolution, 'bucket': key[2], 'count': 0}
+                for field in SENSOR_FIELDS:
+                    agg[f'{field}_sum'] = 0
+                    agg[f'{field}_min'] = None
+                    agg[f'{field}_max'] = None
+            agg['count'] += 1
+            for field in SENSOR_FIELDS:
+                value = row[field]
+                if value is None:
+                    continue
+                agg[f'{field}_sum'] += value
+                if agg[f'{field}_min'] is None or value < agg[f'{field}_min']:
+                    agg[f'{field}_min'] = value
+                if agg[f'{field}_max'] is None or value > agg[f'{field}_max']:
+                    agg[f'{field}_max'] = value
+    if not buckets:
+        return
+
+    table = SensorRollup.__table__
+    stmt = upsert_insert(table)
+    excluded = stmt.excluded
+    set_ = {'count': table.c['count'] + excluded['count']}
+    for field in SENSOR_FIELDS:
+        set_[f'{field}_sum'] = table.c[f'{field}_sum'] + excluded[f'{field}_sum']
+        set_[f'{field}_min'] = _least(table.c[f'{field}_min'], excluded[f'{field}_min'])
+        set_[f'{field}_max'] = _greatest(table.c[f'{field}_max'], excluded[f'{field}_max'])
+    stmt = stmt.on_conflict_do_update(index_elements=['robot_id', 'resolution', 'bucket'], set_=set_)
+
+    values = list(buckets.values())
+    chunk_size = current_app.config['INGEST_CHUNK_SIZE']
+    for start in range(0, len(values), chunk_size):
+        db.session.execute(stmt, values[start:start + chunk_size])
+
+def rebuild_rollups():
+    """Rollup tablosunu SensorData'dan parça parça okuyarak yeniden oluşturur"""
+    db.session.execute(db.delete(SensorRollup))
+    total = 0
+    result = db.session.execute(
+        db.select(SensorData.robot_id, SensorData.temperature, SensorData.humidity,
+                  SensorData.speed, SensorData.timestamp)
+        .where(SensorData.timestamp.is_not(None))
+        .execution_options(yield_per=current_app.config['INGEST_CHUNK_SIZE'])
+    )
+    for partition in result.partitions():
+        rows = [row._asdict() for row in partition]
+        # Aynı kova birden fazla parçaya düşerse upsert değerleri birleştirir
+        record_rollups(rows)
+        total += len(rows)
+    db.session.commit()
+    return total
+
+# Yüzdelik skeçleri (saatlik, günlük ve tüm zamanlar kovaları)
+HISTOGRAM_RESOLUTIONS = ('1h', '1d', 'all')
+# 'all' çözünürlüğünde robot/metrik başına tek kova tutulur; aralıksız raporlar bunu okur
+HISTOGRAM_ALL_BUCKET = datetime(1970, 1, 1)
+HISTOGRAM_LABELS = {'temperature': 'Sıcaklık (°C)', 'humidity': 'Nem (%)', 'speed': 'Hız (m/s)'}
+
+def record_histograms(rows):
+    """Okumaları robot/kova/metrik histogramlarına ekler (tek upsert, count += yeni adet)"""
+    widths = current_app.config['HISTOGRAM_BIN_WIDTHS']
+    counts = defaultdict(int)
+    for row in rows:
+        for resolution in HISTOGRAM_RESOLUTIONS:
+            if resolution == 'all':
+                bucket = HISTOGRAM_ALL_BUCKET
+            else:
+                bucket = ROLLUP_RESOLUTIONS[resolution][1](row['timestamp'])
+            for metric, width in widths.items():
+                value = row[metric]
+                if value is not None:
+                    counts[(row['robot_id'], resolution, bucket, metric, sketches.bin_index(value, width))] += 1
+    if not counts:
+        return
+
+    table = SensorHistogram.__table__
+    stmt = upsert_insert(table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['robot_id', 'resolution', 'bucket', 'metric', 'bin'],
+        set_={'count': table.c['count'] + stmt.excluded['count']}
+    )
+    values = [{'robot_id': robot_id, 'resolution': resolution, 'bucket': bucket, 'metric': metric,
+               'bin': index, 'count': count}
+              for (robot_id, resolution, bucket, metric, index), count in counts.items()]
+    chunk_size = current_app.config['INGEST_CHUNK_SIZE']
+    for start in range(0, len(values), chunk_size):
+        db.session.execute(stmt, values[start:start + chunk_size])
+
+def rebuild_histograms():
+    """Histogram tablosunu SensorData'dan parça parça okuyarak yeniden oluşturur"""
+    db.session.execute(db.delete(SensorHistogram))
+    total = 0
+    result = db.session.execute(
+        db.select(SensorData.robot_id, SensorData.temperature, SensorData.humidity,
+                  SensorData.speed, SensorData.timestamp)
+        .where(SensorData.timestamp.is_not(None))
+        .execution_options(yield_per=current_app.config['INGEST_CHUNK_SIZE'])
+    )
+    for partition in result.partitions():
+        rows = [row._asdict() for row in partition]
+        record_histograms(rows)
+        total += len(rows)
+    db.session.commit()
+    return total
+
+def histogram_resolution(start, end):
+    if start is None and end is None:
+        return 'all'
+    if start is None or end is None or end - start > timedelta(days=current_app.config['HISTOGRAM_HOURLY_MAX_DAYS']):
+        return '1d'
+    return '1h'
+
+def load_histograms(user_id, start=None, end=None, robot_id=None):
+    """Kullanıcının robotları için robot id -> metrik -> {bin: adet}.
+    Zaman kovaları SQL'de birleştirilir; okunan satır sayısı okuma sayısından bağımsızdır."""
+    resolution = histogram_resolution(start, end)
+    query = (
+        db.select(SensorHistogram.robot_id, SensorHistogram.metric, SensorHistogram.bin,
+                  db.func.sum(SensorHistogram.count))
+        # IN alt sorgusu (robot_id, resolution) birincil anahtar önekiyle aranır; birleştirme tüm tabloyu tarıyordu
+        .where(SensorHistogram.robot_id.in_(db.select(Robot.id).where(Robot.user_id == user_id)),
+               SensorHistogram.resolution == resolution)
+        .group_by(SensorHistogram.robot_id, SensorHistogram.metric, SensorHistogram.bin)
+    )
+    if robot_id is not None:
+        query = query.where(SensorHistogram.robot_id == robot_id)
+    if start is not None:
+        query = query.where(SensorHistogram.bucket >= ROLLUP_RESOLUTIONS[resolution][1](start))
+    if end is not None:
+        query = query.where(SensorHistogram.bucket <= end)
+    histograms = defaultdict(lambda: defaultdict(dict))
+    for robot_id, metric, index, count in db.session.execute(query):
+        histograms[robot_id][metric][index] = count
+    return histograms
+
+def histogram_percentiles(histograms):
+    """metrik -> {bin: adet} sözlüğünden metrik -> {p50, p95, p99, count}"""
+    widths = current_app.config['HISTOGRAM_BIN_WIDTHS']
+    return {metric: sketches.percentiles(histograms.get(metric, {}), width) for metric, width in widths.items()}
+
+# Anomali durumu
+def anomaly_upsert():
+    table = RobotAnomalyState.__table__
+    stmt = upsert_insert(table)
+    return stmt.on_conflict_do_update(
+        index_elements=['robot_id'],
+        set_={column.name: stmt.excluded[column.name] for column in table.columns if column.name != 'robot_id'}
+    )
+
+def record_anomaly_state(group, samples_by_robot):
+    """Robotların EWMA durumunu yeni örneklerle günceller: robot id -> [(zaman, {metrik: değer})].
+    Okuma başına O(1); robotlar için tek SELECT ve tek upsert."""
+    if not samples_by_robot:
+        return
+    table = RobotAnomalyState.__table__
+    states = {
+        row['robot_id']: dict(row)
+        for row in db.session.execute(
+            db.select(table).where(table.c.robot_id.in_(list(samples_by_robot))).with_for_update()
+        ).mappings()
+    }
+    alpha = current_app.config['ANOMALY_EWMA_ALPHA']
+    window = current_app.config['ANOMALY_RATE_WINDOW_SECONDS']
+    values = []
+    for robot_id, samples in samples_by_robot.items():
+        state = states.get(robot_id) or anomaly.empty_state(robot_id)
+        for timestamp, sample in sorted(samples, key=lambda s: s[0]):
+            anomaly.update(state, group, timestamp, sample, alpha, window)
+        values.append(state)
+    db.session.execute(anomaly_upsert(), values)
+
+def record_battery(batteries, timestamp=None):
+    """Batarya değişikliklerini (robot id -> değer) anomali durumuna işler"""
+    timestamp = timestamp or datetime.utcnow()
+    record_anomaly_state('battery', {
+        robot_id: [(timestamp, {'battery': battery})] for robot_id, battery in batteries.items()
+    })
+
+def rebuild_anomaly_state():
+    """Okuma istatistiklerini tüm geçmişi zaman sırasıyla tekrar oynatarak yeniden hesaplar (batarya korunur)"""
+    table = RobotAnomalyState.__table__
+    states = {row['robot_id']: dict(row) for row in db.session.execute(db.select(table)).mappings()}
+    for robot_id, state in states.items():
+        fresh = anomaly.empty_state(robot_id)
+        for key in fresh:
+            if not key.startswith('battery'):
+                state[key] = fresh[key]
+    alpha = current_app.config['ANOMALY_EWMA_ALPHA']
+    window = current_app.config['ANOMALY_RATE_WINDOW_SECONDS']
+    total = 0
+    result = db.session.execute(
+        db.select(SensorData.robot_id, SensorData.temperature, SensorData.humidity,
+                  SensorData.speed, SensorData.timestamp)
+        .where(SensorData.timestamp.is_not(None))
+        .order_by(SensorData.robot_id, SensorData.timestamp, SensorData.id)
+        .execution_options(yield_per=current_app.config['INGEST_CHUNK_SIZE'])
+    )
+    for partition in result.partitions():
+        for robot_id, temperature, humidity, speed, timestamp in partition:
+            state = states.get(robot_id)
+            if state is None:
+                state = states[robot_id] = anomaly.empty_state(robot_id)
+            anomaly.update(state, 'reading', timestamp,
+                           {'temperature': temperature, 'humidity': humidity, 'speed': speed}, alpha, window)
+            total += 1
+    values = list(states.values())
+    chunk_size = current_app.config['INGEST_CHUNK_SIZE']
+    for start in range(0, len(values), chunk_size):
+        db.session.execute(anomaly_upsert(), values[start:start + chunk_size])
+    db.session.commit()
+    return total
+
+def anomaly_thresholds():
+    return {
+        'z': current_app.config['ANOMALY_Z_THRESHOLD'],
+        'min_samples': current_app.config['ANOMALY_MIN_SAMPLES'],
+        'max_temperature': current_app.config['ANOMALY_MAX_TEMPERATURE'],
+        'stall_speed': current_app.config['ANOMALY_STALL_SPEED'],
+        'low_battery': current_app.config['ANOMALY_LOW_BATTERY'],
+        'rates': current_app.config['ANOMALY_RATE_LIMITS']
+    }
+
+# Değişiklik olayları (SSE)
+# Aynı worker'daki dinleyiciler commit sonrası hemen uyandırılır;
+# diğer worker'larda yazılan olaylar EVENTS_POLL_SECONDS içinde okunur.
+_events_signal = threading.Condition()
+_events_last_prune = 0.0
+
+@event.listens_for(db.session, 'after_commit')
+def _notify_event_listeners(session):
+    if session.info.pop('events_emitted', False):
+        with _events_signal:
+            _events_signal.notify_all()
+
+@event.listens_for(db.session, 'after_rollback')
+def _discard_event_flag(session):
+    session.info.pop('events_emitted', None)
+    session.info.pop('changed_users', None)
+    session.info.pop('robot_bumps', None)
+    session.info.pop('recent_rows', None)
+
+@event.listens_for(db.session, 'after_commit')
+def _invalidate_response_cache(session):
+    for user_id in session.info.pop('changed_users', ()):
+        response_cache.delete_prefix(f'u{user_id}:')
+
+@event.listens_for(db.session, 'after_commit')
+def _apply_recent_readings(session):
+    # Sürüm artışları ve yeni okumalar bellekteki son okuma tamponlarına işlenir
+    bumps = session.info.pop('robot_bumps', None)
+    rows = session.info.pop('recent_rows', {})
+    if bumps:
+        recent_readings.apply(bumps, rows)
+
+def emit_events(user_id, kind, payloads):
+    """Olayları çağıranın transaction'ına tek INSERT ile ekler; commit ile birlikte yayınlanır"""
+    global _events_last_prune
+    if not payloads:
+        return
+    now = datetime.utcnow()
+    db.session.execute(ChangeEvent.__table__.insert(), [
+        {'user_id': user_id, 'kind': kind, 'payload': json.dumps(payload), 'created_at': now}
+        for payload in payloads
+    ])
+    db.session.info['events_emitted'] = True
+
+    # Eski olayları dakikada en fazla bir kez temizle
+    now = time.monotonic()
+    if now - _events_last_prune > 60:
+        _events_last_prune = now
+        cutoff = datetime.utcnow() - timedelta(minutes=current_app.config['EVENTS_RETENTION_MINUTES'])
+        db.session.execute(db.delete(ChangeEvent).where(ChangeEvent.created_at < cutoff))
+
+def emit_event(user_id, kind, payload):
+    emit_events(user_id, kind, [payload])
+
+def robot_to_dict(robot, sensor_count=None):
+    data = {
+        'id': robot.id,
+        'name': robot.name,
+        'model': robot.model,
+        'status': robot.status,
+        'battery': robot.battery,
+        'created_at': robot.created_at.strftime('%Y-%m-%d %H:%M')
+    }
+    if sensor_count is not None:
+        data['sensor_count'] = sensor_count
+    return data
+
+def reading_summary(stats):
+    """Robot listesi için okuma sayısı ve son okuma (özet kaydı yoksa boş)"""
+    if stats is None or not stats.count:
+        return {'sensor_count': 0, 'last_reading': None, 'latest': None}
+    return {
+        'sensor_count': stats.count,
+        'last_reading': stats.last_reading.strftime('%Y-%m-%d %H:%M:%S') if stats.last_reading else None,
+        'latest': {field: getattr(stats, f'last_{field}') for field in SENSOR_FIELDS}
+    }
+
+# Veri sürümleri (ETag / If-None-Match)
+def bump_data_version(user_id, robot_ids=()):
+    """Kullanıcının ve verilen robotların veri sürümünü artırır; her yazma yolu çağırır"""
+    # Kullanıcının önbellek girişleri commit sonrası silinir
+    db.session.info.setdefault('changed_users', set()).add(user_id)
+    bumps = db.session.info.setdefault('robot_bumps', defaultdict(int))
+    for robot_id in robot_ids:
+        bumps[robot_id] += 1
+    db.session.execute(
+        db.update(User).where(User.id == user_id).values(data_version=User.data_version + 1)
+    )
+    if robot_ids:
+        db.session.execute(
+            db.update(Robot).where(Robot.id.in_(list(robot_ids))).values(data_version=Robot.data_version + 1)
+        )
+
+def cached_value(user_id, key, build):
+    """Yanıt önbelleğinden okur; yoksa hesaplayıp saklar (anahtar veri sürümünü içermeli)"""
+    full_key = f'u{user_id}:{key}'
+    value = response_cache.get(full_key)
+    if value is None:
+        value = build()
+        response_cache.set(full_key, value)
+    return value
+
+def conditional_json(tag, build):
+    """İstemcinin sürümü güncelse veriye dokunmadan 304, değilse ETag'li JSON döndürür"""
+    # Sıkıştırılan yanıtların ETag'i zayıftır (W/"..."); karşılaştırma zayıf yapılır
+    if request.if_none_match.contains_weak(tag):
+        response = Response(status=304)
+    else:
+        response = jsonify(build())
+    response.set_etag(tag)
+    # Tarayıcı yanıtı saklasın ama her seferinde sürümü sorsun
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
+# Sensor veri alımı (tüm yükleme uçları bu yolu kullanır)
+def finite_float(value):
+    """float'a çevirir; NaN ve sonsuz değerler (özet toplamlarını ve histogramları bozar) ValueError"""
+    value = float(value)
+    if not math.isfinite(value):
+        raise ValueError('Sayı sonlu olmalı')
+    return value
+
+def coerce_reading(robot_id, sensor_data, timestamp):
+    """Tek okumayı INSERT satırına dönüştürür (hatalı değerde ValueError/TypeError)"""
+    return {
+        'robot_id': robot_id,
+        'temperature': finite_float(sensor_data.get('temperature', 0)),
+        'humidity': finite_float(sensor_data.get('humidity', 0)),
+        'speed': finite_float(sensor_data.get('speed', 0)),
+        'timestamp': timestamp
+    }
+
+def coerce_readings(robot_id, sensors_data, timestamp, skip_invalid=True):
+    """Okumaları tek geçişte doğrular ve INSERT satırlarına dönüştürür"""
+    rows = []
+    for sensor_data in sensors_data:
+        try:
+            rows.append(coerce_reading(robot_id, sensor_data, timestamp))
+        except (ValueError, TypeError):
+            if not skip_invalid:
+                raise
+    return rows
+
+def parse_timestamp(value, default):
+    """ISO 8601 metni veya epoch saniyesini UTC datetime'a çevirir"""
+    if value is None:
+        return default
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        try:
+            return datetime.fromtimestamp(value, timezone.utc).replace(tzinfo=None)
+        except (OverflowError, OSError) as e:
+            # Çok büyük/sonsuz epoch; çağıranlar ValueError'ı 400/reddedilen satır olarak işler
+            raise ValueError('Zaman damgası aralık dışında') from e
+    if isinstance(value, str):
+        parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        if parsed.tzinfo is not None:
+            parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+        return parsed
+    raise TypeError('Geçersiz zaman damgası')
+
+def owned_robots(user_id, ids=None, names=None):
+    """Kullanıcıya ait robotları tek sorguda id veya isim ile eşler"""
+    query = db.select(Robot).where(Robot.user_id == user_id)
+    if ids is not None:
+        query = query.where(Robot.id.in_(ids))
+    if names is not None:
+        query = query.where(Robot.name.in_(names))
+    robots = db.session.scalars(query).all()
+
+    if names is not None:
+        by_name = {}
+        for robot in robots:
+            # Aynı isimde birden fazla robot varsa ilk oluşturulan kullanılır
+            if robot.name not in by_name or robot.id < by_name[robot.name].id:
+                by_name[robot.name] = robot
+        return by_name
+    return {robot.id: robot for robot in robots}
+
+def parse_robot_id(value):
+    try:
+        return int(value)
+    except (ValueError, TypeError):
+        return None
+
+def write_readings(rows, user_id):
+    """Okumaları parçalar halinde çok satırlı INSERT ile yazar, özetleri günceller ve olay yayınlar"""
+    chunk_size = current_app.config['INGEST_CHUNK_SIZE']
+    table = SensorData.__table__
+    for start in range(0, len(rows), chunk_size):
+        db.session.execute(table.insert(), rows[start:start + chunk_size])
+
+    by_robot = defaultdict(list)
+    for row in rows:
+        by_robot[row['robot_id']].append(row)
+    record_sensor_stats(by_robot)
+    record_anomaly_state('reading', {
+        robot_id: [(row['timestamp'], {field: row[field] for field in SENSOR_FIELDS}) for row in robot_rows]
+        for robot_id, robot_rows in by_robot.items()
+    })
+    events = []
+    for robot_id, robot_rows in by_robot.items():
+        db.session.info.setdefault('recent_rows', defaultdict(list))[robot_id].extend(robot_rows)
+        latest = max(reversed(robot_rows), key=lambda r: r['timestamp'])
+        events.append({
+            'robot_id': robot_id,
+            'count': len(robot_rows),
+            'last_reading': latest['timestamp'].strftime('%Y-%m-%d %H:%M:%S'),
+            'latest': {field: latest[field] for field in SENSOR_FIELDS}
+        })
+    emit_events(user_id, 'readings', events)
+    record_rollups(rows)
+    record_histograms(rows)
+    if by_robot:
+        bump_data_version(user_id, by_robot.keys())
+    return len(rows)
+
+def drain_battery(user_id, drains):
+    """Robotların bataryasını verilen miktarlar kadar düşürür (0'ın altına inmez) ve olay yayınlar"""
+    for robot_id, drain in drains.items():
+        db.session.execute(
+            db.update(Robot).where(Robot.id == robot_id)
+            .values(battery=db.case((Robot.battery > drain, Robot.battery - drain), else_=0))
+        )
+    batteries = dict(db.session.execute(db.select(Robot.id, Robot.battery).where(Robot.id.in_(list(drains)))).all())
+    record_battery(batteries)
+    emit_events(user_id, 'robot_updated', [{'id': robot_id, 'battery': battery} for robot_id, battery in batteries.items()])
+
+def flush_write_jobs(jobs):
+    """Yazma kuyruğundan gelen partiyi tek transaction'da yazar (group commit)"""
+    rows_by_user = defaultdict(list)
+    drains_by_user = defaultdict(lambda: defaultdict(int))
+    for job in jobs:
+        rows_by_user[job.user_id].extend(job.rows)
+        for robot_id, drain in job.battery.items():
+            drains_by_user[job.user_id][robot_id] += drain
+
+    for user_id in rows_by_user.keys() | drains_by_user.keys():
+        # Kuyrukta beklerken silinen robotların okumaları atlanır
+        robot_ids = {row['robot_id'] for row in rows_by_user[user_id]} | drains_by_user[user_id].keys()
+        existing = set(db.session.scalars(
+            db.select(Robot.id).where(Robot.user_id == user_id, Robot.id.in_(robot_ids))
+        ))
+        drains = {robot_id: drain for robot_id, drain in drains_by_user[user_id].items() if robot_id in existing}
+        if drains:
+            drain_battery(user_id, drains)
+        rows = [row for row in rows_by_user[user_id] if row['robot_id'] in existing]
+        if rows:
+            write_readings(rows, user_id)
+    db.session.commit()
+
+def store_readings(rows, user_id, battery=None):
+    """Okumaları yazar: write-behind kapalıysa istek içinde, açıksa kuyruk üzerinden.
+    (ack, hata yanıtı) döndürür; hata yanıtı None ise okumalar kabul edilmiştir."""
+    write_queue = current_app.extensions['write_queue']
+    if write_queue is None:
+        if battery:
+            drain_battery(user_id, battery)
+        write_readings(rows, user_id)
+        db.session.commit()
+        return 'committed', None
+
+    ack = request.args.get('ack', current_app.config['WRITE_BEHIND_ACK'])
+    if ack not in ('queued', 'committed'):
+        return ack, (jsonify({'error': "ack 'queued' veya 'committed' olmalı"}), 400)
+    try:
+        job = write_queue.submit(user_id, rows, battery)
+    except QueueFull:
+        response = jsonify({'error': 'Yazma kuyruğu dolu, lütfen tekrar deneyin'})
+        response.headers['Retry-After'] = '1'
+        return ack, (response, 429)
+    if ack == 'queued':
+        return ack, None
+    if not job.wait(current_app.config['WRITE_BEHIND_ACK_TIMEOUT']):
+        return 'queued', (jsonify({'error': 'Okumalar kuyrukta, henüz yazılmadı', 'ack': 'queued'}), 504)
+    if job.error:
+        return ack, (jsonify({'error': job.error}), 500)
+    return ack, None
+
+# Filo simülasyonu
+def load_fleet_simulator(user_id=None, seed=None):
+    """Robotların mevcut batarya/durum ve son okumalarından simülatör oluşturur"""
+    query = (
+        db.select(Robot.id, Robot.user_id, Robot.status, Robot.battery,
+                  RobotStats.last_temperature, RobotStats.last_humidity, RobotStats.last_speed)
+        .outerjoin(RobotStats, RobotStats.robot_id == Robot.id)
+        .order_by(Robot.id)
+    )
+    if user_id is not None:
+        query = query.where(Robot.user_id == user_id)
+    return FleetSimulator(db.session.execute(query).all(), seed=seed)
+
+def write_robot_updates(updates, timestamp):
+    """Simülasyonda değişen batarya/durumları tek executemany ile yazar"""
+    if not updates:
+        return
+    table = Robot.__table__
+    db.session.execute(
+        table.update().where(table.c.id == db.bindparam('robot_id'))
+        .values(battery=db.bindparam('new_battery'), status=db.bindparam('new_status')),
+        [{'robot_id': robot_id, 'new_battery': battery, 'new_status': status}
+         for robot_id, _, status, battery, _ in updates]
+    )
+    record_battery({robot_id: battery for robot_id, _, _, battery, _ in updates}, timestamp)
+    # Yalnızca durum değişiklikleri yayınlanır; batarya listede sürümle birlikte yenilenir
+    changed = defaultdict(list)
+    for robot_id, user_id, status, battery, status_changed in updates:
+        if status_changed:
+            changed[user_id].append({'id': robot_id, 'status': status, 'battery': battery})
+    for user_id, payloads in changed.items():
+        emit_events(user_id, 'robot_updated', payloads)
+
+def simulate_fleet(simulator, ticks, interval, rate=0, commit_each_tick=True, progress=None):
+    """Simülatörü ticks adım çalıştırır ve okumaları toplu yükleme yolundan yazar.
+    Zaman damgaları şimdiye biten, interval saniye aralıklı bir seri oluşturur;
+    rate > 0 ise yazma hızı saniyede rate okuma ile sınırlanır."""
+    start = datetime.utcnow() - timedelta(seconds=interval * (ticks - 1))
+    written = status_changes = 0
+    generate_time = write_time = 0.0
+    started = time.perf_counter()
+    for tick in range(ticks):
+        step_started = time.perf_counter()
+        timestamp = start + timedelta(seconds=interval * tick)
+        rows_by_user = simulator.step(timestamp, interval)
+        updates = simulator.robot_updates()
+        generate_time += time.perf_counter() - step_started
+
+        step_started = time.perf_counter()
+        write_robot_updates(updates, timestamp)
+        for user_id, rows in rows_by_user.items():
+            written += write_readings(rows, user_id)
+        if commit_each_tick or tick == ticks - 1:
+            db.session.commit()
+        write_time += time.perf_counter() - step_started
+        status_changes += sum(1 for update in updates if update[4])
+
+        if rate:
+            # Hedef hızın önündeysek bekle
+            ahead = written / rate - (time.perf_counter() - started)
+            if ahead > 0:
+                time.sleep(ahead)
+        if progress:
+            progress(tick + 1, written, time.perf_counter() - started)
+
+    elapsed = time.perf_counter() - started
+    return {
+        'robots': len(simulator),
+        'ticks': ticks,
+        'readings': written,
+        'status_changes': status_changes,
+        'generate_seconds': round(generate_time, 3),
+        'write_seconds': round(write_time, 3),
+        'elapsed_seconds': round(elapsed, 3),
+        'readings_per_second': round(written / elapsed, 1) if elapsed else None
+    }
+
+# Dosyadan toplu okuma aktarımı (flask import-readings)
+IMPORT_MAX_LISTED = 1000
+
+def parse_import_batch(kind, first, items, default_timestamp):
+    """İşçi süreçte bir grup NDJSON satırını ya da JSON robot nesnesini doğrular.
+    (INSERT satırları, reddedilen okuma sayısı, reddedilen konumlar) döndürür."""
+    rows = []
+    rejected = 0
+    positions = []
+
+    def reject(position, count=1):
+        nonlocal rejected
+        rejected += count
+        if len(positions) < IMPORT_MAX_LISTED:
+            positions.append(position)
+
+    for offset, item in enumerate(items):
+        if kind == 'ndjson':
+            if not item.strip():
+                continue
+            try:
+                reading = json.loads(item)
+                robot_id = parse_robot_id(reading.get('robot_id'))
+                if robot_id is None:
+                    raise ValueError('robot_id gerekli')
+                rows.append(coerce_reading(robot_id, reading, parse_timestamp(reading.get('timestamp'), default_timestamp)))
+            except (ValueError, TypeError, AttributeError, OverflowError, OSError):
+                reject(first + offset)
+            continue
+
+        index = first + offset
+        try:
+            robot = json.loads(item)
+            robot_id = parse_robot_id(robot.get('robot_id'))
+            sensors = robot.get('sensors', [])
+        except (ValueError, AttributeError):
+            reject(f'robots[{index}]')
+            continue
+        if robot_id is None or not isinstance(sensors, list):
+            reject(f'robots[{index}]', len(sensors) if isinstance(sensors, list) else 1)
+            continue
+        for position, reading in enumerate(sensors):
+            try:
+                rows.append(coerce_reading(robot_id, reading, parse_timestamp(reading.get('timestamp'), default_timestamp)))
+            # Çok büyük epoch değerleri OverflowError/OSError verir
+            except (ValueError, TypeError, AttributeError, OverflowError, OSError):
+                reject(f'robots[{index}].sensors[{position}]')
+    return rows, rejected, positions
+
+def import_readings(path, user_id, fmt='auto', workers=1, batch_size=None, dry_run=False, progress=None):
+    """Dökümü gruplar halinde okur, işçi süreçlerde doğrular ve tek yazıcıyla yazar.
+    Her grup ayrı transaction'da commit edilir; dry_run yalnızca doğrular ve sahipliği kontrol eder."""
+    batch_size = batch_size or current_app.config['INGEST_CHUNK_SIZE']
+    kind = bulk_import.detect_format(path) if fmt == 'auto' else fmt
+    default_timestamp = datetime.utcnow()
+    owned, foreign = set(), set()
+    result = {'format': kind, 'parsed': 0, 'written': 0, 'rejected': 0, 'foreign': 0, 'rejected_at': []}
+    started = time.perf_counter()
+
+    def handle(rows, rejected, positions):
+        result['rejected'] += rejected
+        result['rejected_at'].extend(positions[:IMPORT_MAX_LISTED - len(result['rejected_at'])])
+        result['parsed'] += len(rows)
+        # Bu grupta ilk kez görülen robotların sahipliği tek sorguda kontrol edilir
+        unknown = {row['robot_id'] for row in rows} - owned - foreign
+        if unknown:
+            found = set(owned_robots(user_id, ids=unknown))
+            owned.update(found)
+            foreign.update(unknown - found)
+        if foreign:
+            accepted = [row for row in rows if row['robot_id'] in owned]
+            result['foreign'] += len(rows) - len(accepted)
+            rows = accepted
+        if rows and not dry_run:
+            write_readings(rows, user_id)
+            db.session.commit()
+            result['written'] += len(rows)
+        elif dry_run:
+            db.session.rollback()
+        if progress:
+            progress(result, time.perf_counter() - started)
+
+    with bulk_import.open_dump(path) as stream:
+        batches = (bulk_import.iter_ndjson_batches(stream, batch_size) if kind == 'ndjson'
+                   else bulk_import.iter_json_batches(stream, batch_size))
+        if workers < 1:
+            for first, items in batches:
+                handle(*parse_import_batch(kind, first, items, default_timestamp))
+        else:
+            # multiprocessing yalnızca bu komutta gerekir; uygulama açılışında yüklenmez
+            from concurrent.futures import ProcessPoolExecutor
+
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                # Sıra korunur; bellekte en fazla 2 × workers grup bekler
+                in_flight = deque()
+                for first, items in batches:
+                    in_flight.append(pool.submit(parse_import_batch, kind, first, items, default_timestamp))
+                    if len(in_flight) >= 2 * workers:
+                        handle(*in_flight.popleft().result())
+                while in_flight:
+                    handle(*in_flight.popleft().result())
+
+    result['robots'] = len(owned)
+    result['elapsed_seconds'] = round(time.perf_counter() - started, 3)
+    result['readings_per_second'] = round(result['parsed'] / result['elapsed_seconds'], 1) if result['elapsed_seconds'] else None
+    return result
+
 @login_manager.user_loader
 def load_user(user_id):
     return User.query.get(int(user_id))
 
 # Authentication Routes
-@app.route('/')
+@bp.route('/')
 def index():
     if current_user.is_authenticated:
-        return redirect(url_for('dashboard'))
+        return redirect(url_for('main.dashboard'))
     return render_template('index.html')
 
-@app.route('/register', methods=['GET', 'POST'])
+@bp.route('/register', methods=['GET', 'POST'])
 def register():
     if current_user.is_authenticated:
-        return redirect(url_for('dashboard'))
+        return redirect(url_for('main.dashboard'))
     
     if request.method == 'POST':
         username = request.form.get('username')
@@ -85,11 +1229,11 @@ def register():
         
         if User.query.filter_by(username=username).first():
             flash('Bu kullanıcı adı zaten kullanılıyor.', 'danger')
-            return redirect(url_for('register'))
+            return redirect(url_for('main.register'))
         
         if User.query.filter_by(email=email).first():
             flash('Bu email adresi zaten kayıtlı.', 'danger')
-            return redirect(url_for('register'))
+            return redirect(url_for('main.register'))
         
         user = User(username=username, email=email)
         user.set_password(password)
@@ -97,14 +1241,14 @@ def register():
         db.session.commit()
         
         flash('Kayıt başarılı! Şimdi giriş yapabilirsiniz.', 'success')
-        return redirect(url_for('login'))
+        return redirect(url_for('main.login'))
     
     return render_template('register.html')
 
-@app.route('/login', methods=['GET', 'POST'])
+@bp.route('/login', methods=['GET', 'POST'])
 def login():
     if current_user.is_authenticated:
-        return redirect(url_for('dashboard'))
+        return redirect(url_for('main.dashboard'))
     
     if request.method == 'POST':
         username = request.form.get('username')
@@ -117,46 +1261,113 @@ def login():
             login_user(user, remember=remember)
             next_page = request.args.get('next')
             flash(f'Hoş geldiniz, {user.username}!', 'success')
-            return redirect(next_page if next_page else url_for('dashboard'))
+            return redirect(next_page if next_page else url_for('main.dashboard'))
         else:
             flash('Kullanıcı adı veya şifre hatalı.', 'danger')
     
     return render_template('login.html')
 
-@app.route('/logout')
+@bp.route('/logout')
 @login_required
 def logout():
     logout_user()
     flash('Başarıyla çıkış yaptınız.', 'info')
-    return redirect(url_for('index'))
+    return redirect(url_for('main.index'))
 
-@app.route('/dashboard')
+@bp.route('/dashboard')
 @login_required
 def dashboard():
-    robots = Robot.query.filter_by(user_id=current_user.id).all()
-    return render_template('dashboard.html', robots=robots)
+    # Robot kartları istemci tarafında /api/robots üzerinden çizilir
+    return render_template('dashboard.html')
 
-@app.route('/reports')
+@bp.route('/reports')
 @login_required
 def reports():
     return render_template('reports.html')
 
 # REST API Endpoints
-@app.route('/api/robots', methods=['GET'])
+@bp.route('/api/robots', methods=['GET'])
 @login_required
 def get_robots():
-    robots = Robot.query.filter_by(user_id=current_user.id).all()
-    return jsonify([{
-        'id': r.id,
-        'name': r.name,
-        'model': r.model,
-        'status': r.status,
-        'battery': r.battery,
-        'created_at': r.created_at.strftime('%Y-%m-%d %H:%M'),
-        'sensor_count': len(r.sensors)
-    } for r in robots])
-
-@app.route('/api/robots', methods=['POST'])
+    def build():
+        # Sayılar ve son okuma tek JOIN ile özet tablosundan gelir (robot başına sorgu yok)
+        rows = db.session.execute(
+            db.select(Robot, RobotStats)
+            .outerjoin(RobotStats, RobotStats.robot_id == Robot.id)
+            .where(Robot.user_id == current_user.id)
+            .order_by(Robot.id)
+        ).all()
+        return [{**robot_to_dict(robot), **reading_summary(stats)} for robot, stats in rows]
+    return conditional_json(f'robots-{current_user.id}-{current_user.data_version}', build)
+
+ROBOT_SORT_COLUMNS = {'id': Robot.id, 'name': Robot.name, 'created_at': Robot.created_at}
+
+def encode_robot_cursor(robot, sort):
+    value = getattr(robot, sort)
+    return f'{value.isoformat() if isinstance(value, datetime) else value},{robot.id}'
+
+def decode_robot_cursor(cursor, sort):
+    """'<sıralama değeri>,<id>' biçimindeki imleci çözer (ad virgül içerebilir)"""
+    value, robot_id = cursor.rsplit(',', 1)
+    if sort == 'created_at':
+        value = datetime.fromisoformat(value)
+    elif sort == 'id':
+        value = int(value)
+    return value, int(robot_id)
+
+def robot_filters(user_id, statuses=(), model=None, prefix=None):
+    conditions = [Robot.user_id == user_id]
+    if statuses:
+        conditions.append(Robot.status.in_(statuses))
+    if model:
+        conditions.append(Robot.model == model)
+    if prefix:
+        # LIKE 'x%' SQLite'ta indekse inmez; aralık karşılaştırması (user_id, name) indeksini kullanır
+        conditions += [Robot.name >= prefix, Robot.name < prefix[:-1] + chr(ord(prefix[-1]) + 1)]
+    return conditions
+
+@bp.route('/api/robots/page')
+@login_required
+def get_robot_page():
+    """Robot listesinde imleçli sayfalama.
+    ?status=active,idle&model=&q=<ad öneki>&sort=id|name|created_at (azalan için -name)&cursor=&limit="""
+    sort = request.args.get('sort', 'id')
+    descending = sort.startswith('-')
+    sort = sort.lstrip('-')
+    if sort not in ROBOT_SORT_COLUMNS:
+        return jsonify({'error': 'sort id, name ya da created_at olmalı (azalan sıra için - öneki)'}), 400
+    try:
+        limit = min(max(int(request.args.get('limit', 50)), 1), 500)
+        cursor = request.args.get('cursor')
+        cursor = decode_robot_cursor(cursor, sort) if cursor else None
+        statuses = sorted({value.strip() for value in request.args.get('status', '').split(',') if value.strip()})
+        conditions = robot_filters(current_user.id, statuses, request.args.get('model'), request.args.get('q'))
+    except ValueError:
+        return jsonify({'error': 'Geçersiz limit, imleç veya arama'}), 400
+    column = ROBOT_SORT_COLUMNS[sort]
+
+    def build():
+        query = (db.select(Robot, RobotStats)
+                 .outerjoin(RobotStats, RobotStats.robot_id == Robot.id)
+                 .where(*conditions))
+        if cursor is not None:
+            key = db.tuple_(column, Robot.id)
+            query = query.where(key < cursor if descending else key > cursor)
+        order = (column.desc(), Robot.id.desc()) if descending else (column, Robot.id)
+        # Bir fazla satır sonraki sayfanın olup olmadığını gösterir
+        rows = db.session.execute(query.order_by(*order).limit(limit + 1)).all()
+        more = len(rows) > limit
+        rows = rows[:limit]
+        total = db.session.scalar(db.select(db.func.count(Robot.id)).where(*conditions))
+        return {
+            'items': [{**robot_to_dict(robot), **reading_summary(stats)} for robot, stats in rows],
+            'total': total,
+            'next_cursor': encode_robot_cursor(rows[-1][0], sort) if more else None
+        }
+    params = hashlib.sha1(request.query_string).hexdigest()[:16]
+    return conditional_json(f'robots-page-{current_user.id}-{current_user.data_version}-{params}', build)
+
+@bp.route('/api/robots', methods=['POST'])
 @login_required
 def add_robot():
     data = request.json
@@ -168,18 +1379,25 @@ def add_robot():
         user_id=current_user.id
     )
     db.session.add(robot)
+    db.session.flush()
+    emit_event(current_user.id, 'robot_created', robot_to_dict(robot, 0))
+    bump_data_version(current_user.id)
     db.session.commit()
     return jsonify({'message': 'Robot added', 'id': robot.id}), 201
 
-@app.route('/api/robots/<int:id>', methods=['DELETE'])
+@bp.route('/api/robots/<int:id>', methods=['DELETE'])
 @login_required
 def delete_robot(id):
     robot = Robot.query.filter_by(id=id, user_id=current_user.id).first_or_404()
     db.session.delete(robot)
+    emit_event(current_user.id, 'robot_deleted', {'id': id})
+    bump_data_version(current_user.id)
     db.session.commit()
+    recent_readings.discard(id)
+    remove_robot_exports(current_user.id, id)
     return jsonify({'message': 'Robot deleted'})
 
-@app.route('/api/robots/<int:id>', methods=['PUT'])
+@bp.route('/api/robots/<int:id>', methods=['PUT'])
 @login_required
 def update_robot(id):
     robot = Robot.query.filter_by(id=id, user_id=current_user.id).first_or_404()
@@ -188,49 +1406,360 @@ def update_robot(id):
     robot.model = data.get('model', robot.model)
     robot.status = data.get('status', robot.status)
     robot.battery = data.get('battery', robot.battery)
+    if isinstance(data.get('battery'), (int, float)):
+        record_battery({robot.id: robot.battery})
+    emit_event(current_user.id, 'robot_updated', robot_to_dict(robot))
+    bump_data_version(current_user.id, [robot.id])
     db.session.commit()
     return jsonify({'message': 'Robot updated'})
 
-@app.route('/api/sensors/<int:robot_id>')
+# Bellek tamponu kapalıyken grafik için okunan son okuma sayısı
+SENSOR_CHART_POINTS = 50
+
+@bp.route('/api/sensors/<int:robot_id>')
 @login_required
 def get_sensor_data(robot_id):
     robot = Robot.query.filter_by(id=robot_id, user_id=current_user.id).first_or_404()
-    sensors = SensorData.query.filter_by(robot_id=robot_id).order_by(SensorData.timestamp.desc()).limit(50).all()
-    return jsonify([{
-        'temperature': s.temperature,
-        'humidity': s.humidity,
-        'speed': s.speed,
-        'timestamp': s.timestamp.strftime('%H:%M:%S')
-    } for s in sensors])
-
-@app.route('/api/stats')
+    def build():
+        # Önce bellekteki tampon; sürüm tutmuyorsa son okumalar veritabanından yüklenir
+        if recent_readings.capacity:
+            readings = recent_readings.get(robot.id, robot.data_version)
+            if readings is not None:
+                return readings
+        rows = db.session.execute(
+            db.select(SensorData.temperature, SensorData.humidity, SensorData.speed, SensorData.timestamp)
+            .where(SensorData.robot_id == robot_id)
+            .order_by(SensorData.timestamp.desc())
+            .limit(recent_readings.capacity or SENSOR_CHART_POINTS)
+        ).mappings().all()
+        if not recent_readings.capacity:
+            # Tampon kapalı (RECENT_READINGS_SIZE=0): doğrudan veritabanından, yeniden eskiye
+            return [{**{field: row[field] for field in SENSOR_FIELDS},
+                     'timestamp': row['timestamp'].strftime('%H:%M:%S')} for row in rows]
+        return recent_readings.load(robot.id, robot.data_version, rows)
+    return conditional_json(f'sensors-{robot.id}-{robot.data_version}', build)
+
+def encode_sensor_cursor(timestamp, sensor_id):
+    return f'{timestamp.isoformat()},{sensor_id}'
+
+def decode_sensor_cursor(cursor):
+    """'<ISO zaman>,<id>' biçimindeki sayfalama imlecini çözer"""
+    timestamp, sensor_id = cursor.rsplit(',', 1)
+    return datetime.fromisoformat(timestamp), int(sensor_id)
+
+def sensor_page_query(robot_id, before=None, after=None, limit=100):
+    """(robot_id, timestamp) indeksi üzerinde keyset sayfalama sorgusu"""
+    key = db.tuple_(SensorData.timestamp, SensorData.id)
+    query = db.select(SensorData.id, SensorData.temperature, SensorData.humidity,
+                      SensorData.speed, SensorData.timestamp).where(SensorData.robot_id == robot_id)
+    if after is not None:
+        # Daha yeni kayıtlar: artan sırada okunur, yanıtta ters çevrilir
+        return query.where(key > after).order_by(SensorData.timestamp, SensorData.id).limit(limit)
+    if before is not None:
+        query = query.where(key < before)
+    return query.order_by(SensorData.timestamp.desc(), SensorData.id.desc()).limit(limit)
+
+@bp.route('/api/sensors/<int:robot_id>/page')
 @login_required
-def get_stats():
-    robots = Robot.query.filter_by(user_id=current_user.id).all()
-    total_sensors = sum(len(r.sensors) for r in robots)
+def get_sensor_page(robot_id):
+    """Tüm sensör geçmişinde before/after imleçleriyle sayfalama (yeniden eskiye)"""
+    robot = Robot.query.filter_by(id=robot_id, user_id=current_user.id).first_or_404()
+    
+    try:
+        limit = min(max(int(request.args.get('limit', 100)), 1), 1000)
+        before = request.args.get('before')
+        after = request.args.get('after')
+        before = decode_sensor_cursor(before) if before else None
+        after = decode_sensor_cursor(after) if after else None
+    except ValueError:
+        return jsonify({'error': 'Geçersiz limit veya imleç'}), 400
+    if before and after:
+        return jsonify({'error': 'before ve after birlikte kullanılamaz'}), 400
+    
+    rows = db.session.execute(sensor_page_query(robot.id, before, after, limit)).all()
+    if after:
+        rows.reverse()
+    
+    items = [{
+        'id': r.id,
+        'temperature': r.temperature,
+        'humidity': r.humidity,
+        'speed': r.speed,
+        'timestamp': r.timestamp.isoformat()
+    } for r in rows]
+    
     return jsonify({
-        'total_robots': len(robots),
-        'active_robots': len([r for r in robots if r.status == 'active']),
-        'total_sensors': total_sensors
+        'items': items,
+        # Daha eski kayıtlar için sonraki imleç (sayfa doluysa)
+        'next_before': encode_sensor_cursor(rows[-1].timestamp, rows[-1].id) if rows and (after or len(rows) == limit) else None,
+        # Daha yeni kayıtları almak için imleç
+        'next_after': encode_sensor_cursor(rows[0].timestamp, rows[0].id) if rows else None
     })
 
-@app.route('/api/simulate/<int:robot_id>', methods=['POST'])
+def parse_query_timestamp(value, default):
+    """Sorgu parametresindeki ISO 8601 ya da epoch değerini datetime'a çevirir"""
+    if value is None or value == '':
+        return default
+    try:
+        return parse_timestamp(float(value), default)
+    except ValueError:
+        return parse_timestamp(value, default)
+
+def choose_resolution(start, end):
+    """Aralık için yeterli nokta veren en kaba rollup çözünürlüğünü seçer"""
+    span = (end - start).total_seconds()
+    min_points = current_app.config['HISTORY_MIN_POINTS']
+    for resolution in ('1d', '1h', '1m'):
+        if span / ROLLUP_RESOLUTIONS[resolution][0] >= min_points:
+            return resolution
+    return 'raw'
+
+@bp.route('/api/sensors/<int:robot_id>/history')
+@login_required
+def get_sensor_history(robot_id):
+    """Zaman aralığına göre sensör geçmişi (raw veya dakika/saat/gün rollup)"""
+    robot = Robot.query.filter_by(id=robot_id, user_id=current_user.id).first_or_404()
+    
+    try:
+        end = parse_query_timestamp(request.args.get('to'), datetime.utcnow())
+        start = parse_query_timestamp(request.args.get('from'), end - timedelta(days=1))
+    except (ValueError, TypeError):
+        return jsonify({'error': 'from/to ISO 8601 veya epoch saniyesi olmalı'}), 400
+    if start > end:
+        return jsonify({'error': 'from, to değerinden büyük olamaz'}), 400
+    
+    resolution = request.args.get('resolution', 'auto')
+    if resolution == 'auto':
+        resolution = choose_resolution(start, end)
+    if resolution != 'raw' and resolution not in ROLLUP_RESOLUTIONS:
+        return jsonify({'error': 'resolution auto, raw, 1m, 1h veya 1d olmalı'}), 400
+    
+    limit = current_app.config['HISTORY_MAX_POINTS']
+    if resolution == 'raw':
+        rows = db.session.execute(
+            db.select(SensorData.timestamp, SensorData.temperature, SensorData.humidity, SensorData.speed)
+            .where(SensorData.robot_id == robot.id,
+                   SensorData.timestamp >= start,
+                   SensorData.timestamp <= end)
+            .order_by(SensorData.timestamp)
+            .limit(limit + 1)
+        ).all()
+        points = [{
+            'timestamp': r.timestamp.isoformat(),
+            'temperature': r.temperature,
+            'humidity': r.humidity,
+            'speed': r.speed
+        } for r in rows[:limit]]
+    else:
+        truncate = ROLLUP_RESOLUTIONS[resolution][1]
+        rows = db.session.scalars(
+            db.select(SensorRollup)
+            .where(SensorRollup.robot_id == robot.id,
+                   SensorRollup.resolution == resolution,
+                   SensorRollup.bucket >= truncate(start),
+                   SensorRollup.bucket <= end)
+            .order_by(SensorRollup.bucket)
+            .limit(limit + 1)
+        ).all()
+        points = []
+        for r in rows[:limit]:
+            point = {'timestamp': r.bucket.isoformat(), 'count': r.count}
+            for field in SENSOR_FIELDS:
+                point[field] = {
+                    'mean': round(getattr(r, f'{field}_sum') / r.count, 2) if r.count else None,
+                    'min': getattr(r, f'{field}_min'),
+                    'max': getattr(r, f'{field}_max')
+                }
+            points.append(point)
+    
+    return jsonify({
+        'robot_id': robot.id,
+        'resolution': resolution,
+        'from': start.isoformat(),
+        'to': end.isoformat(),
+        'truncated': len(rows) > limit,
+        'points': points
+    })
+
+# ?limit= verilmezse robot başına döndürülen okuma sayısı (bellek tamponunun boyutundan bağımsız)
+SENSOR_BATCH_DEFAULT_LIMIT = 50
+
+@bp.route('/api/sensors/batch')
+@login_required
+def get_sensor_batch():
+    """Birden çok robotun okumalarını tek SQL sorgusuyla, robot başına sütun dizileri olarak döndürür.
+    ?ids=1,2,3&from=&to=&limit= ; zaman damgaları epoch saniyesidir, her robot için en yeni limit okuma."""
+    try:
+        ids = sorted({int(value) for value in request.args.get('ids', '').split(',') if value.strip()})
+        end = parse_query_timestamp(request.args.get('to'), datetime.utcnow())
+        start = parse_query_timestamp(request.args.get('from'), end - timedelta(days=1))
+        limit = min(int(request.args.get('limit', SENSOR_BATCH_DEFAULT_LIMIT)), current_app.config['HISTORY_MAX_POINTS'])
+    except (ValueError, TypeError):
+        return jsonify({'error': 'ids virgülle ayrılmış robot id listesi, from/to ISO 8601 veya epoch saniyesi, '
+                                 'limit sayı olmalı'}), 400
+    if not ids:
+        return jsonify({'error': 'ids gerekli'}), 400
+    if len(ids) > current_app.config['SENSOR_BATCH_MAX_ROBOTS']:
+        return jsonify({'error': f'En fazla {current_app.config["SENSOR_BATCH_MAX_ROBOTS"]} robot sorgulanabilir'}), 400
+    if start > end or limit < 1:
+        return jsonify({'error': 'from, to değerinden büyük, limit 1\'den küçük olamaz'}), 400
+
+    def build():
+        # Robot başına en yeni limit + 1 okuma (fazlası kesildiğini gösterir) ilişkili alt sorguyla
+        # (robot_id, timestamp) indeksinden seçilir; okuması olmayan robotlar dış birleştirme ile
+        # tek satır olarak gelir, sahiplik de aynı sorguda kontrol edilir
+        recent = db.aliased(SensorData)
+        latest = (
+            db.select(recent.id)
+            .where(recent.robot_id == Robot.id, recent.timestamp >= start, recent.timestamp <= end)
+            .order_by(recent.timestamp.desc(), recent.id.desc())
+            .limit(limit + 1)
+            .correlate(Robot)
+        )
+        rows = db.session.execute(
+            db.select(Robot.id, SensorData.timestamp, SensorData.temperature, SensorData.humidity, SensorData.speed)
+            .outerjoin(SensorData, SensorData.id.in_(latest))
+            .where(Robot.user_id == current_user.id, Robot.id.in_(ids))
+            .order_by(Robot.id, SensorData.timestamp, SensorData.id)
+        ).all()
+
+        robots = {}
+        for robot_id, timestamp, temperature, humidity, speed in rows:
+            series = robots.get(robot_id)
+            if series is None:
+                series = robots[robot_id] = {'t': [], 'temperature': [], 'humidity': [], 'speed': [],
+                                             'truncated': False}
+            if timestamp is None:
+                continue
+            series['t'].append(timestamp.replace(tzinfo=timezone.utc).timestamp())
+            series['temperature'].append(temperature)
+            series['humidity'].append(humidity)
+            series['speed'].append(speed)
+        for series in robots.values():
+            if len(series['t']) > limit:
+                # Artan sırada ilk satır aralıktaki limit + 1'inci (en eski) okumadır
+                series['truncated'] = True
+                for field in ('t', 'temperature', 'humidity', 'speed'):
+                    del series[field][0]
+        return {
+            'from': start.isoformat(),
+            'to': end.isoformat(),
+            'limit': limit,
+            'robots': robots,
+            'missing': [robot_id for robot_id in ids if robot_id not in robots]
+        }
+
+    # Kullanıcının veri sürümü her yazmada artar; aralık ve parametreler etikete dahildir
+    params = hashlib.sha1(f'{ids}-{start.isoformat()}-{end.isoformat()}-{limit}'.encode()).hexdigest()[:16]
+    tag = f'sensors-batch-{current_user.id}-{current_user.data_version}-{params}'
+    return conditional_json(tag, build)
+
+@bp.route('/api/alerts')
+@login_required
+def get_alerts():
+    """Anomali durum tablosundan uyarılar; sensör geçmişi okunmaz"""
+    def compute():
+        thresholds = anomaly_thresholds()
+        rows = db.session.execute(
+            db.select(Robot.id, Robot.name, Robot.status, Robot.battery, RobotAnomalyState)
+            .outerjoin(RobotAnomalyState, RobotAnomalyState.robot_id == Robot.id)
+            .where(Robot.user_id == current_user.id)
+            .order_by(Robot.id)
+        ).all()
+        table = RobotAnomalyState.__table__
+        alerts = []
+        for robot_id, name, status, battery, state in rows:
+            state = {column.name: getattr(state, column.name) for column in table.columns} if state \
+                else anomaly.empty_state(robot_id)
+            for alert in anomaly.evaluate(state, status, battery, thresholds):
+                alert.update({
+                    'robot_id': robot_id,
+                    'robot_name': name,
+                    'reading_at': state['reading_at'].strftime('%Y-%m-%d %H:%M:%S') if state['reading_at'] else None
+                })
+                alerts.append(alert)
+        alerts.sort(key=lambda a: (a['severity'] != 'critical', a['robot_id']))
+        return {
+            'alerts': alerts,
+            'robots_checked': len(rows),
+            'critical': sum(1 for a in alerts if a['severity'] == 'critical'),
+            'warning': sum(1 for a in alerts if a['severity'] == 'warning')
+        }
+    tag = f'alerts-{current_user.id}-{current_user.data_version}'
+    return conditional_json(tag, lambda: cached_value(current_user.id, tag, compute))
+
+@bp.route('/api/stats')
+@login_required
+def get_stats():
+    def compute():
+        total_robots, active_robots, idle_robots, avg_battery, total_sensors = db.session.execute(
+            db.select(
+                db.func.count(Robot.id),
+                db.func.coalesce(db.func.sum(db.case((Robot.status == 'active', 1), else_=0)), 0),
+                db.func.coalesce(db.func.sum(db.case((Robot.status == 'idle', 1), else_=0)), 0),
+                db.func.avg(Robot.battery),
+                db.func.coalesce(db.func.sum(RobotStats.count), 0)
+            )
+            .select_from(Robot)
+            .outerjoin(RobotStats, RobotStats.robot_id == Robot.id)
+            .where(Robot.user_id == current_user.id)
+        ).one()
+        return {
+            'total_robots': total_robots,
+            'active_robots': active_robots,
+            'idle_robots': idle_robots,
+            'avg_battery': round(avg_battery, 1) if avg_battery is not None else 0,
+            'total_sensors': total_sensors
+        }
+    tag = f'stats-{current_user.id}-{current_user.data_version}'
+    return conditional_json(tag, lambda: cached_value(current_user.id, tag, compute))
+
+@bp.route('/api/simulate/<int:robot_id>', methods=['POST'])
 @login_required
 def simulate_data(robot_id):
     robot = Robot.query.filter_by(id=robot_id, user_id=current_user.id).first_or_404()
-    sensor = SensorData(
-        robot_id=robot_id,
-        temperature=round(random.uniform(20, 30), 1),
-        humidity=round(random.uniform(40, 60), 1),
-        speed=round(random.uniform(0, 5), 2)
-    )
-    robot.battery = max(0, robot.battery - random.randint(1, 5))
-    db.session.add(sensor)
-    db.session.commit()
-    return jsonify({'message': 'Sensor data simulated'})
+    ack, error = store_readings([{
+        'robot_id': robot.id,
+        'temperature': round(random.uniform(20, 30), 1),
+        'humidity': round(random.uniform(40, 60), 1),
+        'speed': round(random.uniform(0, 5), 2),
+        'timestamp': datetime.utcnow()
+    }], current_user.id, battery={robot.id: random.randint(1, 5)})
+    if error:
+        return error
+    return jsonify({'message': 'Sensor data simulated', 'ack': ack}), 202 if ack == 'queued' else 200
+
+@bp.route('/api/simulate/fleet', methods=['POST'])
+@login_required
+def simulate_fleet_batch():
+    """Kullanıcının tüm filosu için ticks adımlık simülasyon verisi üretir ve tek transaction'da yazar"""
+    data = request.get_json(silent=True) or {}
+    try:
+        ticks = int(data.get('ticks', 1))
+        interval = float(data.get('interval_seconds', 1))
+        seed = data.get('seed')
+        seed = int(seed) if seed is not None else None
+    except (ValueError, TypeError):
+        return jsonify({'error': 'ticks, interval_seconds ve seed sayı olmalı'}), 400
+    if ticks < 1 or interval <= 0:
+        return jsonify({'error': 'ticks en az 1, interval_seconds pozitif olmalı'}), 400
+
+    simulator = load_fleet_simulator(current_user.id, seed=seed)
+    if not len(simulator):
+        return jsonify({'error': 'Simüle edilecek robot yok'}), 400
+    limit = current_app.config['FLEET_SIMULATION_MAX_READINGS']
+    if ticks * len(simulator) > limit:
+        return jsonify({'error': f'En fazla {limit} okuma üretilebilir (robot × adım)'}), 400
+
+    try:
+        result = simulate_fleet(simulator, ticks, interval, commit_each_tick=False)
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+    return jsonify(result)
 
 # YENİ: Toplu sensor verisi yükleme (robot_id ile)
-@app.route('/api/robots/bulk-upload', methods=['POST'])
+@bp.route('/api/robots/bulk-upload', methods=['POST'])
 @login_required
 def bulk_upload_sensors():
     """Toplu sensor verisi yükleme - robot_id ile"""
@@ -240,12 +1769,17 @@ def bulk_upload_sensors():
         if not data or 'robots' not in data:
             return jsonify({'error': 'JSON formatı hatalı. "robots" dizisi gerekli.'}), 400
         
+        # Robot kontrolü (kullanıcıya ait olmalı) - tüm robotlar için tek sorgu
+        requested_ids = {parse_robot_id(r.get('robot_id')) for r in data['robots']}
+        requested_ids.discard(None)
+        robots = owned_robots(current_user.id, ids=requested_ids)
+        
         results = []
-        total_sensors = 0
+        rows = []
+        now = datetime.utcnow()
         
         for robot_data in data['robots']:
             robot_id = robot_data.get('robot_id')
-            sensors_data = robot_data.get('sensors', [])
             
             if not robot_id:
                 results.append({
@@ -254,8 +1788,7 @@ def bulk_upload_sensors():
                 })
                 continue
             
-            # Robot kontrolü (kullanıcıya ait olmalı)
-            robot = Robot.query.filter_by(id=robot_id, user_id=current_user.id).first()
+            robot = robots.get(parse_robot_id(robot_id))
             
             if not robot:
                 results.append({
@@ -265,43 +1798,32 @@ def bulk_upload_sensors():
                 })
                 continue
             
-            # Sensor verilerini ekle
-            count = 0
-            for sensor_data in sensors_data:
-                try:
-                    sensor = SensorData(
-                        robot_id=robot_id,
-                        temperature=float(sensor_data.get('temperature', 0)),
-                        humidity=float(sensor_data.get('humidity', 0)),
-                        speed=float(sensor_data.get('speed', 0))
-                    )
-                    db.session.add(sensor)
-                    count += 1
-                except (ValueError, TypeError) as e:
-                    continue
-            
-            total_sensors += count
+            robot_rows = coerce_readings(robot.id, robot_data.get('sensors', []), now)
+            rows.extend(robot_rows)
             results.append({
                 'robot_id': robot_id,
                 'robot_name': robot.name,
                 'status': 'success',
-                'count': count
+                'count': len(robot_rows)
             })
         
-        db.session.commit()
+        ack, error = store_readings(rows, current_user.id)
+        if error:
+            return error
         
         return jsonify({
             'message': 'Toplu yükleme başarılı',
-            'total_sensors': total_sensors,
-            'results': results
-        }), 200
+            'total_sensors': len(rows),
+            'results': results,
+            'ack': ack
+        }), 202 if ack == 'queued' else 200
         
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
 # Tekli robot için sensor verisi yükleme
-@app.route('/api/robots/<int:robot_id>/upload-sensors', methods=['POST'])
+@bp.route('/api/robots/<int:robot_id>/upload-sensors', methods=['POST'])
 @login_required
 def upload_sensors(robot_id):
     """Tekli robot için sensor verisi yükleme"""
@@ -312,32 +1834,22 @@ def upload_sensors(robot_id):
         if not data or 'sensors' not in data:
             return jsonify({'error': 'JSON formatı hatalı. "sensors" dizisi gerekli.'}), 400
         
-        count = 0
-        for sensor_data in data['sensors']:
-            try:
-                sensor = SensorData(
-                    robot_id=robot_id,
-                    temperature=float(sensor_data.get('temperature', 0)),
-                    humidity=float(sensor_data.get('humidity', 0)),
-                    speed=float(sensor_data.get('speed', 0))
-                )
-                db.session.add(sensor)
-                count += 1
-            except (ValueError, TypeError):
-                continue
-        
-        db.session.commit()
+        rows = coerce_readings(robot.id, data['sensors'], datetime.utcnow())
+        ack, error = store_readings(rows, current_user.id)
+        if error:
+            return error
         
         return jsonify({
-            'message': f'{count} sensor verisi başarıyla yüklendi',
-            'count': count
-        }), 200
+            'message': f'{len(rows)} sensor verisi başarıyla yüklendi',
+            'count': len(rows),
+            'ack': ack
+        }), 202 if ack == 'queued' else 200
         
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
-@app.route('/api/robots/smart-upload', methods=['POST'])
+@bp.route('/api/robots/smart-upload', methods=['POST'])
 @login_required
 def smart_upload():
     """Akıllı toplu yükleme - robot varsa güncelle, yoksa oluştur"""
@@ -348,26 +1860,20 @@ def smart_upload():
     
     try:
         results = []
-        total_sensors = 0
+        rows = []
         new_robots = 0
+        now = datetime.utcnow()
         
+        # Mevcut robotları tek sorguda bul
+        names = {r.get('name') for r in data['robots'] if r.get('name')}
+        robots = owned_robots(current_user.id, names=names)
+        
+        # Eksik robotları oluştur (tek flush)
+        pending = []
         for robot_data in data['robots']:
             robot_name = robot_data.get('name')
             robot_model = robot_data.get('model')
-            sensors_data = robot_data.get('sensors', [])
-            
-            if not robot_name or not robot_model:
-                results.append({
-                    'name': robot_name or 'Unknown',
-                    'status': 'error',
-                    'message': 'Robot adı ve model gerekli'
-                })
-                continue
-            
-            # Robot varsa bul, yoksa oluştur
-            robot = Robot.query.filter_by(name=robot_name, user_id=current_user.id).first()
-            
-            if not robot:
+            if robot_name and robot_model and robot_name not in robots:
                 robot = Robot(
                     name=robot_name,
                     model=robot_model,
@@ -376,34 +1882,47 @@ def smart_upload():
                     user_id=current_user.id
                 )
                 db.session.add(robot)
-                db.session.flush()
+                robots[robot_name] = robot
+                pending.append(robot)
                 new_robots += 1
-                created = True
-            else:
-                created = False
+        if pending:
+            db.session.flush()
+            for robot in pending:
+                emit_event(current_user.id, 'robot_created', robot_to_dict(robot, 0))
+            bump_data_version(current_user.id)
+        
+        created_ids = {robot.id for robot in pending}
+        reported = set()
+        
+        for robot_data in data['robots']:
+            robot_name = robot_data.get('name')
+            robot_model = robot_data.get('model')
             
-            # Sensor verilerini ekle
-            count = 0
-            for sensor_data in sensors_data:
-                sensor = SensorData(
-                    robot_id=robot.id,
-                    temperature=float(sensor_data.get('temperature', 0)),
-                    humidity=float(sensor_data.get('humidity', 0)),
-                    speed=float(sensor_data.get('speed', 0))
-                )
-                db.session.add(sensor)
-                count += 1
+            if not robot_name or not robot_model:
+                results.append({
+                    'name': robot_name or 'Unknown',
+                    'status': 'error',
+                    'message': 'Robot adı ve model gerekli'
+                })
+                continue
+            
+            robot = robots[robot_name]
+            # Robot yalnızca ilk geçtiği kayıtta "oluşturuldu" sayılır
+            created = robot.id in created_ids and robot.id not in reported
+            reported.add(robot.id)
             
-            total_sensors += count
+            robot_rows = coerce_readings(robot.id, robot_data.get('sensors', []), now, skip_invalid=False)
+            rows.extend(robot_rows)
             results.append({
                 'robot_id': robot.id,
                 'name': robot.name,
                 'model': robot.model,
                 'status': 'success',
                 'created': created,
-                'sensor_count': count
+                'sensor_count': len(robot_rows)
             })
         
+        total_sensors = write_readings(rows, current_user.id)
         db.session.commit()
         return jsonify({
             'message': f'İşlem başarılı! {new_robots} yeni robot oluşturuldu, {total_sensors} sensor verisi yüklendi',
@@ -416,281 +1935,716 @@ def smart_upload():
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
-@app.route('/api/reports/summary')
+@bp.route('/api/ingest/ndjson', methods=['POST'])
+@login_required
+def ingest_ndjson():
+    """Satır satır JSON (NDJSON) akışından sensor verisi yükleme - gövde belleğe alınmaz"""
+    chunk_size = current_app.config['INGEST_CHUNK_SIZE']
+    max_line = current_app.config['NDJSON_MAX_LINE_BYTES']
+    # Hatalı satır numaralarından en fazla bu kadarı yanıtta listelenir
+    max_listed = 1000
+
+    owned, foreign = set(), set()
+    counts = defaultdict(int)
+    rejected_lines = []
+    rejected = 0
+    pending = []
+    line_no = 0
+    committed = 0
+
+    def reject(number):
+        nonlocal rejected
+        rejected += 1
+        if len(rejected_lines) < max_listed:
+            rejected_lines.append(number)
+
+    def flush():
+        nonlocal committed
+        # Bu partide ilk kez görülen robotların sahipliği tek sorguda kontrol edilir
+        unknown = {robot_id for _, robot_id, _ in pending} - owned - foreign
+        if unknown:
+            found = set(owned_robots(current_user.id, ids=unknown))
+            owned.update(found)
+            foreign.update(unknown - found)
+
+        rows = []
+        for number, robot_id, row in pending:
+            if robot_id in owned:
+                rows.append(row)
+                counts[robot_id] += 1
+            else:
+                reject(number)
+        pending.clear()
+
+        if rows:
+            write_readings(rows, current_user.id)
+            db.session.commit()
+            committed += len(rows)
+
+    def handle(line):
+        if not line.strip():
+            return
+        try:
+            item = json.loads(line)
+            robot_id = parse_robot_id(item.get('robot_id'))
+            if robot_id is None:
+                raise ValueError('robot_id gerekli')
+            timestamp = parse_timestamp(item.get('timestamp'), datetime.utcnow())
+            pending.append((line_no, robot_id, coerce_reading(robot_id, item, timestamp)))
+        # Tek hatalı satır akışı kesmez; önceki parçalar zaten commit edilmiş olabilir
+        except (ValueError, TypeError, AttributeError, OverflowError, OSError):
+            reject(line_no)
+            return
+        if len(pending) >= chunk_size:
+            flush()
+
+    try:
+        buffer = b''
+        oversized = False
+        while True:
+            chunk = request.stream.read(64 * 1024)
+            if not chunk:
+                break
+            buffer += chunk
+            lines = buffer.split(b'\n')
+            buffer = lines.pop()
+            for line in lines:
+                line_no += 1
+                if oversized:
+                    # Sınırı aşan satırın geri kalanı atlanır
+                    oversized = False
+                    reject(line_no)
+                    continue
+                handle(line)
+            if len(buffer) > max_line:
+                buffer = b''
+                oversized = True
+
+        if buffer or oversized:
+            line_no += 1
+            if oversized:
+                reject(line_no)
+            else:
+                handle(buffer)
+        flush()
+
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e), 'total_sensors': committed}), 500
+
+    return jsonify({
+        'message': f'{committed} sensor verisi yüklendi, {rejected} satır reddedildi',
+        'total_sensors': committed,
+        'results': [{'robot_id': robot_id, 'count': count} for robot_id, count in sorted(counts.items())],
+        'rejected': rejected,
+        'rejected_lines': sorted(rejected_lines)
+    })
+
+@bp.route('/api/reports/summary')
 @login_required
 def get_report_summary():
     """Rapor özeti"""
-    robots = Robot.query.filter_by(user_id=current_user.id).all()
-    
-    report_data = []
-    for robot in robots:
-        sensors = robot.sensors
-        
-        if sensors:
-            avg_temp = sum(s.temperature for s in sensors) / len(sensors)
-            avg_humidity = sum(s.humidity for s in sensors) / len(sensors)
-            avg_speed = sum(s.speed for s in sensors) / len(sensors)
-            last_reading = max(s.timestamp for s in sensors)
-        else:
-            avg_temp = avg_humidity = avg_speed = 0
-            last_reading = None
-        
-        report_data.append({
-            'id': robot.id,
-            'name': robot.name,
-            'model': robot.model,
-            'status': robot.status,
-            'battery': robot.battery,
-            'sensor_count': len(sensors),
-            'avg_temperature': round(avg_temp, 2),
-            'avg_humidity': round(avg_humidity, 2),
-            'avg_speed': round(avg_speed, 2),
-            'last_reading': last_reading.strftime('%Y-%m-%d %H:%M:%S') if last_reading else 'N/A',
-            'created_at': robot.created_at.strftime('%Y-%m-%d %H:%M:%S')
+    def compute():
+        report_data = []
+        for summary in robot_summaries(current_user.id):
+            robot = summary['robot']
+            report_data.append({
+                'id': robot.id,
+                'name': robot.name,
+                'model': robot.model,
+                'status': robot.status,
+                'battery': robot.battery,
+                'sensor_count': summary['sensor_count'],
+                'avg_temperature': summary['avg_temperature'],
+                'avg_humidity': summary['avg_humidity'],
+                'avg_speed': summary['avg_speed'],
+                'last_reading': summary['last_reading'],
+                'percentiles': summary['percentiles'],
+                'created_at': robot.created_at.strftime('%Y-%m-%d %H:%M:%S')
+            })
+        return report_data
+    tag = f'summary-{current_user.id}-{current_user.data_version}'
+    return conditional_json(tag, lambda: cached_value(current_user.id, tag, compute))
+
+@bp.route('/api/reports/percentiles')
+@login_required
+def get_report_percentiles():
+    """Filo ve robot bazında p50/p95/p99 ve dağılım; histogram skeçleri birleştirilerek hesaplanır"""
+    try:
+        start = parse_query_timestamp(request.args.get('from'), None)
+        end = parse_query_timestamp(request.args.get('to'), None)
+    except (ValueError, TypeError):
+        return jsonify({'error': 'from/to ISO 8601 veya epoch saniyesi olmalı'}), 400
+    if start and end and start > end:
+        return jsonify({'error': 'from, to değerinden büyük olamaz'}), 400
+
+    def compute():
+        widths = current_app.config['HISTOGRAM_BIN_WIDTHS']
+        histograms = load_histograms(current_user.id, start, end)
+        robots = db.session.execute(
+            db.select(Robot.id, Robot.name).where(Robot.user_id == current_user.id).order_by(Robot.id)
+        ).all()
+        fleet = {}
+        for metric, width in widths.items():
+            merged = sketches.merge(*(h.get(metric, {}) for h in histograms.values()))
+            fleet[metric] = sketches.percentiles(merged, width)
+            fleet[metric]['bin_width'] = width
+            fleet[metric]['distribution'] = sketches.distribution(merged, width)
+        return {
+            'from': start.isoformat() if start else None,
+            'to': end.isoformat() if end else None,
+            'resolution': histogram_resolution(start, end),
+            'fleet': fleet,
+            'robots': [{'id': robot_id, 'name': name, **histogram_percentiles(histograms.get(robot_id, {}))}
+                       for robot_id, name in robots]
+        }
+    tag = f'percentiles-{current_user.id}-{current_user.data_version}-{request.args.get("from")}-{request.args.get("to")}'
+    return conditional_json(tag, lambda: cached_value(current_user.id, tag, compute))
+
+XLSX_MIMETYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+# Veri sayfası satırları veritabanından bu büyüklükte parçalarla okunur
+EXPORT_FETCH_SIZE = 5000
+
+def spooled_workbook(directory=None):
+    """Satırları bellekte tutmadan geçici dosyaya yazan (constant_memory) Workbook"""
+    # xlsxwriter yalnızca ilk raporda yüklenir; worker açılışını yavaşlatmaz
+    import xlsxwriter
+
+    fd, path = tempfile.mkstemp(suffix='.xlsx', dir=directory)
+    os.close(fd)
+    return xlsxwriter.Workbook(path, {'constant_memory': True}), path
+
+def export_path(key, version):
+    return os.path.join(current_app.config['EXPORT_CACHE_DIR'], f'{key}-v{version}.xlsx')
+
+def robot_export_key(user_id, robot_id):
+    # Silinen robotun id'si (SQLite) başka kullanıcının yeni robotuna verilebilir; anahtar sahibi de içerir
+    return f'robot-u{user_id}-r{robot_id}'
+
+def remove_robot_exports(user_id, robot_id):
+    """Silinen robotun önbellekteki rapor dosyalarını kaldırır (sahipsiz eski 'robot-r<id>' adları dahil)"""
+    cache_dir = current_app.config['EXPORT_CACHE_DIR']
+    prefixes = (f'{robot_export_key(user_id, robot_id)}-v', f'robot-r{robot_id}-v')
+    try:
+        names = os.listdir(cache_dir)
+    except OSError:
+        return
+    for name in names:
+        if name.startswith(prefixes) and name.endswith('.xlsx'):
+            try:
+                os.remove(os.path.join(cache_dir, name))
+            except OSError:
+                pass
+
+def cached_export(user_id, key, version, build):
+    """Aynı veri sürümü için oluşturulmuş dosyayı yeniden kullanır, yoksa oluşturur"""
+    cached = response_cache.get(f'u{user_id}:export:{key}-v{version}')
+    if cached and os.path.exists(cached):
+        return cached
+
+    cache_dir = current_app.config['EXPORT_CACHE_DIR']
+    os.makedirs(cache_dir, exist_ok=True)
+    path = export_path(key, version)
+    if os.path.exists(path):
+        response_cache.set(f'u{user_id}:export:{key}-v{version}', path)
+        return path
+
+    # Dosya aynı dizinde oluşturulup tek adımda yerine taşınır
+    os.replace(build(cache_dir), path)
+
+    # Aynı raporun eski sürümleri artık kullanılmaz
+    for name in os.listdir(cache_dir):
+        if name.startswith(f'{key}-v') and name != os.path.basename(path):
+            try:
+                os.remove(os.path.join(cache_dir, name))
+            except OSError:
+                pass
+    response_cache.set(f'u{user_id}:export:{key}-v{version}', path)
+    evict_export_files(cache_dir, current_app.config['EXPORT_CACHE_MAX_BYTES'], current_app.config['EXPORT_CACHE_MAX_AGE_SECONDS'])
+    return path
+
+def send_export(path, download_name, etag):
+    return send_file(path, mimetype=XLSX_MIMETYPE, as_attachment=True, download_name=download_name, etag=etag)
+
+def write_distribution_sheet(workbook, header_format, cell_format, histograms):
+    """'Dağılım' sayfası: verilen robot histogramları birleştirilerek metrik başına
+    yüzdelikler ve aralık/adet tablosu"""
+    sheet = workbook.add_worksheet('Dağılım')
+    sheet.set_column(0, 2, 16)
+    histograms = list(histograms)
+    row = 0
+    for metric, width in current_app.config['HISTOGRAM_BIN_WIDTHS'].items():
+        merged = sketches.merge(*(h.get(metric, {}) for h in histograms))
+        values = sketches.percentiles(merged, width)
+        sheet.write_row(row, 0, [HISTOGRAM_LABELS.get(metric, metric), 'Ölçüm', values['count']], header_format)
+        row += 1
+        for point in sketches.PERCENTILES:
+            sheet.write_row(row, 0, [f'p{point}', '', values[f'p{point}']], cell_format)
+            row += 1
+        sheet.write_row(row, 0, ['Başlangıç', 'Bitiş', 'Adet'], header_format)
+        row += 1
+        for interval in sketches.distribution(merged, width):
+            sheet.write_row(row, 0, [interval['from'], interval['to'], interval['count']], cell_format)
+            row += 1
+        row += 1
+
+def build_fleet_report(sheet_name, user_id, directory=None):
+    """Kullanıcının tüm robotları için özet Excel dosyasını oluşturur"""
+    workbook, path = spooled_workbook(directory)
+    try:
+        worksheet = workbook.add_worksheet(sheet_name)
+        
+        header_format = workbook.add_format({
+            'bold': True,
+            'bg_color': '#667eea',
+            'font_color': 'white',
+            'border': 1,
+            'align': 'center'
         })
-    
-    return jsonify(report_data)
+        
+        cell_format = workbook.add_format({'border': 1})
+        
+        headers = ['ID', 'Robot Adı', 'Model', 'Durum', 'Batarya (%)', 
+                   'Sensor Sayısı', 'Ort. Sıcaklık (°C)', 'Ort. Nem (%)', 
+                   'Ort. Hız (m/s)', 'Son Okuma', 'Oluşturulma',
+                   'Sıcaklık p50', 'Sıcaklık p95', 'Sıcaklık p99',
+                   'Hız p50', 'Hız p95', 'Hız p99']
+        
+        worksheet.set_column(0, 0, 8)
+        worksheet.set_column(1, 2, 20)
+        worksheet.set_column(3, 3, 12)
+        worksheet.set_column(4, 8, 15)
+        worksheet.set_column(9, 10, 20)
+        worksheet.set_column(11, 16, 13)
+        
+        worksheet.write_row(0, 0, headers, header_format)
+        
+        histograms = load_histograms(user_id)
+        for row, summary in enumerate(robot_summaries(user_id, histograms), start=1):
+            robot = summary['robot']
+            percentiles = summary['percentiles']
+            worksheet.write_row(row, 0, [
+                robot.id,
+                robot.name,
+                robot.model,
+                robot.status,
+                robot.battery,
+                summary['sensor_count'],
+                summary['avg_temperature'],
+                summary['avg_humidity'],
+                summary['avg_speed'],
+                summary['last_reading'],
+                robot.created_at.strftime('%Y-%m-%d %H:%M:%S'),
+                *[percentiles.get(metric, {}).get(point)
+                  for metric in ('temperature', 'speed') for point in ('p50', 'p95', 'p99')]
+            ], cell_format)
+        
+        write_distribution_sheet(workbook, header_format, cell_format, histograms.values())
+        
+        workbook.close()
+    except Exception:
+        os.remove(path)
+        raise
+    return path
 
-@app.route('/api/reports/export')
+@bp.route('/api/reports/export')
 @login_required
 def export_report():
     """Excel raporu oluştur"""
-    robots = Robot.query.filter_by(user_id=current_user.id).all()
-    
-    output = io.BytesIO()
-    workbook = xlsxwriter.Workbook(output)
-    worksheet = workbook.add_worksheet('Robot Raporu')
-    
-    header_format = workbook.add_format({
-        'bold': True,
-        'bg_color': '#667eea',
-        'font_color': 'white',
-        'border': 1
-    })
-    
-    cell_format = workbook.add_format({
-        'border': 1
-    })
-    
-    headers = ['ID', 'Robot Adı', 'Model', 'Durum', 'Batarya (%)', 
-               'Sensor Sayısı', 'Ort. Sıcaklık (°C)', 'Ort. Nem (%)', 
-               'Ort. Hız (m/s)', 'Son Okuma', 'Oluşturulma']
-    
-    for col, header in enumerate(headers):
-        worksheet.write(0, col, header, header_format)
+    key = f'report-u{current_user.id}'
+    path = cached_export(current_user.id, key, current_user.data_version,
+                         lambda directory: build_fleet_report('Robot Raporu', current_user.id, directory))
+    return send_export(path, f'robot_raporu_{datetime.now().strftime("%Y%m%d_%H%M%S")}.xlsx',
+                       f'{key}-v{current_user.data_version}')
+
+def build_robot_report(robot, directory=None):
+    """Tek robotun Excel raporunu oluşturur - okumalar parça parça okunup dosyaya akıtılır"""
+    stats = db.session.get(RobotStats, robot.id)
+    histograms = load_histograms(robot.user_id, robot_id=robot.id).get(robot.id, {})
     
-    row = 1
-    for robot in robots:
-        sensors = robot.sensors
-        
-        if sensors:
-            avg_temp = sum(s.temperature for s in sensors) / len(sensors)
-            avg_humidity = sum(s.humidity for s in sensors) / len(sensors)
-            avg_speed = sum(s.speed for s in sensors) / len(sensors)
-            last_reading = max(s.timestamp for s in sensors).strftime('%Y-%m-%d %H:%M:%S')
-        else:
-            avg_temp = avg_humidity = avg_speed = 0
-            last_reading = 'N/A'
-        
-        worksheet.write(row, 0, robot.id, cell_format)
-        worksheet.write(row, 1, robot.name, cell_format)
-        worksheet.write(row, 2, robot.model, cell_format)
-        worksheet.write(row, 3, robot.status, cell_format)
-        worksheet.write(row, 4, robot.battery, cell_format)
-        worksheet.write(row, 5, len(sensors), cell_format)
-        worksheet.write(row, 6, round(avg_temp, 2), cell_format)
-        worksheet.write(row, 7, round(avg_humidity, 2), cell_format)
-        worksheet.write(row, 8, round(avg_speed, 2), cell_format)
-        worksheet.write(row, 9, last_reading, cell_format)
-        worksheet.write(row, 10, robot.created_at.strftime('%Y-%m-%d %H:%M:%S'), cell_format)
+    workbook, path = spooled_workbook(directory)
+    try:
+        # Formatlar
+        header_format = workbook.add_format({
+            'bold': True,
+            'bg_color': '#667eea',
+            'font_color': 'white',
+            'border': 1,
+            'align': 'center'
+        })
         
-        row += 1
-    
-    worksheet.set_column(0, 0, 8)
-    worksheet.set_column(1, 2, 20)
-    worksheet.set_column(3, 3, 12)
-    worksheet.set_column(4, 8, 15)
-    worksheet.set_column(9, 10, 20)
-    
-    workbook.close()
-    output.seek(0)
-    
-    return send_file(
-        output,
-        mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-        as_attachment=True,
-        download_name=f'robot_raporu_{datetime.now().strftime("%Y%m%d_%H%M%S")}.xlsx'
-    )
-# Bu endpoint'leri app.py dosyanıza ekleyin (diğer route'ların yanına)
+        info_label_format = workbook.add_format({
+            'bold': True,
+            'bg_color': '#e0e7ff',
+            'border': 1
+        })
+        
+        cell_format = workbook.add_format({'border': 1})
+        
+        # Özet Sayfası (istatistikler SQL tarafında tutulan özetten gelir)
+        summary_sheet = workbook.add_worksheet('Özet')
+        summary_sheet.set_column('A:A', 20)
+        summary_sheet.set_column('B:B', 30)
+        summary_sheet.write('A1', 'Robot Bilgileri', header_format)
+        summary_sheet.write('A3', 'Robot ID:', info_label_format)
+        summary_sheet.write('B3', robot.id, cell_format)
+        summary_sheet.write('A4', 'Robot Adı:', info_label_format)
+        summary_sheet.write('B4', robot.name, cell_format)
+        summary_sheet.write('A5', 'Model:', info_label_format)
+        summary_sheet.write('B5', robot.model, cell_format)
+        summary_sheet.write('A6', 'Durum:', info_label_format)
+        summary_sheet.write('B6', robot.status, cell_format)
+        summary_sheet.write('A7', 'Batarya:', info_label_format)
+        summary_sheet.write('B7', f'{robot.battery}%', cell_format)
+        summary_sheet.write('A8', 'Oluşturulma:', info_label_format)
+        summary_sheet.write('B8', robot.created_at.strftime('%Y-%m-%d %H:%M:%S'), cell_format)
+        
+        if stats and stats.count:
+            summary_sheet.write('A10', 'İstatistikler', header_format)
+            summary_sheet.write('A11', 'Toplam Ölçüm:', info_label_format)
+            summary_sheet.write('B11', stats.count, cell_format)
+            summary_sheet.write('A12', 'Ort. Sıcaklık:', info_label_format)
+            summary_sheet.write('B12', f'{round(stats.average("temperature"), 2)} °C', cell_format)
+            summary_sheet.write('A13', 'Ort. Nem:', info_label_format)
+            summary_sheet.write('B13', f'{round(stats.average("humidity"), 2)} %', cell_format)
+            summary_sheet.write('A14', 'Ort. Hız:', info_label_format)
+            summary_sheet.write('B14', f'{round(stats.average("speed"), 2)} m/s', cell_format)
+            
+            row = 15
+            for metric, values in histogram_percentiles(histograms).items():
+                for point in sketches.PERCENTILES:
+                    row += 1
+                    summary_sheet.write(row, 0, f'{HISTOGRAM_LABELS.get(metric, metric)} p{point}:', info_label_format)
+                    summary_sheet.write(row, 1, values[f'p{point}'], cell_format)
+        
+        write_distribution_sheet(workbook, header_format, cell_format, [histograms])
+        
+        # Sensor Verileri Sayfası
+        data_sheet = workbook.add_worksheet('Sensor Verileri')
+        data_sheet.set_column('A:A', 8)
+        data_sheet.set_column('B:D', 15)
+        data_sheet.set_column('E:E', 20)
+        data_sheet.write_row(0, 0, ['ID', 'Sıcaklık (°C)', 'Nem (%)', 'Hız (m/s)', 'Tarih-Saat'], header_format)
+        
+        # ORM nesnesi oluşturmadan, sunucu tarafı imleçle parça parça okuma
+        readings = db.session.execute(
+            db.select(SensorData.id, SensorData.temperature, SensorData.humidity,
+                      SensorData.speed, SensorData.timestamp)
+            .where(SensorData.robot_id == robot.id)
+            .order_by(SensorData.timestamp.desc())
+            .execution_options(yield_per=EXPORT_FETCH_SIZE)
+        )
+        for row, (sensor_id, temperature, humidity, speed, timestamp) in enumerate(readings, start=1):
+            data_sheet.write_row(row, 0, [
+                sensor_id,
+                temperature,
+                humidity,
+                speed,
+                timestamp.strftime('%Y-%m-%d %H:%M:%S')
+            ], cell_format)
+        
+        workbook.close()
+    except Exception:
+        os.remove(path)
+        raise
+    return path
 
-@app.route('/api/reports/robot/<int:robot_id>/export')
+@bp.route('/api/reports/robot/<int:robot_id>/export')
 @login_required
 def export_single_robot_report(robot_id):
     """Tek robot için Excel raporu"""
     robot = Robot.query.filter_by(id=robot_id, user_id=current_user.id).first_or_404()
-    sensors = SensorData.query.filter_by(robot_id=robot_id).order_by(SensorData.timestamp.desc()).all()
-    
-    output = io.BytesIO()
-    workbook = xlsxwriter.Workbook(output)
-    
-    # Formatlar
-    header_format = workbook.add_format({
-        'bold': True,
-        'bg_color': '#667eea',
-        'font_color': 'white',
-        'border': 1,
-        'align': 'center'
-    })
-    
-    info_label_format = workbook.add_format({
-        'bold': True,
-        'bg_color': '#e0e7ff',
-        'border': 1
-    })
-    
-    cell_format = workbook.add_format({'border': 1})
-    
-    # Özet Sayfası
-    summary_sheet = workbook.add_worksheet('Özet')
-    summary_sheet.write('A1', 'Robot Bilgileri', header_format)
-    summary_sheet.write('A3', 'Robot ID:', info_label_format)
-    summary_sheet.write('B3', robot.id, cell_format)
-    summary_sheet.write('A4', 'Robot Adı:', info_label_format)
-    summary_sheet.write('B4', robot.name, cell_format)
-    summary_sheet.write('A5', 'Model:', info_label_format)
-    summary_sheet.write('B5', robot.model, cell_format)
-    summary_sheet.write('A6', 'Durum:', info_label_format)
-    summary_sheet.write('B6', robot.status, cell_format)
-    summary_sheet.write('A7', 'Batarya:', info_label_format)
-    summary_sheet.write('B7', f'{robot.battery}%', cell_format)
-    summary_sheet.write('A8', 'Oluşturulma:', info_label_format)
-    summary_sheet.write('B8', robot.created_at.strftime('%Y-%m-%d %H:%M:%S'), cell_format)
-    
-    if sensors:
-        avg_temp = sum(s.temperature for s in sensors) / len(sensors)
-        avg_humidity = sum(s.humidity for s in sensors) / len(sensors)
-        avg_speed = sum(s.speed for s in sensors) / len(sensors)
-        
-        summary_sheet.write('A10', 'İstatistikler', header_format)
-        summary_sheet.write('A11', 'Toplam Ölçüm:', info_label_format)
-        summary_sheet.write('B11', len(sensors), cell_format)
-        summary_sheet.write('A12', 'Ort. Sıcaklık:', info_label_format)
-        summary_sheet.write('B12', f'{round(avg_temp, 2)} °C', cell_format)
-        summary_sheet.write('A13', 'Ort. Nem:', info_label_format)
-        summary_sheet.write('B13', f'{round(avg_humidity, 2)} %', cell_format)
-        summary_sheet.write('A14', 'Ort. Hız:', info_label_format)
-        summary_sheet.write('B14', f'{round(avg_speed, 2)} m/s', cell_format)
-    
-    summary_sheet.set_column('A:A', 20)
-    summary_sheet.set_column('B:B', 30)
-    
-    # Sensor Verileri Sayfası
-    data_sheet = workbook.add_worksheet('Sensor Verileri')
-    headers = ['ID', 'Sıcaklık (°C)', 'Nem (%)', 'Hız (m/s)', 'Tarih-Saat']
-    
-    for col, header in enumerate(headers):
-        data_sheet.write(0, col, header, header_format)
-    
-    for row, sensor in enumerate(sensors, start=1):
-        data_sheet.write(row, 0, sensor.id, cell_format)
-        data_sheet.write(row, 1, sensor.temperature, cell_format)
-        data_sheet.write(row, 2, sensor.humidity, cell_format)
-        data_sheet.write(row, 3, sensor.speed, cell_format)
-        data_sheet.write(row, 4, sensor.timestamp.strftime('%Y-%m-%d %H:%M:%S'), cell_format)
-    
-    data_sheet.set_column('A:A', 8)
-    data_sheet.set_column('B:D', 15)
-    data_sheet.set_column('E:E', 20)
-    
-    workbook.close()
-    output.seek(0)
-    
+    key = robot_export_key(current_user.id, robot.id)
+    path = cached_export(current_user.id, key, robot.data_version, lambda directory: build_robot_report(robot, directory))
     filename = f'robot_{robot.name}_{datetime.now().strftime("%Y%m%d_%H%M%S")}.xlsx'
-    
-    return send_file(
-        output,
-        mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-        as_attachment=True,
-        download_name=filename
-    )
+    return send_export(path, filename, f'{key}-v{robot.data_version}')
 
-@app.route('/api/reports/export-all')
+@bp.route('/api/reports/export-all')
 @login_required
 def export_all_robots_report():
     """Tüm robotlar için toplu Excel raporu"""
-    robots = Robot.query.filter_by(user_id=current_user.id).all()
-    
-    output = io.BytesIO()
-    workbook = xlsxwriter.Workbook(output)
-    worksheet = workbook.add_worksheet('Tüm Robotlar')
-    
-    header_format = workbook.add_format({
-        'bold': True,
-        'bg_color': '#667eea',
-        'font_color': 'white',
-        'border': 1,
-        'align': 'center'
+    key = f'all-u{current_user.id}'
+    path = cached_export(current_user.id, key, current_user.data_version,
+                         lambda directory: build_fleet_report('Tüm Robotlar', current_user.id, directory))
+    return send_export(path, f'tum_robotlar_raporu_{datetime.now().strftime("%Y%m%d_%H%M%S")}.xlsx',
+                       f'{key}-v{current_user.data_version}')
+
+# Rapor türü -> (sayfa adı, önbellek anahtarı öneki, indirilen dosya adı öneki)
+FLEET_EXPORTS = {
+    'report': ('Robot Raporu', 'report', 'robot_raporu'),
+    'all': ('Tüm Robotlar', 'all', 'tum_robotlar_raporu'),
+}
+
+def export_job_to_dict(record):
+    job = {
+        'job_id': record['id'],
+        'type': record['type'],
+        'status': record['status'],
+        'error': record['error'],
+        'size': record['size'],
+        'created_at': datetime.utcfromtimestamp(record['created_at']).isoformat(),
+        'status_url': url_for('main.get_export_job', job_id=record['id'])
+    }
+    if record['status'] == 'done':
+        job['download_url'] = url_for('main.download_export_job', job_id=record['id'])
+    return job
+
+def owned_export_job(job_id):
+    if not job_id.replace('-', '').replace('_', '').isalnum():
+        return None
+    record = export_jobs.get(job_id)
+    if record is None or record['user_id'] != current_user.id:
+        return None
+    return record
+
+@bp.route('/api/exports', methods=['POST'])
+@login_required
+def submit_export_job():
+    """Raporu arka planda oluşturmak üzere kuyruğa alır; aynı sürüm hazırsa hemen 'done' döner"""
+    data = request.get_json(silent=True) or {}
+    kind = data.get('type', 'all')
+    user_id = current_user.id
+    if kind == 'robot':
+        robot_id = parse_robot_id(data.get('robot_id'))
+        robot = Robot.query.filter_by(id=robot_id, user_id=user_id).first() if robot_id is not None else None
+        if robot is None:
+            return jsonify({'error': 'Robot bulunamadı'}), 404
+        key, version, filename = robot_export_key(user_id, robot.id), robot.data_version, f'robot_{robot.name}'
+        # İş başka bir thread'de çalıştığından robot orada yeniden okunur
+        build = lambda directory: build_robot_report(db.session.get(Robot, robot_id), directory)
+    elif kind in FLEET_EXPORTS:
+        sheet_name, prefix, filename = FLEET_EXPORTS[kind]
+        key, version = f'{prefix}-u{user_id}', current_user.data_version
+        build = lambda directory: build_fleet_report(sheet_name, user_id, directory)
+    else:
+        return jsonify({'error': f'type şunlardan biri olmalı: robot, {", ".join(FLEET_EXPORTS)}'}), 400
+
+    job_id = f'{key}-v{version}'
+    path = export_path(key, version)
+    if os.path.exists(path):
+        record = export_jobs.complete(job_id, user_id, path, type=kind, filename=filename)
+    else:
+        app = current_app._get_current_object()
+
+        def run():
+            with app.app_context():
+                return cached_export(user_id, key, version, build)
+        record = export_jobs.submit(job_id, user_id, run, type=kind, filename=filename)
+    return jsonify(export_job_to_dict(record)), 200 if record['status'] == 'done' else 202
+
+@bp.route('/api/exports/<job_id>')
+@login_required
+def get_export_job(job_id):
+    record = owned_export_job(job_id)
+    if record is None:
+        return jsonify({'error': 'Rapor işi bulunamadı'}), 404
+    if export_jobs.is_stale(record):
+        record.update(status='failed', error='İş yarıda kaldı, yeniden gönderin')
+    elif record['status'] == 'done' and not os.path.exists(record['file']):
+        record.update(status='expired', error='Rapor dosyası önbellekten silindi, yeniden gönderin')
+    return jsonify(export_job_to_dict(record))
+
+@bp.route('/api/exports/<job_id>/download')
+@login_required
+def download_export_job(job_id):
+    record = owned_export_job(job_id)
+    if record is None:
+        return jsonify({'error': 'Rapor işi bulunamadı'}), 404
+    if record['status'] != 'done':
+        return jsonify({'error': 'Rapor henüz hazır değil', 'status': record['status']}), 409
+    path = record['file']
+    try:
+        # Boyut sınırında en uzun süredir indirilmeyen dosyalar silinir
+        os.utime(path)
+    except OSError:
+        return jsonify({'error': 'Rapor dosyası önbellekten silindi, yeniden gönderin'}), 410
+    return send_export(path, f'{record["filename"]}_{datetime.now().strftime("%Y%m%d_%H%M%S")}.xlsx', job_id)
+
+@bp.route('/api/cache/stats')
+@login_required
+def get_cache_stats():
+    """Yanıt önbelleği sayaçları (bu worker için)"""
+    write_queue = current_app.extensions['write_queue']
+    stats = response_cache.stats.as_dict()
+    lookups = stats['hits'] + stats['misses']
+    stats.update({
+        'backend': response_cache.name,
+        'entries': len(response_cache),
+        'hit_ratio': round(stats['hits'] / lookups, 3) if lookups else None,
+        'recent_readings': recent_readings.stats(),
+        'export_jobs': export_jobs.stats(),
+        'write_queue': write_queue.stats() if write_queue else None
     })
-    
-    cell_format = workbook.add_format({'border': 1})
-    
-    headers = ['ID', 'Robot Adı', 'Model', 'Durum', 'Batarya (%)', 
-               'Sensor Sayısı', 'Ort. Sıcaklık (°C)', 'Ort. Nem (%)', 
-               'Ort. Hız (m/s)', 'Son Okuma', 'Oluşturulma']
-    
-    for col, header in enumerate(headers):
-        worksheet.write(0, col, header, header_format)
-    
-    row = 1
-    for robot in robots:
-        sensors = robot.sensors
-        
-        if sensors:
-            avg_temp = sum(s.temperature for s in sensors) / len(sensors)
-            avg_humidity = sum(s.humidity for s in sensors) / len(sensors)
-            avg_speed = sum(s.speed for s in sensors) / len(sensors)
-            last_reading = max(s.timestamp for s in sensors).strftime('%Y-%m-%d %H:%M:%S')
-        else:
-            avg_temp = avg_humidity = avg_speed = 0
-            last_reading = 'N/A'
-        
-        worksheet.write(row, 0, robot.id, cell_format)
-        worksheet.write(row, 1, robot.name, cell_format)
-        worksheet.write(row, 2, robot.model, cell_format)
-        worksheet.write(row, 3, robot.status, cell_format)
-        worksheet.write(row, 4, robot.battery, cell_format)
-        worksheet.write(row, 5, len(sensors), cell_format)
-        worksheet.write(row, 6, round(avg_temp, 2), cell_format)
-        worksheet.write(row, 7, round(avg_humidity, 2), cell_format)
-        worksheet.write(row, 8, round(avg_speed, 2), cell_format)
-        worksheet.write(row, 9, last_reading, cell_format)
-        worksheet.write(row, 10, robot.created_at.strftime('%Y-%m-%d %H:%M:%S'), cell_format)
-        
-        row += 1
-    
-    worksheet.set_column(0, 0, 8)
-    worksheet.set_column(1, 2, 20)
-    worksheet.set_column(3, 3, 12)
-    worksheet.set_column(4, 8, 15)
-    worksheet.set_column(9, 10, 20)
-    
-    workbook.close()
-    output.seek(0)
-    
-    return send_file(
-        output,
-        mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-        as_attachment=True,
-        download_name=f'tum_robotlar_raporu_{datetime.now().strftime("%Y%m%d_%H%M%S")}.xlsx'
-    )
+    return jsonify(stats)
+
+@bp.route('/api/events')
+@login_required
+def stream_events():
+    """Kullanıcının değişiklik olaylarını Server-Sent Events olarak iletir"""
+    user_id = current_user.id
+    last_id = request.headers.get('Last-Event-ID') or request.args.get('last_id')
+    try:
+        last_id = int(last_id) if last_id else None
+    except ValueError:
+        last_id = None
+    if last_id is None:
+        # Yeni bağlantı: yalnızca bundan sonraki olaylar gönderilir
+        last_id = db.session.scalar(
+            db.select(db.func.coalesce(db.func.max(ChangeEvent.id), 0)).where(ChangeEvent.user_id == user_id)
+        )
+    db.session.remove()
+    poll_seconds = current_app.config['EVENTS_POLL_SECONDS']
+    app = current_app._get_current_object()
 
-@app.route('/favicon.ico')
+    def generate():
+        nonlocal last_id
+        yield 'retry: 3000\n\n'
+        idle_since = time.monotonic()
+        while True:
+            with app.app_context():
+                events = db.session.execute(
+                    db.select(ChangeEvent.id, ChangeEvent.kind, ChangeEvent.payload)
+                    .where(ChangeEvent.user_id == user_id, ChangeEvent.id > last_id)
+                    .order_by(ChangeEvent.id)
+                    .limit(500)
+                ).all()
+            for event in events:
+                last_id = event.id
+                yield f'id: {event.id}\nevent: {event.kind}\ndata: {event.payload}\n\n'
+            if events:
+                idle_since = time.monotonic()
+                continue
+            if time.monotonic() - idle_since > 15:
+                # Proxy'lerin boştaki bağlantıyı kapatmaması için yorum satırı
+                yield ': ping\n\n'
+                idle_since = time.monotonic()
+            with _events_signal:
+                _events_signal.wait(poll_seconds)
+
+    return Response(generate(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
+@bp.route('/metrics')
+def metrics():
+    """İstek ve SQL ölçümleri (Prometheus metin biçimi)"""
+    token = current_app.config['METRICS_TOKEN']
+    if token and request.headers.get('Authorization') != f'Bearer {token}':
+        return Response(status=401)
+    return Response(request_metrics.render(), mimetype='text/plain; version=0.0.4')
+
+@bp.route('/favicon.ico')
 def favicon():
     return send_file('static/favicon.ico', mimetype='image/x-icon')
 
-# Database tablolarını otomatik oluştur
-with app.app_context():
+@bp.cli.command('compress-static')
+def compress_static_command():
+    """Statik JS/CSS dosyalarının .gz (brotli kuruluysa .br) kopyalarını üretir"""
+    written, skipped, removed = precompress(current_app.static_folder)
+    print(f'✓ {written} sıkıştırılmış dosya yazıldı, {skipped} güncel dosya atlandı, {removed} dosya silindi')
+
+@bp.cli.command('rebuild-stats')
+def rebuild_stats_command():
+    """Robot sensör özetlerini mevcut verilerden yeniden oluşturur"""
+    count = rebuild_robot_stats()
+    print(f'✓ {count} robot için sensör özeti yeniden oluşturuldu')
+
+@bp.cli.command('rebuild-rollups')
+def rebuild_rollups_command():
+    """Dakika/saat/gün rollup tablolarını mevcut verilerden yeniden oluşturur"""
+    count = rebuild_rollups()
+    print(f'✓ {count} sensör verisi rollup tablolarına işlendi')
+
+@bp.cli.command('rebuild-histograms')
+def rebuild_histograms_command():
+    """Yüzdelik histogramlarını mevcut verilerden yeniden oluşturur"""
+    count = rebuild_histograms()
+    print(f'✓ {count} sensör verisi histogramlara işlendi')
+
+@bp.cli.command('rebuild-anomaly-state')
+def rebuild_anomaly_state_command():
+    """Anomali (EWMA) durumunu mevcut okumalardan yeniden hesaplar"""
+    count = rebuild_anomaly_state()
+    print(f'✓ {count} sensör verisi anomali durumuna işlendi')
+
+@bp.cli.command('simulate-fleet')
+@click.option('--username', help='Yalnızca bu kullanıcının robotları (varsayılan: tüm robotlar)')
+@click.option('--ticks', default=60, show_default=True, help='Adım sayısı')
+@click.option('--interval', default=1.0, show_default=True, help='Adımlar arası simüle edilen süre (saniye)')
+@click.option('--rate', default=0, show_default=True, help='Hedef okuma/saniye (0 = sınırsız)')
+@click.option('--seed', type=int, help='Tekrarlanabilir seri için tohum')
+def simulate_fleet_command(username, ticks, interval, rate, seed):
+    """Tüm filo için gerçekçi sensör serisi üretir ve toplu yükleme yolundan yazar"""
+    user_id = None
+    if username:
+        user = User.query.filter_by(username=username).first()
+        if user is None:
+            raise click.ClickException(f'Kullanıcı bulunamadı: {username}')
+        user_id = user.id
+    simulator = load_fleet_simulator(user_id, seed=seed)
+    if not len(simulator):
+        raise click.ClickException('Simüle edilecek robot yok')
+
+    report_every = max(1, ticks // 20)
+    def progress(tick, written, elapsed):
+        if tick % report_every == 0 or tick == ticks:
+            print(f'  {tick}/{ticks} adım, {written:,} okuma, {written / elapsed:,.0f} okuma/s', flush=True)
+
+    result = simulate_fleet(simulator, ticks, interval, rate=rate, progress=progress)
+    print(f'✓ {result["robots"]} robot × {ticks} adım = {result["readings"]:,} okuma '
+          f'{result["elapsed_seconds"]:.1f} s içinde yazıldı ({result["readings_per_second"]:,.0f} okuma/s; '
+          f'üretim {result["generate_seconds"]:.1f} s, yazma {result["write_seconds"]:.1f} s, '
+          f'{result["status_changes"]} durum değişikliği)')
+
+@bp.cli.command('import-readings')
+@click.argument('paths', nargs=-1, required=True)
+@click.option('--username', required=True, help='Okumaların ait olduğu robotların sahibi')
+@click.option('--format', 'fmt', type=click.Choice(['auto', 'json', 'ndjson']), default='auto', show_default=True,
+              help='auto: .ndjson/.jsonl uzantısı NDJSON, diğerleri JSON ({"robots": [...]})')
+@click.option('--workers', default=max(1, (os.cpu_count() or 2) - 1), show_default=True,
+              help='Ayrıştırma/doğrulama süreç sayısı (0 = ana süreçte)')
+@click.option('--batch-size', type=int, help='Grup başına okuma (varsayılan INGEST_CHUNK_SIZE)')
+@click.option('--dry-run', is_flag=True, help='Yalnızca doğrula, yazma')
+def import_readings_command(paths, username, fmt, workers, batch_size, dry_run):
+    """Büyük JSON/NDJSON dökümlerini (.gz dahil) toplu yazma yolundan içe aktarır"""
+    user = User.query.filter_by(username=username).first()
+    if user is None:
+        raise click.ClickException(f'Kullanıcı bulunamadı: {username}')
+
+    last_report = 0.0
+    def progress(result, elapsed):
+        nonlocal last_report
+        if elapsed - last_report >= 2:
+            last_report = elapsed
+            print(f'  {result["parsed"]:,} okuma, {result["written"]:,} yazıldı, '
+                  f'{result["rejected"] + result["foreign"]:,} reddedildi, '
+                  f'{result["parsed"] / elapsed:,.0f} okuma/s', flush=True)
+
+    for path in paths:
+        print(f'{path}{" (deneme)" if dry_run else ""}:')
+        try:
+            result = import_readings(path, user.id, fmt=fmt, workers=workers, batch_size=batch_size,
+                                     dry_run=dry_run, progress=progress)
+        except (OSError, ValueError) as e:
+            raise click.ClickException(f'{path}: {e}')
+        print(f'✓ {result["parsed"]:,} okuma ayrıştırıldı ({result["format"]}), {result["written"]:,} yazıldı, '
+              f'{result["robots"]} robot, {result["elapsed_seconds"]:.1f} s '
+              f'({result["readings_per_second"] or 0:,.0f} okuma/s)')
+        if result['rejected']:
+            listed = ', '.join(str(position) for position in result['rejected_at'][:20])
+            print(f'  {result["rejected"]:,} hatalı okuma atlandı (ilk konumlar: {listed})')
+        if result['foreign']:
+            print(f'  {result["foreign"]:,} okuma {username} kullanıcısına ait olmayan robotlar için atlandı')
+
+@bp.cli.command('init-db')
+def init_db_command():
+    """Eksik tabloları oluşturur (mevcut tablolar ve veriler değişmez)"""
     db.create_all()
+    print('✓ Veritabanı tabloları hazır')
+    for key, value in engine_settings(db.engine, current_app.config).items():
+        print(f'  {key}: {value}')
 
 if __name__ == '__main__':
-    app.run(debug=True)
+    create_app().run(debug=True)
@@ -0,0 +1,90 @@
+"""
+Değişim hızı uyarısının gürültüye dayanıklılığı (anomaly.py).
+
+Veritabanı açmadan anomaly.update/evaluate ile sentetik okumalar oynatır:
+
+  - noisy    Sabit ortam, saniyede bir gürültülü okuma (sıcaklık σ=0.2 °C,
+             nem σ=1.5 %). Hiçbir adımda hız uyarısı çıkmamalı.
+  - ramp     Aynı gürültü üstüne dakikada 5 °C ısınma. Hız uyarısı çıkmalı.
+  - sparse   Beş dakikada bir okuma, dakikada 3 °C ısınma. Hız uyarısı çıkmalı.
+
+Beklenen sonuç tutmazsa 1 ile çıkar:
+
+    python benchmarks/anomaly_rate.py --minutes 10 --seed 1
+"""
+
+import argparse
+import os
+import random
+import sys
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import anomaly  # noqa: E402
+
+THRESHOLDS = {
+    'z': 3,
+    'min_samples': 20,
+    'max_temperature': 45,
+    'stall_speed': 0.05,
+    'low_battery': 15,
+    'rates': {'temperature': 2, 'humidity': 10, 'battery': 5},
+}
+
+
+def replay(samples, window):
+    """Örnekleri oynatır; hız uyarısı görülen adım sayısını ve en büyük |sıcaklık hızı| değerini döndürür"""
+    state = anomaly.empty_state(1)
+    alerted = 0
+    peak = 0.0
+    for timestamp, values in samples:
+        anomaly.update(state, 'reading', timestamp, values, 0.1, window)
+        alerts = [a for a in anomaly.evaluate(state, 'active', None, THRESHOLDS) if a['type'] == 'rate']
+        alerted += bool(alerts)
+        peak = max(peak, abs(state['temperature_rate']))
+    return alerted, peak
+
+
+def generate(rng, seconds, step, slope_per_minute):
+    start = datetime(2024, 1, 1)
+    return [
+        (start + timedelta(seconds=t), {
+            'temperature': 25 + slope_per_minute * t / 60 + rng.gauss(0, 0.2),
+            'humidity': 50 + rng.gauss(0, 1.5),
+            'speed': 1 + rng.gauss(0, 0.05),
+        })
+        for t in range(0, seconds, step)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--minutes', type=int, default=10)
+    parser.add_argument('--window', type=float, default=anomaly.RATE_WINDOW_SECONDS, help='Hız penceresi (saniye)')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    seconds = args.minutes * 60
+    cases = [
+        ('noisy', generate(rng, seconds, 1, 0), False),
+        ('ramp', generate(rng, seconds, 1, 5), True),
+        ('sparse', generate(rng, seconds * 3, 300, 3), True),
+    ]
+
+    failed = False
+    print(f'{"":<10}{"örnek":>8}{"uyarılı adım":>14}{"°C/dk (en çok)":>16}  beklenen')
+    for label, samples, expect_alert in cases:
+        alerted, peak = replay(samples, args.window)
+        ok = bool(alerted) == expect_alert
+        failed |= not ok
+        print(f'{label:<10}{len(samples):>8}{alerted:>14}{peak:>16.2f}  '
+              f'{"uyarı" if expect_alert else "uyarı yok"}{"" if ok else "  ✗"}')
+    if failed:
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
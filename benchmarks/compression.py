@@ -0,0 +1,154 @@
+"""
+Yanıt sıkıştırmasının kablodaki boyuta ve istek başına CPU süresine etkisi.
+
+Farklı büyüklükte filolar (robot sayısı) için JSON uçlarını sıkıştırmasız,
+gzip ve (brotli kuruluysa) br ile çağırır; yanıt boyutunu, sıkıştırmasız
+isteğin süreç CPU süresini ve sıkıştırmanın eklediği CPU süresini (yanıt
+gövdesi uygulamanın ayarlarıyla ayrıca sıkıştırılarak) raporlar. Statik
+dosyalarda flask compress-static kopyaları gönderildiğinden ek süre yoktur:
+
+    python benchmarks/compression.py --sizes 10 100 1000 --iterations 20
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.abspath(os.path.dirname(__file__)))
+
+ENDPOINTS = [
+    '/api/robots',
+    '/api/stats',
+    '/api/reports/summary',
+    '/api/reports/percentiles',
+    '/api/sensors/{robot_id}',
+    '/api/sensors/batch?ids={robot_ids}&limit=50',
+]
+STATIC_FILES = ['js/ui.js', 'js/upload.js', 'js/app.js', 'js/api.js', 'css/dashboard.css']
+
+
+def fetch(client, url, encoding):
+    response = client.get(url, headers={'Accept-Encoding': encoding} if encoding else {})
+    data = response.get_data()
+    response.close()
+    if response.status_code != 200:
+        raise SystemExit(f'{url}: HTTP {response.status_code}')
+    if response.headers.get('Content-Encoding') not in (None, encoding):
+        raise SystemExit(f'{url}: beklenmeyen kodlama {response.headers.get("Content-Encoding")}')
+    return data, response.headers.get('Content-Encoding')
+
+
+def measure(client, url, encodings, iterations, compress=None):
+    """kodlama -> (yanıt byte'ı, CPU ms); identity için istek başına süre, diğerleri için
+    compress(gövde, kodlama) verilmişse sıkıştırmanın eklediği süre, yoksa isteğin tamamı"""
+    started = time.process_time()
+    for _ in range(iterations):
+        body, _ = fetch(client, url, None)
+    results = {None: (len(body), (time.process_time() - started) / iterations * 1000)}
+    for encoding in encodings:
+        data, applied = fetch(client, url, encoding)
+        started = time.process_time()
+        if compress is None:
+            for _ in range(iterations):
+                fetch(client, url, encoding)
+        elif applied:
+            for _ in range(iterations):
+                compress(body, encoding)
+        results[encoding] = (len(data), (time.process_time() - started) / iterations * 1000)
+    return results
+
+
+def print_table(title, rows, encodings, cpu_label):
+    print(f'\n{title}')
+    header = f'{"":<44}' + f'{"identity":>10}'
+    for encoding in encodings:
+        header += f'{encoding:>10}{"oran":>7}'
+    header += f'{"CPU ms":>9}' + ''.join(f'{cpu_label + encoding:>9}' for encoding in encodings)
+    print(header)
+    for label, results in rows:
+        raw_size, raw_cpu = results[None]
+        line = f'{label:<44}{raw_size:>10}'
+        for encoding in encodings:
+            size = results[encoding][0]
+            line += f'{size:>10}{size / raw_size if raw_size else 1:>7.2f}'
+        line += f'{raw_cpu:>9.2f}' + ''.join(f'{results[encoding][1]:>9.2f}' for encoding in encodings)
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 100, 1000], help='Filo başına robot sayısı')
+    parser.add_argument('--readings', type=int, default=50, help='Robot başına okuma sayısı')
+    parser.add_argument('--iterations', type=int, default=20)
+    parser.add_argument('--cache', default='none', help='RESPONSE_CACHE_BACKEND (varsayılan: none)')
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp()
+    os.environ['DATABASE_URL'] = f'sqlite:///{os.path.join(workdir, "robots.db")}'
+    os.environ['EXPORT_CACHE_DIR'] = os.path.join(workdir, 'exports')
+    os.environ['RESPONSE_CACHE_BACKEND'] = args.cache
+    sys.path.insert(0, ROOT)
+
+    from app import create_app, db, User, Robot, write_readings, compression
+    from compression import available_encodings, compress, precompress
+
+    def compress_body(body, encoding):
+        return compress(body, encoding, compression.level(encoding))
+
+    app = create_app()
+    encodings = available_encodings()
+    try:
+        robot_ids = {}
+        with app.app_context():
+            db.create_all()
+            for size in args.sizes:
+                user = User(username=f'fleet{size}', email=f'fleet{size}@example.com')
+                user.set_password('bench')
+                db.session.add(user)
+                db.session.flush()
+                robots = [Robot(name=f'robot-{i}', model='AGV-100', user_id=user.id) for i in range(size)]
+                db.session.add_all(robots)
+                db.session.flush()
+                start = datetime.utcnow() - timedelta(hours=1)
+                write_readings([{
+                    'robot_id': robot.id,
+                    'temperature': 20.0 + (robot.id * 7 + i) % 150 / 10,
+                    'humidity': 40.0 + (robot.id * 3 + i) % 200 / 10,
+                    'speed': (robot.id + i) % 30 / 10,
+                    'timestamp': start + timedelta(seconds=i)
+                } for robot in robots for i in range(args.readings)], user.id)
+                db.session.commit()
+                robot_ids[size] = [robot.id for robot in robots]
+
+        rows = []
+        for size in args.sizes:
+            client = app.test_client()
+            client.post('/login', data={'username': f'fleet{size}', 'password': 'bench'})
+            ids = robot_ids[size][:app.config['SENSOR_BATCH_MAX_ROBOTS']]
+            for endpoint in ENDPOINTS:
+                url = endpoint.format(robot_id=ids[0], robot_ids=','.join(map(str, ids)))
+                rows.append((f'{size:>5} robot  {endpoint.split("?")[0]}',
+                             measure(client, url, encodings, args.iterations, compress_body)))
+        print_table(f'JSON uçları (istek başına, {args.iterations} tekrar ortalaması; +: sıkıştırma süresi)',
+                    rows, encodings, '+')
+
+        # Statik dosyalar geçici bir kopyada sıkıştırılır; depodaki dizine dokunulmaz
+        static_copy = os.path.join(workdir, 'static')
+        shutil.copytree(app.static_folder, static_copy)
+        app.static_folder = static_copy
+        precompress(static_copy)
+        client = app.test_client()
+        rows = [(f'/static/{name}', measure(client, f'/static/{name}', encodings, args.iterations))
+                for name in STATIC_FILES]
+        print_table('Statik dosyalar (flask compress-static kopyaları; istek başına toplam CPU)',
+                    rows, encodings, '')
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
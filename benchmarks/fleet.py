@@ -0,0 +1,158 @@
+"""
+Sentetik filo üreteci.
+
+Uygulamanın şemasıyla bir SQLite veritabanı oluşturur ve
+kullanıcı × robot × okuma boyutlarında veri yazar. Okumalar doğrudan
+çok satırlı INSERT ile yazılır, ardından özet ve rollup tabloları
+uygulamanın kendi yeniden oluşturma fonksiyonlarıyla doldurulur:
+
+    python benchmarks/fleet.py --db /tmp/fleet.db --users 10 --robots 100 --readings 10000
+
+Aynı parametreler ve tohum (--seed) her zaman aynı veriyi üretir.
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PASSWORD = 'bench'
+MODELS = ('AGV-100', 'AGV-200', 'ARM-6X', 'DRONE-Q4')
+STATUSES = ('active', 'active', 'active', 'idle', 'maintenance')
+
+
+def load_app(db_path, **env):
+    """Uygulamayı verilen SQLite dosyasına bağlı olarak kurar; (modül, Flask uygulaması) döndürür"""
+    os.environ['DATABASE_URL'] = f'sqlite:///{os.path.abspath(db_path)}'
+    os.environ.update({key: str(value) for key, value in env.items()})
+    if ROOT not in sys.path:
+        sys.path.insert(0, ROOT)
+    import app
+    return app, app.create_app()
+
+
+def meta_path(db_path):
+    return db_path + '.json'
+
+
+def generate(app_module, app, db_path, users, robots, readings, days=30, seed=42, batch=50_000, log=print):
+    """Filoyu üretir; parametreleri veritabanının yanına kaydeder"""
+    from werkzeug.security import generate_password_hash
+
+    db = app_module.db
+    rng = random.Random(seed)
+    end = datetime(2024, 1, 1) + timedelta(days=days)
+    step = timedelta(days=days) / max(readings, 1)
+    password_hash = generate_password_hash(PASSWORD)
+    started = time.perf_counter()
+
+    with app.app_context():
+        db.create_all()
+        conn = db.engine.raw_connection()
+        cursor = conn.cursor()
+
+        cursor.executemany(
+            'INSERT INTO user (id, username, email, password_hash, created_at, data_version) VALUES (?, ?, ?, ?, ?, 0)',
+            [(u, f'user{u}', f'user{u}@example.com', password_hash, '2024-01-01 00:00:00.000000')
+             for u in range(1, users + 1)]
+        )
+        cursor.executemany(
+            'INSERT INTO robot (id, name, model, status, battery, created_at, user_id, data_version) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?, 0)',
+            [(
+                (u - 1) * robots + r,
+                f'robot-{u}-{r}',
+                rng.choice(MODELS),
+                rng.choice(STATUSES),
+                rng.randint(5, 100),
+                '2024-01-01 00:00:00.000000',
+                u
+            ) for u in range(1, users + 1) for r in range(1, robots + 1)]
+        )
+
+        total = users * robots * readings
+        written = 0
+        rows = []
+        for robot_id in range(1, users * robots + 1):
+            # Robot başına hafif kayan taban değerler + gürültü
+            base_temp = rng.uniform(20, 30)
+            base_humidity = rng.uniform(40, 60)
+            timestamp = end - step * readings
+            for _ in range(readings):
+                timestamp += step
+                rows.append((
+                    robot_id,
+                    round(base_temp + rng.gauss(0, 1.5), 1),
+                    round(base_humidity + rng.gauss(0, 3), 1),
+                    round(abs(rng.gauss(2, 1)), 2),
+                    timestamp.strftime('%Y-%m-%d %H:%M:%S.%f')
+                ))
+                if len(rows) >= batch:
+                    cursor.executemany(
+                        'INSERT INTO sensor_data (robot_id, temperature, humidity, speed, timestamp) VALUES (?, ?, ?, ?, ?)',
+                        rows
+                    )
+                    written += len(rows)
+                    rows.clear()
+                    log(f'  {written:,} / {total:,} okuma', end='\r')
+        if rows:
+            cursor.executemany(
+                'INSERT INTO sensor_data (robot_id, temperature, humidity, speed, timestamp) VALUES (?, ?, ?, ?, ?)',
+                rows
+            )
+            written += len(rows)
+        conn.commit()
+        conn.close()
+        log(f'  {written:,} okuma yazıldı ({time.perf_counter() - started:.1f} s)')
+
+        step_started = time.perf_counter()
+        app_module.rebuild_robot_stats()
+        log(f'  Özet tablosu: {time.perf_counter() - step_started:.1f} s')
+        step_started = time.perf_counter()
+        app_module.rebuild_rollups()
+        log(f'  Rollup tabloları: {time.perf_counter() - step_started:.1f} s')
+        step_started = time.perf_counter()
+        app_module.rebuild_histograms()
+        log(f'  Histogramlar: {time.perf_counter() - step_started:.1f} s')
+        step_started = time.perf_counter()
+        app_module.rebuild_anomaly_state()
+        log(f'  Anomali durumu: {time.perf_counter() - step_started:.1f} s')
+
+    params = {'users': users, 'robots': robots, 'readings': readings, 'days': days, 'seed': seed}
+    with open(meta_path(db_path), 'w') as f:
+        json.dump(params, f)
+    return params
+
+
+def existing_params(db_path):
+    try:
+        with open(meta_path(db_path)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--db', required=True)
+    parser.add_argument('--users', type=int, default=5)
+    parser.add_argument('--robots', type=int, default=20, help='Kullanıcı başına robot')
+    parser.add_argument('--readings', type=int, default=1000, help='Robot başına okuma')
+    parser.add_argument('--days', type=int, default=30)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    if os.path.exists(args.db):
+        parser.error(f'{args.db} zaten var')
+    app_module, app = load_app(args.db)
+    generate(app_module, app, args.db, args.users, args.robots, args.readings, args.days, args.seed,
+             log=lambda *a, **k: print(*a, **k, flush=True))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+"""
+Listeleme uçlarının SQL ifade sayısının filo büyüklüğünden bağımsız olduğunu doğrular.
+
+Farklı büyüklükte filolar (robot sayısı) için her uca bir istek atar, istek
+sırasında çalışan SQL ifadelerini sayar ve sayı filo büyüdükçe artarsa hata
+koduyla çıkar (N+1 sorgu gerilemesi):
+
+    python benchmarks/query_counts.py --sizes 1 10 100
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+ENDPOINTS = [
+    '/dashboard',
+    '/api/robots',
+    '/api/robots/page?limit=5&status=active&sort=-name',
+    '/api/stats',
+    '/api/alerts',
+    '/api/reports/summary',
+    '/api/reports/percentiles',
+    '/api/reports/export',
+    '/api/reports/export-all',
+]
+
+
+@contextmanager
+def count_queries(engine):
+    """Blok içinde çalışan SQL ifadelerini sayar"""
+    from sqlalchemy import event
+
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1, 10, 100])
+    parser.add_argument('--readings', type=int, default=20, help='Robot başına okuma sayısı')
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp()
+    os.environ['DATABASE_URL'] = f'sqlite:///{os.path.join(workdir, "robots.db")}'
+    os.environ['EXPORT_CACHE_DIR'] = os.path.join(workdir, 'exports')
+    # Önbellek isabetleri sayımları bozmasın
+    os.environ['RESPONSE_CACHE_BACKEND'] = 'none'
+    sys.path.insert(0, ROOT)
+
+    from app import create_app, db, User, Robot, write_readings
+
+    app = create_app()
+
+    counts = {}
+    with app.app_context():
+        db.create_all()
+        for size in args.sizes:
+            user = User(username=f'fleet{size}', email=f'fleet{size}@example.com')
+            user.set_password('bench')
+            db.session.add(user)
+            db.session.flush()
+            robots = [Robot(name=f'robot-{i}', model='bench', user_id=user.id) for i in range(size)]
+            db.session.add_all(robots)
+            db.session.flush()
+            start = datetime.utcnow() - timedelta(hours=1)
+            write_readings([{
+                'robot_id': robot.id,
+                'temperature': 20.0 + i % 10,
+                'humidity': 50.0,
+                'speed': 1.0,
+                'timestamp': start + timedelta(seconds=i)
+            } for robot in robots for i in range(args.readings)], user.id)
+            db.session.commit()
+
+        engine = db.engine
+
+    failed = False
+    for size in args.sizes:
+        client = app.test_client()
+        client.post('/login', data={'username': f'fleet{size}', 'password': 'bench'})
+        for endpoint in ENDPOINTS:
+            with count_queries(engine) as statements:
+                response = client.get(endpoint)
+                response.close()
+            if response.status_code != 200:
+                print(f'{endpoint}: HTTP {response.status_code}')
+                failed = True
+            counts.setdefault(endpoint, {})[size] = len(statements)
+
+    print(f'{"Uç":<52}' + ''.join(f'{size:>10}' for size in args.sizes))
+    for endpoint, by_size in counts.items():
+        constant = len(set(by_size.values())) == 1
+        failed |= not constant
+        print(f'{endpoint:<52}' + ''.join(f'{by_size[size]:>10}' for size in args.sizes)
+              + ('' if constant else '   <-- filo büyüklüğüyle artıyor'))
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
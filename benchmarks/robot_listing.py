@@ -0,0 +1,153 @@
+"""
+Robot listesinin filo büyüdükçe maliyeti: tüm liste (/api/robots) ve sayfalı
+liste (/api/robots/page).
+
+Geçici bir SQLite veritabanında farklı büyüklükte filolar (tek kullanıcı,
+başka kullanıcıların robotları arasında) üretir; her uca istek atıp yanıt
+boyutunu ve gecikmeyi, (user_id, status) ve (user_id, name) indeksleri
+varken ve silinmişken raporlar. Sayfa sorgusunun planı da yazdırılır:
+
+    python benchmarks/robot_listing.py --sizes 1000 10000 50000 --iterations 20
+
+Ölçülen istekler:
+  full           /api/robots (tüm filo)
+  page-first     /api/robots/page?limit=24 (ilk sayfa)
+  page-deep      Aynı sıralamada filonun ortasından bir sayfa (imleçle)
+  search         ?q=robot-1&sort=name (ad öneki)
+  status-name    ?status=maintenance&sort=name
+"""
+
+import argparse
+import os
+import random
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from contextlib import closing
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+STATUSES = ['active', 'active', 'active', 'idle', 'maintenance']
+INDEXES = ['ix_robot_user_id_status', 'ix_robot_user_id_name']
+OTHER_ROBOTS = 5000
+
+
+def generate(conn, user_id, size, next_id, rng):
+    conn.executemany(
+        "INSERT INTO robot (id, name, model, status, battery, created_at, user_id, data_version) "
+        "VALUES (?, ?, ?, ?, ?, '2024-01-01 00:00:00.000000', ?, 0)",
+        [(next_id + i, f'robot-{i}', rng.choice(['AGV-100', 'AGV-200', 'ARM-7']), rng.choice(STATUSES),
+          rng.randint(5, 100), user_id) for i in range(size)]
+    )
+    return next_id + size
+
+
+def measure(client, url, iterations):
+    timings = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        response = client.get(url)
+        data = response.get_data()
+        timings.append(time.perf_counter() - started)
+        if response.status_code != 200:
+            raise SystemExit(f'{url}: HTTP {response.status_code}')
+    return len(data), statistics.median(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 50000], help='Filo başına robot sayısı')
+    parser.add_argument('--iterations', type=int, default=20)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp()
+    db_path = os.path.join(workdir, 'robots.db')
+    os.environ['DATABASE_URL'] = f'sqlite:///{db_path}'
+    os.environ['EXPORT_CACHE_DIR'] = os.path.join(workdir, 'exports')
+    os.environ['RESPONSE_CACHE_BACKEND'] = 'none'
+    sys.path.insert(0, ROOT)
+
+    from sqlalchemy import event
+    from app import create_app, db, User
+
+    app = create_app()
+    rng = random.Random(42)
+    try:
+        with app.app_context():
+            db.create_all()
+            users = []
+            for name in ['other'] + [f'fleet{size}' for size in args.sizes]:
+                user = User(username=name, email=f'{name}@example.com')
+                user.set_password('bench')
+                users.append(user)
+            db.session.add_all(users)
+            db.session.commit()
+            user_ids = [user.id for user in users]
+            with db.engine.begin() as conn:
+                raw = conn.connection.driver_connection
+                next_id = generate(raw, user_ids[0], OTHER_ROBOTS, 1, rng)
+                for user_id, size in zip(user_ids[1:], args.sizes):
+                    next_id = generate(raw, user_id, size, next_id, rng)
+            with db.engine.connect() as conn:
+                conn.exec_driver_sql('ANALYZE')
+
+        def cases(client, size):
+            middle = client.get(f'/api/robots/page?limit={size // 2}').get_json()['next_cursor']
+            return [
+                ('full', '/api/robots'),
+                ('page-first', '/api/robots/page?limit=24'),
+                ('page-deep', f'/api/robots/page?limit=24&cursor={middle}'),
+                ('search', '/api/robots/page?limit=24&q=robot-1&sort=name'),
+                ('status-name', '/api/robots/page?limit=24&status=maintenance&sort=name'),
+            ]
+
+        def page_plan(client, url):
+            """İsteğin ilk robot sorgusunun SQLite planı"""
+            captured = []
+
+            def capture(conn, cursor, statement, parameters, context, executemany):
+                if not captured and statement.lstrip().startswith('SELECT robot.'):
+                    captured.append((statement, parameters))
+
+            with app.app_context():
+                event.listen(db.engine, 'before_cursor_execute', capture)
+                try:
+                    client.get(url)
+                finally:
+                    event.remove(db.engine, 'before_cursor_execute', capture)
+            # Havuzdaki bağlantıların ifade önbelleği indeks silinmeden önceki planı döndürür
+            with closing(sqlite3.connect(db_path)) as conn:
+                rows = conn.execute('EXPLAIN QUERY PLAN ' + captured[0][0], captured[0][1]).fetchall()
+            return [row[-1] for row in rows]
+
+        results = {}
+        for indexed in (True, False):
+            if not indexed:
+                with app.app_context(), db.engine.begin() as conn:
+                    for name in INDEXES:
+                        conn.exec_driver_sql(f'DROP INDEX IF EXISTS {name}')
+            for size in args.sizes:
+                client = app.test_client()
+                client.post('/login', data={'username': f'fleet{size}', 'password': 'bench'})
+                for label, url in cases(client, size):
+                    results[(indexed, size, label)] = measure(client, url, args.iterations)
+                if size == args.sizes[-1]:
+                    print(f'\nSorgu planı, {size} robot, status-name, indeks {"var" if indexed else "yok"}:')
+                    for line in page_plan(client, '/api/robots/page?limit=24&status=maintenance&sort=name'):
+                        print(f'  {line}')
+
+        print(f'\n{"":<24}{"byte":>10}{"ms (indeksli)":>15}{"ms (indekssiz)":>16}')
+        for size in args.sizes:
+            for label in ('full', 'page-first', 'page-deep', 'search', 'status-name'):
+                size_bytes, with_index = results[(True, size, label)]
+                without_index = results[(False, size, label)][1]
+                print(f'{size:>6} robot  {label:<14}{size_bytes:>10}{with_index:>15.2f}{without_index:>16.2f}')
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
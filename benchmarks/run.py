@@ -0,0 +1,186 @@
+"""
+Uç bazlı performans ölçümü.
+
+Sentetik bir filo üretir (veya --db ile var olanı kullanır), gerçek uçları
+Flask test istemcisiyle çağırır ve her uç için p50/p95/p99 gecikme,
+saniyedeki istek sayısı ve o ana kadarki en yüksek RSS değerini raporlar.
+Sonuçlar JSON olarak kaydedilir ve önceki bir çalıştırmayla
+karşılaştırılabilir:
+
+    python benchmarks/run.py --users 2 --robots 50 --readings 2000 --out results.json
+    python benchmarks/run.py --db /tmp/fleet.db --compare results.json --threshold 0.2
+
+--compare verildiğinde p95 gecikmesi eşikten fazla artan uç varsa komut
+1 ile çıkar.
+"""
+
+import argparse
+import json
+import os
+import platform
+import resource
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import fleet  # noqa: E402
+
+
+def peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux KB, macOS byte döndürür
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(q / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def upload_payloads(robot_ids, robots_per_request, readings_per_robot):
+    sensors = [{'temperature': 24.5, 'humidity': 45.2, 'speed': 2.3}] * readings_per_robot
+    bulk = {'robots': [{'robot_id': robot_id, 'sensors': sensors} for robot_id in robot_ids[:robots_per_request]]}
+    single = {'sensors': sensors}
+    smart = {'robots': [{'name': f'robot-1-{i + 1}', 'model': 'AGV-100', 'sensors': sensors}
+                        for i in range(min(robots_per_request, len(robot_ids)))]}
+    return bulk, single, smart
+
+
+def run_case(client, method, url, iterations, before=None, **kwargs):
+    timings = []
+    status_codes = set()
+    started = time.perf_counter()
+    for _ in range(iterations):
+        if before:
+            before()
+        request_started = time.perf_counter()
+        response = getattr(client, method)(url, **kwargs)
+        response.get_data()
+        response.close()
+        timings.append((time.perf_counter() - request_started) * 1000)
+        status_codes.add(response.status_code)
+    elapsed = time.perf_counter() - started
+    return {
+        'iterations': iterations,
+        'p50_ms': round(percentile(timings, 50), 3),
+        'p95_ms': round(percentile(timings, 95), 3),
+        'p99_ms': round(percentile(timings, 99), 3),
+        'mean_ms': round(statistics.mean(timings), 3),
+        'throughput_rps': round(iterations / elapsed, 2),
+        'peak_rss_mb': peak_rss_mb(),
+        'status_codes': sorted(status_codes),
+    }
+
+
+def compare(results, baseline, threshold):
+    """p95 gecikmesi eşikten fazla artan uçları listeler"""
+    regressions = []
+    print(f'\n{"Uç":<28}{"önce p95":>12}{"şimdi p95":>12}{"değişim":>10}')
+    for name, current in results['endpoints'].items():
+        previous = baseline.get('endpoints', {}).get(name)
+        if not previous:
+            continue
+        change = (current['p95_ms'] - previous['p95_ms']) / previous['p95_ms'] if previous['p95_ms'] else 0
+        flag = '  <-- gerileme' if change > threshold else ''
+        print(f'{name:<28}{previous["p95_ms"]:>12.2f}{current["p95_ms"]:>12.2f}{change:>+10.1%}{flag}')
+        if flag:
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--db', help='Filo veritabanı; yoksa bu parametrelerle üretilir')
+    parser.add_argument('--users', type=int, default=2)
+    parser.add_argument('--robots', type=int, default=50, help='Kullanıcı başına robot')
+    parser.add_argument('--readings', type=int, default=2000, help='Robot başına okuma')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--iterations', type=int, default=50, help='Okuma uçları için istek sayısı')
+    parser.add_argument('--export-iterations', type=int, default=5)
+    parser.add_argument('--upload-iterations', type=int, default=5)
+    parser.add_argument('--upload-readings', type=int, default=1000, help='Yükleme isteğinde robot başına okuma')
+    parser.add_argument('--upload-robots', type=int, default=10, help='Toplu yükleme isteğindeki robot sayısı')
+    parser.add_argument('--cache', default='none', help='RESPONSE_CACHE_BACKEND (varsayılan: none)')
+    parser.add_argument('--out', help='Sonuçların yazılacağı JSON dosyası')
+    parser.add_argument('--compare', help='Karşılaştırılacak önceki sonuç dosyası')
+    parser.add_argument('--threshold', type=float, default=0.2, help='İzin verilen p95 artışı (0.2 = %%20)')
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='robot-bench-')
+    db_path = args.db or os.path.join(workdir, 'fleet.db')
+    export_dir = os.path.join(workdir, 'exports')
+    app_module, app = fleet.load_app(db_path, RESPONSE_CACHE_BACKEND=args.cache, EXPORT_CACHE_DIR=export_dir)
+
+    params = fleet.existing_params(db_path)
+    if params is None:
+        print(f'Filo üretiliyor -> {db_path}')
+        params = fleet.generate(app_module, app, db_path, args.users, args.robots, args.readings, seed=args.seed,
+                                log=lambda *a, **k: print(*a, **k, flush=True))
+    print(f'Filo: {params}')
+
+    with app.app_context():
+        robot_ids = [r.id for r in app_module.Robot.query.filter_by(user_id=1).order_by(app_module.Robot.id)]
+    robot_id = robot_ids[0]
+
+    client = app.test_client()
+    client.post('/login', data={'username': 'user1', 'password': fleet.PASSWORD})
+
+    def clear_exports():
+        # Her export gerçekten oluşturulsun (önbellekten değil)
+        shutil.rmtree(export_dir, ignore_errors=True)
+        app.extensions['response_cache'].delete_prefix('u1:')
+
+    bulk, single, smart = upload_payloads(robot_ids, args.upload_robots, args.upload_readings)
+    cases = [
+        ('robots', 'get', '/api/robots', args.iterations, None, {}),
+        ('robots_page', 'get', '/api/robots/page?limit=24&status=active&sort=name', args.iterations, None, {}),
+        ('stats', 'get', '/api/stats', args.iterations, None, {}),
+        ('reports_summary', 'get', '/api/reports/summary', args.iterations, None, {}),
+        ('sensors', 'get', f'/api/sensors/{robot_id}', args.iterations, None, {}),
+        ('sensors_batch', 'get', f'/api/sensors/batch?ids={",".join(map(str, robot_ids))}&from=2000-01-01&limit=50',
+         args.iterations, None, {}),
+        ('export_fleet', 'get', '/api/reports/export', args.export_iterations, clear_exports, {}),
+        ('export_all', 'get', '/api/reports/export-all', args.export_iterations, clear_exports, {}),
+        ('export_robot', 'get', f'/api/reports/robot/{robot_id}/export', args.export_iterations, clear_exports, {}),
+        # Yazma uçları en sona: okuma ölçümlerini etkilemesinler
+        ('upload_sensors', 'post', f'/api/robots/{robot_id}/upload-sensors', args.upload_iterations, None, {'json': single}),
+        ('bulk_upload', 'post', '/api/robots/bulk-upload', args.upload_iterations, None, {'json': bulk}),
+        ('smart_upload', 'post', '/api/robots/smart-upload', args.upload_iterations, None, {'json': smart}),
+    ]
+
+    results = {
+        'created_at': datetime.utcnow().isoformat(),
+        'python': platform.python_version(),
+        'fleet': params,
+        'endpoints': {},
+    }
+    print(f'\n{"Uç":<20}{"p50 ms":>10}{"p95 ms":>10}{"p99 ms":>10}{"req/s":>10}{"RSS MB":>10}')
+    for name, method, url, iterations, before, kwargs in cases:
+        result = run_case(client, method, url, iterations, before, **kwargs)
+        results['endpoints'][name] = result
+        print(f'{name:<20}{result["p50_ms"]:>10.2f}{result["p95_ms"]:>10.2f}{result["p99_ms"]:>10.2f}'
+              f'{result["throughput_rps"]:>10.1f}{result["peak_rss_mb"]:>10.1f}')
+
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f'\nSonuçlar: {args.out}')
+
+    failed = False
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        failed = bool(regressions)
+
+    if not args.db:
+        shutil.rmtree(workdir, ignore_errors=True)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,144 @@
+"""
+(robot_id, timestamp) indeksinin sensör okuma sorgularına etkisini ölçer.
+
+Geçici bir SQLite veritabanına sentetik okumalar yazar, ardından aynı sorguları
+indekssiz ve indeksli olarak çalıştırıp sorgu planını ve gecikmeyi raporlar:
+
+    python benchmarks/sensor_index.py --rows 10000000 --robots 1000
+
+Ölçülen sorgular:
+  latest-50     /api/sensors/<id> (son 50 okuma)
+  keyset-deep   /api/sensors/<id>/page?before=... (geçmişin ortasından bir sayfa)
+  offset-deep   Aynı sayfa OFFSET ile (karşılaştırma için)
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def generate(conn, rows, robots, batch=100_000):
+    """Robotlar arasında dağılmış, zaman sıralı okumalar üretir"""
+    start = datetime(2024, 1, 1)
+    cursor = conn.cursor()
+    cursor.executemany(
+        "INSERT INTO user (id, username, email, password_hash) VALUES (?, ?, ?, ?)",
+        [(1, 'bench', 'bench@example.com', '-')]
+    )
+    cursor.executemany(
+        "INSERT INTO robot (id, name, model, status, battery, user_id) VALUES (?, ?, ?, 'active', 100, 1)",
+        [(i, f'robot-{i}', 'bench') for i in range(1, robots + 1)]
+    )
+    written = 0
+    while written < rows:
+        n = min(batch, rows - written)
+        cursor.executemany(
+            "INSERT INTO sensor_data (robot_id, temperature, humidity, speed, timestamp) VALUES (?, ?, ?, ?, ?)",
+            [(
+                (written + i) % robots + 1,
+                round(random.uniform(20, 30), 1),
+                round(random.uniform(40, 60), 1),
+                round(random.uniform(0, 5), 2),
+                (start + timedelta(seconds=written + i)).strftime('%Y-%m-%d %H:%M:%S.%f')
+            ) for i in range(n)]
+        )
+        written += n
+        print(f'  {written:,} / {rows:,} satır', end='\r', flush=True)
+    conn.commit()
+    print()
+
+
+def measure(conn, sql, params, repeat):
+    plan = [row[-1] for row in conn.execute('EXPLAIN QUERY PLAN ' + sql, params)]
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        conn.execute(sql, params).fetchall()
+        timings.append((time.perf_counter() - started) * 1000)
+    return plan, statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=10_000_000)
+    parser.add_argument('--robots', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--db', help='Veritabanı dosyası (varsayılan: geçici dosya)')
+    args = parser.parse_args()
+
+    db_path = args.db or tempfile.mktemp(suffix='.db')
+    os.environ['DATABASE_URL'] = f'sqlite:///{db_path}'
+    sys.path.insert(0, ROOT)
+
+    from sqlalchemy.dialects import sqlite
+    from app import create_app, db, sensor_page_query, SensorData
+
+    app = create_app()
+
+    with app.app_context():
+        db.create_all()
+        conn = db.engine.raw_connection()
+        conn.execute('DROP INDEX IF EXISTS ix_sensor_data_robot_id_timestamp')
+
+        print(f'{args.rows:,} okuma, {args.robots:,} robot -> {db_path}')
+        started = time.perf_counter()
+        generate(conn, args.rows, args.robots)
+        print(f'Veri üretimi: {time.perf_counter() - started:.1f} s')
+
+        robot_id = args.robots // 2 + 1
+        per_robot = args.rows // args.robots
+        middle = conn.execute(
+            "SELECT timestamp, id FROM sensor_data WHERE robot_id = ? ORDER BY timestamp DESC LIMIT 1 OFFSET ?",
+            (robot_id, per_robot // 2)
+        ).fetchone()
+
+        def compile_query(query):
+            compiled = query.compile(dialect=sqlite.dialect())
+            return str(compiled), tuple(compiled.params[name] for name in compiled.positiontup)
+
+        keyset = sensor_page_query(robot_id, before=(datetime.fromisoformat(middle[0]), middle[1]), limit=100)
+        keyset_sql, keyset_params = compile_query(keyset)
+        # SQLite DATETIME değerlerini metin olarak saklar; parametreleri aynı biçime getir
+        keyset_params = tuple(p.strftime('%Y-%m-%d %H:%M:%S.%f') if isinstance(p, datetime) else p for p in keyset_params)
+
+        queries = {
+            'latest-50': (
+                "SELECT id, temperature, humidity, speed, timestamp FROM sensor_data "
+                "WHERE robot_id = ? ORDER BY timestamp DESC LIMIT 50",
+                (robot_id,)
+            ),
+            'keyset-deep': (keyset_sql, keyset_params),
+            'offset-deep': (
+                "SELECT id, temperature, humidity, speed, timestamp FROM sensor_data "
+                "WHERE robot_id = ? ORDER BY timestamp DESC, id DESC LIMIT 100 OFFSET ?",
+                (robot_id, per_robot // 2)
+            ),
+        }
+
+        for label, create in (('İndekssiz', False), ('İndeksli', True)):
+            if create:
+                started = time.perf_counter()
+                index = next(i for i in SensorData.__table__.indexes if i.name == 'ix_sensor_data_robot_id_timestamp')
+                index.create(db.engine)
+                conn.execute('ANALYZE')
+                print(f'\nİndeks oluşturma: {time.perf_counter() - started:.1f} s')
+            print(f'\n== {label} ==')
+            for name, (sql, params) in queries.items():
+                plan, median_ms = measure(conn, sql, params, args.repeat)
+                print(f'{name:<12} {median_ms:10.2f} ms   plan: {" | ".join(plan)}')
+
+        conn.close()
+
+    if not args.db:
+        os.remove(db_path)
+
+
+if __name__ == '__main__':
+    main()
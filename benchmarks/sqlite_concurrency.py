@@ -0,0 +1,163 @@
+"""
+SQLite eşzamanlı okuma/yazma ölçümü: varsayılan ayarlar ve üretim profili.
+
+Her profil için ayrı bir filo veritabanı üretilir, ardından ayrı süreçlerde
+(gunicorn worker'ları gibi) yazıcılar /api/simulate/<id>, okuyucular
+/api/robots ve /api/sensors/<id> uçlarını belirli bir süre boyunca çağırır.
+Saniyedeki başarılı istek sayısı ve hata (ör. "database is locked")
+sayısı raporlanır:
+
+    python benchmarks/sqlite_concurrency.py --writers 4 --readers 4 --seconds 10
+
+--mode sql uçları atlayıp uygulamanın motoruyla doğrudan küçük yazma
+transaction'ları (tek okuma INSERT + commit) ve son 50 okuma sorguları
+çalıştırır; Python/Flask maliyeti çıkınca günlük (journal) farkı daha net görünür.
+
+'default' profili SQLite'ın kendi varsayılanlarıdır (rollback journal,
+synchronous=FULL, 2 MB önbellek, mmap yok); 'tuned' uygulamanın
+varsayılan profilidir (WAL, synchronous=NORMAL, mmap, 64 MB önbellek).
+"""
+
+import argparse
+import multiprocessing
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+PROFILES = {
+    'default': {
+        'SQLITE_JOURNAL_MODE': 'DELETE',
+        'SQLITE_SYNCHRONOUS': 'FULL',
+        'SQLITE_MMAP_SIZE': '0',
+        'SQLITE_CACHE_SIZE': '-2000',
+        # Python sqlite3 modülünün varsayılan bekleme süresi
+        'SQLITE_BUSY_TIMEOUT_MS': '5000',
+    },
+    'tuned': {},
+}
+
+
+def sql_step(app_module, role, robot_id):
+    db = app_module.db
+    if role == 'writer':
+        db.session.execute(app_module.SensorData.__table__.insert(), [{
+            'robot_id': robot_id, 'temperature': 25.0, 'humidity': 50.0, 'speed': 1.0,
+            'timestamp': datetime.utcnow()
+        }])
+        db.session.commit()
+    else:
+        db.session.execute(
+            db.select(app_module.SensorData.temperature, app_module.SensorData.timestamp)
+            .where(app_module.SensorData.robot_id == robot_id)
+            .order_by(app_module.SensorData.timestamp.desc()).limit(50)
+        ).all()
+        db.session.rollback()
+
+
+def worker(role, mode, db_path, env, seconds, robots, start_at, results):
+    os.environ.update(env)
+    sys.path.insert(0, HERE)
+    import fleet
+
+    app_module, app = fleet.load_app(db_path, RESPONSE_CACHE_BACKEND='none', LOG_LEVEL='ERROR')
+    app.logger.disabled = True
+    client = app.test_client()
+    client.post('/login', data={'username': 'user1', 'password': fleet.PASSWORD})
+    if mode == 'sql':
+        app.app_context().push()
+
+    ok = errors = 0
+    i = 0
+    time.sleep(max(0, start_at - time.time()))
+    deadline = time.time() + seconds
+    while time.time() < deadline:
+        robot_id = i % robots + 1
+        i += 1
+        try:
+            if mode == 'sql':
+                sql_step(app_module, role, robot_id)
+                ok += 1
+                continue
+            if role == 'writer':
+                response = client.post(f'/api/simulate/{robot_id}')
+            elif i % 2:
+                response = client.get('/api/robots')
+            else:
+                response = client.get(f'/api/sensors/{robot_id}')
+            response.close()
+            if response.status_code < 400:
+                ok += 1
+            else:
+                errors += 1
+        except Exception:
+            errors += 1
+            if mode == 'sql':
+                app_module.db.session.rollback()
+    results.put((role, ok, errors))
+
+
+def run_profile(name, args, workdir):
+    env = {key: str(value) for key, value in PROFILES[name].items()}
+    db_path = os.path.join(workdir, f'{name}.db')
+    subprocess.run(
+        [sys.executable, os.path.join(HERE, 'fleet.py'), '--db', db_path, '--users', '1',
+         '--robots', str(args.robots), '--readings', str(args.readings)],
+        env={**os.environ, **env, 'LOG_LEVEL': 'ERROR'}, check=True, stdout=subprocess.DEVNULL
+    )
+
+    ctx = multiprocessing.get_context('spawn')
+    results = ctx.Queue()
+    # Süreçler uygulamayı içe aktarırken zaman kaybetmesin diye hepsi aynı anda başlar
+    start_at = time.time() + 3 + 0.3 * (args.writers + args.readers)
+    processes = [
+        ctx.Process(target=worker, args=(role, args.mode, db_path, env, args.seconds, args.robots, start_at, results))
+        for role in ['writer'] * args.writers + ['reader'] * args.readers
+    ]
+    for process in processes:
+        process.start()
+    totals = {'writer': [0, 0], 'reader': [0, 0]}
+    for _ in processes:
+        role, ok, errors = results.get()
+        totals[role][0] += ok
+        totals[role][1] += errors
+    for process in processes:
+        process.join()
+    return {
+        'writes_per_s': totals['writer'][0] / args.seconds,
+        'reads_per_s': totals['reader'][0] / args.seconds,
+        'write_errors': totals['writer'][1],
+        'read_errors': totals['reader'][1],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--writers', type=int, default=4)
+    parser.add_argument('--readers', type=int, default=4)
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--robots', type=int, default=50)
+    parser.add_argument('--readings', type=int, default=1000, help='Robot başına başlangıç okuması')
+    parser.add_argument('--mode', choices=('http', 'sql'), default='http')
+    parser.add_argument('--profiles', nargs='+', default=list(PROFILES), choices=list(PROFILES))
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='robot-sqlite-')
+    try:
+        print(f'{args.writers} yazıcı + {args.readers} okuyucu süreç, {args.seconds:g} s\n')
+        print(f'{"Profil":<10}{"yazma/s":>10}{"okuma/s":>10}{"yazma hata":>12}{"okuma hata":>12}')
+        for name in args.profiles:
+            result = run_profile(name, args, workdir)
+            print(f'{name:<10}{result["writes_per_s"]:>10.1f}{result["reads_per_s"]:>10.1f}'
+                  f'{result["write_errors"]:>12}{result["read_errors"]:>12}')
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,183 @@
+"""
+Uygulamanın soğuk açılış süresi ve worker bellek kullanımı.
+
+Her ölçüm temiz bir Python sürecinde yapılır:
+
+  - import app, create_app(), ilk API isteği ve ilk Excel raporu (xlsxwriter
+    ilk raporda yüklenir) süreleri ile her aşamadan sonraki RSS
+  - gunicorn'un iki çalışma biçimi: --preload (uygulama ana süreçte bir kez
+    kurulur, worker'lar fork ile kopyalanır) ve preload'suz (her worker
+    uygulamayı kendisi içe aktarır). Worker başına RSS, PSS ve yalnızca o
+    worker'a ait (USS) bellek /proc/<pid>/smaps_rollup'tan okunur (Linux).
+
+    python benchmarks/startup.py --runs 5 --workers 4
+"""
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SETUP = r'''
+import app as app_module
+app = app_module.create_app()
+with app.app_context():
+    app_module.db.create_all()
+client = app.test_client()
+client.post('/register', data={'username': 'bench', 'email': 'bench@example.com', 'password': 'bench'})
+client.post('/login', data={'username': 'bench', 'password': 'bench'})
+for i in range(20):
+    client.post('/api/robots', json={'name': f'robot-{i}', 'model': 'AGV-100'})
+'''
+
+# Alt süreçlerde çalışan ortak yardımcılar
+HELPERS = r'''
+import json, os, sys, time
+
+def memory():
+    """RSS/PSS/USS (MB); smaps_rollup yoksa yalnızca tepe RSS"""
+    values = {}
+    try:
+        with open('/proc/self/smaps_rollup') as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) == 3 and parts[2] == 'kB':
+                    values[parts[0].rstrip(':')] = int(parts[1]) / 1024
+    except OSError:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        rss = peak / (1024 * 1024 if sys.platform == 'darwin' else 1024)
+        return {'rss': rss, 'pss': None, 'uss': None}
+    return {'rss': values['Rss'], 'pss': values.get('Pss'),
+            'uss': values.get('Private_Clean', 0) + values.get('Private_Dirty', 0)}
+
+def serve(app, requests):
+    client = app.test_client()
+    client.post('/login', data={'username': 'bench', 'password': 'bench'})
+    for _ in range(requests):
+        for url in ('/api/robots', '/api/stats', '/api/reports/summary'):
+            client.get(url).close()
+'''
+
+COLD = HELPERS + r'''
+started = time.perf_counter()
+import app as app_module
+imported = time.perf_counter()
+stages = {'import': (imported - started, memory())}
+app = app_module.create_app()
+created = time.perf_counter()
+stages['create_app'] = (created - imported, memory())
+client = app.test_client()
+# Giriş (parola özeti) ölçüme katılmaz
+client.post('/login', data={'username': 'bench', 'password': 'bench'})
+started = time.perf_counter()
+response = client.get('/api/robots')
+assert response.status_code == 200, response.status_code
+response.close()
+first = time.perf_counter()
+stages['first_request'] = (first - started, memory())
+response = client.get('/api/reports/export')
+assert response.status_code == 200, response.status_code
+response.close()
+stages['first_export'] = (time.perf_counter() - first, memory())
+print(json.dumps({name: {'seconds': s, **m} for name, (s, m) in stages.items()}))
+'''
+
+PRELOAD = HELPERS + r'''
+workers, requests = int(sys.argv[1]), int(sys.argv[2])
+import app as app_module
+app = app_module.create_app()
+master = memory()
+pipes = []
+for _ in range(workers):
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.close(read_fd)
+        serve(app, requests)
+        os.write(write_fd, json.dumps(memory()).encode())
+        os._exit(0)
+    os.close(write_fd)
+    pipes.append((pid, read_fd))
+results = []
+for pid, read_fd in pipes:
+    with os.fdopen(read_fd) as f:
+        results.append(json.loads(f.read()))
+    os.waitpid(pid, 0)
+print(json.dumps({'master': master, 'workers': results}))
+'''
+
+NO_PRELOAD = HELPERS + r'''
+requests = int(sys.argv[1])
+import app as app_module
+app = app_module.create_app()
+serve(app, requests)
+print(json.dumps(memory()))
+'''
+
+
+def run_python(code, env, *args):
+    result = subprocess.run([sys.executable, '-c', code, *map(str, args)], cwd=ROOT, env=env,
+                            capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def fmt(value):
+    return f'{value:>9.1f}' if value is not None else f'{"-":>9}'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=5, help='Soğuk açılış tekrar sayısı')
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--requests', type=int, default=20, help='Worker başına istek turu')
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='robot-startup-')
+    env = dict(os.environ,
+               DATABASE_URL=f'sqlite:///{os.path.join(workdir, "robots.db")}',
+               EXPORT_CACHE_DIR=os.path.join(workdir, 'exports'),
+               LOG_LEVEL='WARNING')
+    try:
+        subprocess.run([sys.executable, '-c', SETUP], cwd=ROOT, env=env, check=True, capture_output=True)
+
+        runs = []
+        for _ in range(args.runs):
+            # Her süreç raporu gerçekten oluştursun (disk önbelleğinden değil)
+            shutil.rmtree(env['EXPORT_CACHE_DIR'], ignore_errors=True)
+            runs.append(run_python(COLD, env))
+        print(f'Soğuk açılış ({args.runs} süreç, medyan)')
+        print(f'{"Aşama":<16}{"ms":>9}{"RSS MB":>9}')
+        for stage in runs[0]:
+            seconds = statistics.median(run[stage]['seconds'] for run in runs)
+            rss = statistics.median(run[stage]['rss'] for run in runs)
+            print(f'{stage:<16}{seconds * 1000:>9.1f}{rss:>9.1f}')
+
+        preload = run_python(PRELOAD, env, args.workers, args.requests)
+        separate = [run_python(NO_PRELOAD, env, args.requests) for _ in range(args.workers)]
+        print(f'\n{args.workers} worker, worker başına {args.requests} istek turu (MB)')
+        print(f'{"Biçim":<24}{"RSS":>9}{"PSS":>9}{"USS":>9}{"Toplam":>9}')
+        for label, workers, master in (('--preload', preload['workers'], preload['master']),
+                                       ('preload yok', separate, None)):
+            rss = statistics.mean(w['rss'] for w in workers)
+            pss = statistics.mean(w['pss'] for w in workers) if workers[0]['pss'] is not None else None
+            uss = statistics.mean(w['uss'] for w in workers) if workers[0]['uss'] is not None else None
+            # Toplam: worker'ların PSS toplamı (+ ana süreç); paylaşılan sayfalar bir kez sayılır
+            total = None
+            if pss is not None:
+                total = sum(w['pss'] for w in workers) + (master['pss'] if master else 0)
+            print(f'{label + " worker":<24}{fmt(rss)}{fmt(pss)}{fmt(uss)}{fmt(total)}')
+        print(f'{"--preload ana süreç":<24}{fmt(preload["master"]["rss"])}{fmt(preload["master"]["pss"])}'
+              f'{fmt(preload["master"]["uss"])}')
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
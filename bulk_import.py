@@ -0,0 +1,150 @@
+"""
+Büyük JSON/NDJSON dökümlerini belleğe almadan gruplar halinde okuyan
+yardımcılar (flask import-readings).
+
+  - NDJSON: her satır bir okuma ({"robot_id": 1, "temperature": ..., "timestamp": ...});
+    satırlar batch_size'lık gruplar halinde ilk satır numarasıyla verilir
+  - JSON: {"robots": [{"robot_id": 1, "sensors": [...]}, ...]} (toplu_veri.json
+    biçimi) ya da doğrudan robot dizisi; robot nesneleri dosya taranırken tek
+    tek ayrılır ve metin olarak, yaklaşık batch_size okumalık gruplarla verilir
+
+Gruplar işçi süreçlerde ayrıştırılıp doğrulanır (json.loads ve tür dönüşümü);
+ana süreç yalnızca dosyayı okur ve tek yazıcı olarak veritabanına yazar.
+JSON biçiminde bir robot nesnesi bir bütün olarak işlenir; robot başına
+çok büyük dökümler için NDJSON önerilir.
+"""
+
+import gzip
+import io
+import re
+import sys
+
+READ_SIZE = 1 << 20
+# JSON grubunun boyutu okuma sayısı yerine karakterle ölçülür (okuma başına ~64 karakter)
+CHARS_PER_READING = 64
+
+_STRUCTURE = re.compile(r'["\\{}\[\]]')
+
+
+def open_dump(path):
+    """Dosyayı metin olarak açar; .gz uzantılı dosyalar açılırken çözülür, '-' standart giriştir"""
+    if path == '-':
+        return io.TextIOWrapper(sys.stdin.buffer, encoding='utf-8')
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rt', encoding='utf-8')
+    return open(path, encoding='utf-8')
+
+
+def detect_format(path):
+    name = path[:-3] if path.endswith('.gz') else path
+    return 'ndjson' if name.endswith(('.ndjson', '.jsonl')) else 'json'
+
+
+def iter_ndjson_batches(stream, batch_size):
+    """(ilk satır numarası, [satırlar]) grupları"""
+    batch = []
+    first = 1
+    for line_no, line in enumerate(stream, start=1):
+        if not batch:
+            first = line_no
+        batch.append(line)
+        if len(batch) >= batch_size:
+            yield first, batch
+            batch = []
+    if batch:
+        yield first, batch
+
+
+def iter_json_robots(stream):
+    """{"robots": [...]} ya da [...] dökümündeki robot nesnelerini sırayla metin olarak verir.
+
+    Dosya yalnızca yapısal karakterler (tırnak, ters bölü, parantezler)
+    üzerinden taranır; bellekte en fazla o an okunan robot nesnesi tutulur."""
+    buffer = ''
+    pos = 0
+    depth = 0
+    in_string = False
+    string_start = None
+    last_string = None
+    array_depth = None
+    start = None
+    finished = False
+    while not finished:
+        chunk = stream.read(READ_SIZE)
+        if not chunk:
+            break
+        buffer += chunk
+        while True:
+            match = _STRUCTURE.search(buffer, pos)
+            if match is None:
+                pos = len(buffer)
+                break
+            i = match.start()
+            char = buffer[i]
+            if in_string:
+                if char == '\\':
+                    if i + 1 >= len(buffer):
+                        # Kaçış karakteri parçanın sonunda; devamı okununca işlenir
+                        pos = i
+                        break
+                    pos = i + 2
+                    continue
+                if char == '"':
+                    in_string = False
+                    if depth == 1:
+                        last_string = buffer[string_start + 1:i]
+            elif char == '"':
+                in_string = True
+                string_start = i
+            elif char in '{[':
+                if array_depth is None and char == '[' and (depth == 0 or (depth == 1 and last_string == 'robots')):
+                    array_depth = depth + 1
+                elif char == '{' and depth == array_depth:
+                    start = i
+                depth += 1
+            else:
+                depth -= 1
+                if char == '}' and depth == array_depth and start is not None:
+                    yield buffer[start:i + 1]
+                    start = None
+                elif char == ']' and array_depth is not None and depth == array_depth - 1:
+                    finished = True
+                    break
+            pos = i + 1
+
+        # İşlenmiş kısım atılır; yarım kalan robot nesnesi ve metin korunur
+        keep = pos
+        if start is not None:
+            keep = min(keep, start)
+        if in_string:
+            keep = min(keep, string_start)
+        buffer = buffer[keep:]
+        pos -= keep
+        if start is not None:
+            start -= keep
+        if in_string:
+            string_start -= keep
+
+    if array_depth is None:
+        raise ValueError('"robots" dizisi bulunamadı')
+    if not finished:
+        raise ValueError('JSON dosyası beklenmedik şekilde bitti')
+
+
+def iter_json_batches(stream, batch_size):
+    """(ilk robot sırası, [robot nesnesi metinleri]) grupları"""
+    budget = batch_size * CHARS_PER_READING
+    batch = []
+    size = 0
+    first = 0
+    for index, text in enumerate(iter_json_robots(stream)):
+        if not batch:
+            first = index
+        batch.append(text)
+        size += len(text)
+        if size >= budget:
+            yield first, batch
+            batch = []
+            size = 0
+    if batch:
+        yield first, batch
@@ -0,0 +1,206 @@
+"""
+Yanıt sıkıştırma (gzip; brotli paketi kuruluysa br).
+
+Kodlama istemcinin Accept-Encoding başlığındaki önceliklere göre seçilir,
+eşitlikte br tercih edilir. JSON/metin yanıtları min_size byte'ı geçerse
+sıkıştırılır; akış (generator) yanıtları parça parça sıkıştırılarak iletilir.
+SSE (text/event-stream) ve dosya gönderimleri (send_file) sıkıştırılmaz.
+Sıkıştırılan yanıtın güçlü ETag'i zayıf ETag'e çevrilir; istemci aynı
+etiketi W/ önekiyle geri gönderir.
+
+Statik dosyalar istek sırasında sıkıştırılmaz: flask compress-static
+dosyaların yanına .gz/.br kopyalarını yazar ve statik uç, istemci kabul
+ediyorsa ve kopya güncelse onu olduğu gibi gönderir.
+"""
+
+import gzip
+import mimetypes
+import os
+import tempfile
+import zlib
+
+from flask import current_app, request, send_from_directory
+from werkzeug.security import safe_join
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE = {
+    'application/json',
+    'application/javascript',
+    'text/javascript',
+    'text/css',
+    'text/html',
+    'text/plain',
+    'text/csv',
+    'image/svg+xml',
+}
+STATIC_EXTENSIONS = ('.js', '.css', '.html', '.svg', '.json', '.txt', '.map')
+SUFFIXES = {'br': '.br', 'gzip': '.gz'}
+
+
+def available_encodings():
+    return ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+def compress(data, encoding, level):
+    """level: gzip için 1-9, brotli için 0-11"""
+    if encoding == 'br':
+        return brotli.compress(data, quality=level)
+    # mtime=0: aynı içerik her zaman aynı byte'ları üretir
+    return gzip.compress(data, compresslevel=level, mtime=0)
+
+
+def _compressor(encoding, level):
+    if encoding == 'br':
+        compressor = brotli.Compressor(quality=level)
+        return compressor.process, compressor.finish
+    # wbits=31: gzip başlığı ve sağlama toplamı
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    return compressor.compress, compressor.flush
+
+
+class Compression:
+    def __init__(self, app=None):
+        self.min_size = 1024
+        self.gzip_level = 6
+        self.brotli_quality = 4
+        self.encodings = ()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.min_size = app.config.get('COMPRESSION_MIN_SIZE', 1024)
+        self.gzip_level = app.config.get('COMPRESSION_LEVEL', 6)
+        self.brotli_quality = app.config.get('COMPRESSION_BROTLI_QUALITY', 4)
+        # Seviye 0 sıkıştırmayı kapatır (statik .gz/.br kopyaları yine gönderilir)
+        self.encodings = available_encodings() if self.gzip_level else ()
+        app.after_request(self._compress_response)
+        if app.has_static_folder:
+            app.view_functions['static'] = self.send_static_file
+
+    def negotiate(self, encodings):
+        """İstemcinin kabul ettiği en yüksek öncelikli kodlama; yoksa None"""
+        best, best_quality = None, 0
+        for encoding in encodings:
+            quality = request.accept_encodings[encoding]
+            if quality > best_quality:
+                best, best_quality = encoding, quality
+        return best
+
+    def level(self, encoding):
+        return self.brotli_quality if encoding == 'br' else self.gzip_level
+
+    def _compress_response(self, response):
+        if (not self.encodings or response.direct_passthrough or response.mimetype not in COMPRESSIBLE
+                or response.status_code < 200 or response.status_code in (204, 304)
+                or 'Content-Encoding' in response.headers):
+            return response
+        response.vary.add('Accept-Encoding')
+        encoding = self.negotiate(self.encodings)
+        if encoding is None:
+            return response
+
+        if response.is_streamed:
+            response.response = self._stream(response.iter_encoded(), encoding)
+            response.headers.pop('Content-Length', None)
+        else:
+            data = response.get_data()
+            if len(data) < self.min_size:
+                return response
+            compressed = compress(data, encoding, self.level(encoding))
+            if len(compressed) >= len(data):
+                return response
+            response.set_data(compressed)
+
+        response.headers['Content-Encoding'] = encoding
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+        return response
+
+    def _stream(self, chunks, encoding):
+        process, finish = _compressor(encoding, self.level(encoding))
+        try:
+            for chunk in chunks:
+                data = process(chunk)
+                if data:
+                    yield data
+            yield finish()
+        finally:
+            close = getattr(chunks, 'close', None)
+            if close is not None:
+                close()
+
+    def send_static_file(self, filename):
+        """Flask'ın statik ucu; güncel .br/.gz kopyası varsa ve istemci kabul ediyorsa onu gönderir"""
+        app = current_app
+        path = safe_join(app.static_folder, filename)
+        variants = []
+        if path is not None and filename.endswith(STATIC_EXTENSIONS):
+            try:
+                mtime = os.stat(path).st_mtime
+                for encoding in available_encodings():
+                    try:
+                        if os.stat(path + SUFFIXES[encoding]).st_mtime >= mtime:
+                            variants.append(encoding)
+                    except OSError:
+                        pass
+            except OSError:
+                pass
+        if not variants:
+            return app.send_static_file(filename)
+
+        encoding = self.negotiate(variants)
+        if encoding is None:
+            response = app.send_static_file(filename)
+        else:
+            response = send_from_directory(
+                app.static_folder, filename + SUFFIXES[encoding],
+                mimetype=mimetypes.guess_type(filename)[0] or 'application/octet-stream',
+                max_age=app.get_send_file_max_age(filename)
+            )
+            response.headers['Content-Encoding'] = encoding
+        response.vary.add('Accept-Encoding')
+        return response
+
+
+def precompress(directory, min_size=256):
+    """Dizindeki statik metin dosyalarının en yüksek seviyede .gz (ve .br) kopyalarını yazar.
+    Kopya kaynakla aynı mtime'ı alır; güncel kopyalar atlanır, kazanç yoksa kopya silinir.
+    (yazılan, atlanan, silinen) sayılarını döndürür."""
+    written = skipped = removed = 0
+    for root, _, names in os.walk(directory):
+        for name in names:
+            if not name.endswith(STATIC_EXTENSIONS):
+                continue
+            path = os.path.join(root, name)
+            stat = os.stat(path)
+            data = None
+            for encoding in available_encodings():
+                target = path + SUFFIXES[encoding]
+                try:
+                    if os.stat(target).st_mtime == stat.st_mtime:
+                        skipped += 1
+                        continue
+                except OSError:
+                    pass
+                if data is None:
+                    with open(path, 'rb') as f:
+                        data = f.read()
+                compressed = compress(data, encoding, 11 if encoding == 'br' else 9)
+                if len(data) < min_size or len(compressed) >= len(data):
+                    if os.path.exists(target):
+                        os.remove(target)
+                        removed += 1
+                    continue
+                fd, tmp = tempfile.mkstemp(dir=root, prefix='.tmp')
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(compressed)
+                os.chmod(tmp, stat.st_mode & 0o777)
+                os.utime(tmp, (stat.st_atime, stat.st_mtime))
+                os.replace(tmp, target)
+                written += 1
+    return written, skipped, removed
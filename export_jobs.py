@@ -0,0 +1,203 @@
+"""
+Arka planda Excel raporu üreten iş kuyruğu ve disk önbelleğinin temizliği.
+
+Rapor isteği bir iş kimliği ile hemen döner; dosya süreç içindeki bir
+thread havuzunda üretilir. İş kayıtları <dizin>/jobs/<kimlik>.json olarak
+diskte tutulur, böylece durum ve indirme istekleri hangi gunicorn
+worker'ına düşerse düşsün işi görür. Kimlik rapor anahtarı ve veri
+sürümünden türetildiğinden aynı rapor iki kez kuyruğa girmez.
+
+Kuyrukta/çalışıyor görünen ama sahibi süreç ölmüş ya da stale_after
+saniyedir bitmemiş iş bayat sayılır ve yeniden gönderildiğinde baştan
+çalıştırılır. Havuz ilk işte açılır (fork sonrası her worker kendi
+havuzunu kurar).
+"""
+
+import json
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+ACTIVE = ('queued', 'running')
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class ExportJobs:
+    def __init__(self, directory, workers=2, stale_after=900, logger=None):
+        self.directory = directory
+        self.workers = workers
+        self.stale_after = stale_after
+        self.logger = logger
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self._active = set()
+        self._lock = threading.Lock()
+        self._pool = None
+        self._pid = None
+
+    def _path(self, job_id):
+        return os.path.join(self.directory, 'jobs', f'{job_id}.json')
+
+    def get(self, job_id):
+        try:
+            with open(self._path(job_id)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _save(self, record):
+        record['updated_at'] = time.time()
+        directory = os.path.dirname(self._path(record['id']))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(suffix='.json', dir=directory)
+        with os.fdopen(fd, 'w') as f:
+            json.dump(record, f)
+        os.replace(tmp, self._path(record['id']))
+
+    def is_stale(self, record):
+        if record['status'] not in ACTIVE:
+            return False
+        if time.time() - record['updated_at'] > self.stale_after:
+            return True
+        if record['pid'] == os.getpid():
+            with self._lock:
+                return record['id'] not in self._active
+        return not _pid_alive(record['pid'])
+
+    def complete(self, job_id, user_id, path, **info):
+        """Hazır dosya için doğrudan 'done' kaydı yazar (kuyruğa girmeden)"""
+        record = {'id': job_id, 'user_id': user_id, 'status': 'done', 'pid': os.getpid(),
+                  'created_at': time.time(), 'file': path, 'size': os.path.getsize(path), 'error': None, **info}
+        self._save(record)
+        return record
+
+    def submit(self, job_id, user_id, run, **info):
+        """run() dosya yolunu döndürür ve havuzda çalışır; mevcut/aktif iş varsa o döner"""
+        record = self.get(job_id)
+        if record is not None and record['user_id'] == user_id:
+            if record['status'] in ACTIVE and not self.is_stale(record):
+                return record
+            if record['status'] == 'done' and os.path.exists(record['file']):
+                return record
+
+        record = {'id': job_id, 'user_id': user_id, 'status': 'queued', 'pid': os.getpid(),
+                  'created_at': time.time(), 'file': None, 'size': None, 'error': None, **info}
+        with self._lock:
+            self._active.add(job_id)
+            self.submitted += 1
+            pool = self._ensure_pool()
+        self._save(record)
+        pool.submit(self._run, record, run)
+        return record
+
+    def _ensure_pool(self):
+        # Fork sonrası üst süreçten gelen havuzun thread'leri bu süreçte çalışmaz
+        if self._pool is None or self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._active = set()
+            self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='export')
+        return self._pool
+
+    def _run(self, record, run):
+        record['status'] = 'running'
+        record['started_at'] = time.time()
+        self._save(record)
+        try:
+            path = run()
+        except Exception as e:
+            if self.logger:
+                self.logger.exception('Rapor işi başarısız: %s', record['id'])
+            record.update(status='failed', error=str(e))
+            with self._lock:
+                self.failed += 1
+        else:
+            record.update(status='done', file=path, size=os.path.getsize(path))
+            with self._lock:
+                self.completed += 1
+        finally:
+            record['finished_at'] = time.time()
+            self._save(record)
+            with self._lock:
+                self._active.discard(record['id'])
+
+    def close(self):
+        pool = self._pool if self._pid == os.getpid() else None
+        if pool is not None:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    def stats(self):
+        with self._lock:
+            active = len(self._active)
+        return {
+            'workers': self.workers,
+            'active': active,
+            'submitted': self.submitted,
+            'completed': self.completed,
+            'failed': self.failed
+        }
+
+
+def evict(directory, max_bytes, max_age):
+    """Önbellek dizininden max_age saniyeden eski dosyaları, ardından toplam boyut
+    max_bytes altına inene kadar en uzun süredir kullanılmayanları siler.
+    (silinen dosya sayısı, kalan toplam byte) döndürür."""
+    now = time.time()
+    files = []
+    removed = 0
+    for name in os.listdir(directory):
+        # tmp*.xlsx dosyaları henüz yazılmakta olan raporlardır
+        if not name.endswith('.xlsx') or name.startswith('tmp'):
+            continue
+        path = os.path.join(directory, name)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        if max_age and now - stat.st_mtime > max_age:
+            removed += _remove(path)
+        else:
+            files.append((stat.st_mtime, stat.st_size, path))
+
+    total = sum(size for _, size, _ in files)
+    if max_bytes:
+        for _, size, path in sorted(files):
+            if total <= max_bytes:
+                break
+            removed += _remove(path)
+            total -= size
+
+    # Dosyası silinmiş iş kayıtları da atılır
+    jobs_dir = os.path.join(directory, 'jobs')
+    if os.path.isdir(jobs_dir):
+        for name in os.listdir(jobs_dir):
+            path = os.path.join(jobs_dir, name)
+            try:
+                with open(path) as f:
+                    record = json.load(f)
+            except (OSError, ValueError):
+                continue
+            expired = max_age and now - record.get('updated_at', now) > max_age
+            if (record.get('status') == 'done' and not os.path.exists(record.get('file') or '')) or \
+                    (expired and record.get('status') not in ACTIVE):
+                _remove(path)
+    return removed, total
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+        return 1
+    except OSError:
+        return 0
@@ -0,0 +1,126 @@
+"""
+Filo ölçeğinde sensör simülatörü.
+
+Tüm robotların durumu sütun halinde array('d') dizilerinde tutulur ve her
+adımda (tick) bütün filo tek geçişte ilerletilir:
+
+  - Sıcaklık: robotun taban değerine ve hızına doğru ortalamaya dönen
+    rastgele yürüyüş (hareket eden robot ısınır)
+  - Nem: taban değer etrafında yavaş kayma + gürültü
+  - Hız: aktif robotlarda 0-5 m/s arasında rastgele yürüyüş, diğerlerinde 0
+  - Batarya: aktifken hıza bağlı boşalır, beklemede/bakımda şarj olur
+  - Durum: active ↔ idle geçişleri; batarya %10'un altına inen robot
+    bakıma (maintenance) alınır, %80'e şarj olunca beklemeye döner
+
+Aynı tohum (seed) ve başlangıç durumu her zaman aynı seriyi üretir.
+"""
+
+import math
+import random
+from array import array
+
+STATUSES = ('active', 'idle', 'maintenance')
+MAX_SPEED = 5.0
+CRUISE_SPEED = 2.5
+
+
+class FleetSimulator:
+    def __init__(self, robots, seed=None):
+        """robots: (id, user_id, status, battery, son sıcaklık, son nem, son hız) demetleri"""
+        self.rng = random.Random(seed)
+        rng = self.rng
+        self.ids = array('q')
+        self.user_ids = array('q')
+        self.status = []
+        self.battery = array('d')
+        self.base_temperature = array('d')
+        self.base_humidity = array('d')
+        self.temperature = array('d')
+        self.humidity = array('d')
+        self.speed = array('d')
+        for robot_id, user_id, status, battery, temperature, humidity, speed in robots:
+            self.ids.append(robot_id)
+            self.user_ids.append(user_id)
+            self.status.append(status if status in STATUSES else 'idle')
+            self.battery.append(float(battery if battery is not None else 100))
+            base_temperature = rng.uniform(20, 28)
+            base_humidity = rng.uniform(40, 60)
+            self.base_temperature.append(base_temperature)
+            self.base_humidity.append(base_humidity)
+            # Önceki son okumadan devam edilir ki seri kopmasın
+            self.temperature.append(temperature if temperature is not None else base_temperature)
+            self.humidity.append(humidity if humidity is not None else base_humidity)
+            self.speed.append(speed if speed is not None else 0.0)
+        self._written_battery = [int(round(b)) for b in self.battery]
+        self._written_status = list(self.status)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def step(self, timestamp, dt=1.0):
+        """Tüm filoyu dt saniye ilerletir; kullanıcı id -> INSERT satırları döndürür"""
+        rng = self.rng
+        n = len(self.ids)
+        scale = math.sqrt(dt)
+        gauss = rng.gauss
+        noise_t = [gauss(0, 0.2 * scale) for _ in range(n)]
+        noise_h = [gauss(0, 0.5 * scale) for _ in range(n)]
+        noise_s = [gauss(0, 0.4 * scale) for _ in range(n)]
+        draws = [rng.random() for _ in range(n)]
+        pull = min(1.0, 0.05 * dt)
+        drift = min(1.0, 0.02 * dt)
+
+        status, battery, speed = self.status, self.battery, self.speed
+        temperature, humidity = self.temperature, self.humidity
+        base_t, base_h = self.base_temperature, self.base_humidity
+
+        rows = {}
+        for i in range(n):
+            state = status[i]
+            if state == 'active':
+                s = speed[i] + min(1.0, 0.2 * dt) * (CRUISE_SPEED - speed[i]) + noise_s[i]
+                s = MAX_SPEED if s > MAX_SPEED else (0.0 if s < 0 else s)
+                b = battery[i] - (0.008 + 0.004 * s) * dt
+                if b < 10:
+                    state = 'maintenance'
+                elif draws[i] < 0.002 * dt:
+                    state = 'idle'
+            else:
+                s = 0.0
+                b = battery[i] + (0.1 if state == 'maintenance' else 0.05) * dt
+                if state == 'maintenance':
+                    if b >= 80:
+                        state = 'idle'
+                elif b > 30 and draws[i] < 0.01 * dt:
+                    state = 'active'
+            b = 100.0 if b > 100 else (0.0 if b < 0 else b)
+
+            t = temperature[i] + pull * (base_t[i] + 1.5 * s - temperature[i]) + noise_t[i]
+            h = humidity[i] + drift * (base_h[i] - humidity[i]) + noise_h[i]
+            h = 100.0 if h > 100 else (0.0 if h < 0 else h)
+
+            status[i], battery[i], speed[i], temperature[i], humidity[i] = state, b, s, t, h
+            user_rows = rows.get(self.user_ids[i])
+            if user_rows is None:
+                user_rows = rows[self.user_ids[i]] = []
+            user_rows.append({
+                'robot_id': self.ids[i],
+                'temperature': round(t, 1),
+                'humidity': round(h, 1),
+                'speed': round(s, 2),
+                'timestamp': timestamp
+            })
+        return rows
+
+    def robot_updates(self):
+        """Son çağrıdan beri bataryası (tam sayı) veya durumu değişen robotlar:
+        (robot id, kullanıcı id, durum, batarya, durum değişti mi)"""
+        updates = []
+        for i, robot_id in enumerate(self.ids):
+            battery = int(round(self.battery[i]))
+            status_changed = self.status[i] != self._written_status[i]
+            if status_changed or battery != self._written_battery[i]:
+                updates.append((robot_id, self.user_ids[i], self.status[i], battery, status_changed))
+                self._written_battery[i] = battery
+                self._written_status[i] = self.status[i]
+        return updates
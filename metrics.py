@@ -0,0 +1,247 @@
+"""
+İstek başına SQL ve gecikme ölçümleri.
+
+SQLAlchemy motor olayları (before/after_cursor_execute) ve Flask istek
+sinyalleri (request_started/request_finished) ile her istek için şunlar
+toplanır:
+
+  - SQL ifade sayısı, toplam veritabanı süresi ve en yavaş ifade
+  - Okunan ve etkilenen satır sayısı. Yazmalarda (ve PostgreSQL'de SELECT'lerde)
+    sürücünün rowcount değeri kullanılır; SQLite SELECT'lerde rowcount -1
+    olduğundan okunan satırlar RowCountingConnection imleçlerinde sayılır
+  - Yüklenen ORM nesnesi sayısı
+  - JSON serileştirme süresi ve yanıt boyutu
+
+Değerler uç (endpoint) bazında histogramlarda birikir ve Prometheus metin
+biçiminde sunulur. Ölçümler worker başınadır.
+"""
+
+import sqlite3
+import threading
+import time
+
+from flask import g, has_request_context, request, request_finished, request_started
+from flask.json.provider import DefaultJSONProvider
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+STATEMENT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 500)
+ROW_BUCKETS = (1, 10, 100, 1000, 10000, 100000)
+BYTE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 10485760)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(names, values):
+    if not names:
+        return ''
+    return '{' + ','.join(f'{n}="{_escape(v)}"' for n, v in zip(names, values)) + '}'
+
+
+class Counter:
+    def __init__(self, name, help_text, label_names):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.values = {}
+
+    def inc(self, labels, amount=1):
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} counter']
+        for labels, value in sorted(self.values.items()):
+            lines.append(f'{self.name}{_labels(self.label_names, labels)} {value}')
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, help_text, label_names, buckets):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.buckets = buckets
+        # etiketler -> [kova sayaçları..., toplam, adet]
+        self.values = {}
+
+    def observe(self, labels, value):
+        series = self.values.get(labels)
+        if series is None:
+            series = self.values[labels] = [0] * len(self.buckets) + [0.0, 0]
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                series[i] += 1
+        series[-2] += value
+        series[-1] += 1
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} histogram']
+        names = self.label_names + ('le',)
+        for labels, series in sorted(self.values.items()):
+            for bound, count in zip(self.buckets, series):
+                lines.append(f'{self.name}_bucket{_labels(names, labels + (bound,))} {count}')
+            lines.append(f'{self.name}_bucket{_labels(names, labels + ("+Inf",))} {series[-1]}')
+            lines.append(f'{self.name}_sum{_labels(self.label_names, labels)} {series[-2]}')
+            lines.append(f'{self.name}_count{_labels(self.label_names, labels)} {series[-1]}')
+        return lines
+
+
+class TimedJSONProvider(DefaultJSONProvider):
+    """jsonify sırasında harcanan süreyi isteğin ölçümlerine ekler"""
+
+    def response(self, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return super().response(*args, **kwargs)
+        finally:
+            if has_request_context() and 'request_metrics' in g:
+                g.request_metrics['serialize_time'] += time.perf_counter() - started
+
+
+def _add_fetched_rows(count):
+    if count and has_request_context() and 'request_metrics' in g:
+        g.request_metrics['rows'] += count
+
+
+class RowCountingCursor(sqlite3.Cursor):
+    """Getirilen satırları isteğin ölçümlerine ekleyen SQLite imleci"""
+
+    def fetchone(self):
+        row = super().fetchone()
+        if row is not None:
+            _add_fetched_rows(1)
+        return row
+
+    def fetchmany(self, size=None):
+        rows = super().fetchmany(self.arraysize if size is None else size)
+        _add_fetched_rows(len(rows))
+        return rows
+
+    def fetchall(self):
+        rows = super().fetchall()
+        _add_fetched_rows(len(rows))
+        return rows
+
+
+class RowCountingConnection(sqlite3.Connection):
+    """sqlite3.connect(factory=...) için; SQLAlchemy'nin açtığı imleçler satır sayar"""
+
+    def cursor(self, factory=RowCountingCursor):
+        return super().cursor(factory)
+
+
+class RequestMetrics:
+    def __init__(self, app=None, model_base=None):
+        self._lock = threading.Lock()
+        self.requests = Counter(
+            'robot_http_requests_total', 'HTTP istek sayısı', ('endpoint', 'method', 'status'))
+        self.latency = Histogram(
+            'robot_http_request_duration_seconds', 'İstek süresi', ('endpoint',), LATENCY_BUCKETS)
+        self.db_time = Histogram(
+            'robot_db_time_seconds', 'İstek başına toplam SQL süresi', ('endpoint',), LATENCY_BUCKETS)
+        self.statements = Histogram(
+            'robot_db_statements', 'İstek başına SQL ifade sayısı', ('endpoint',), STATEMENT_BUCKETS)
+        self.slowest = Histogram(
+            'robot_db_slowest_statement_seconds', 'İstekteki en yavaş SQL ifadesi', ('endpoint',), LATENCY_BUCKETS)
+        self.rows = Histogram(
+            'robot_db_rows', 'İstek başına okunan/etkilenen satır sayısı', ('endpoint',), ROW_BUCKETS)
+        self.orm_objects = Histogram(
+            'robot_orm_objects_loaded', 'İstek başına yüklenen ORM nesnesi', ('endpoint',), ROW_BUCKETS)
+        self.serialize_time = Histogram(
+            'robot_serialize_seconds', 'İstek başına JSON serileştirme süresi', ('endpoint',), LATENCY_BUCKETS)
+        self.response_bytes = Histogram(
+            'robot_response_bytes', 'Yanıt boyutu', ('endpoint',), BYTE_BUCKETS)
+        self.slow_request_ms = 0
+        self.logger = None
+        if app is not None:
+            self.init_app(app, model_base)
+
+    def init_app(self, app, model_base=None):
+        self.slow_request_ms = app.config.get('SLOW_REQUEST_MS', 0)
+        self.logger = app.logger
+        app.json = TimedJSONProvider(app)
+
+        request_started.connect(self._request_started, app)
+        request_finished.connect(self._request_finished, app)
+        # Motor ve model olayları süreç genelidir; birden fazla uygulama kurulsa da
+        # (create_app, migrate_database) her ifade bir kez sayılır
+        if not event.contains(Engine, 'before_cursor_execute', self._before_cursor_execute):
+            event.listen(Engine, 'before_cursor_execute', self._before_cursor_execute)
+            event.listen(Engine, 'after_cursor_execute', self._after_cursor_execute)
+        if model_base is not None and not event.contains(model_base, 'load', self._orm_load):
+            event.listen(model_base, 'load', self._orm_load, propagate=True)
+
+    # Flask sinyalleri
+    def _request_started(self, sender, **extra):
+        g.request_metrics = {
+            'started': time.perf_counter(),
+            'statements': 0,
+            'db_time': 0.0,
+            'slowest_time': 0.0,
+            'slowest_sql': None,
+            'rows': 0,
+            'orm_objects': 0,
+            'serialize_time': 0.0,
+        }
+
+    def _request_finished(self, sender, response, **extra):
+        data = g.pop('request_metrics', None)
+        if data is None:
+            return
+        duration = time.perf_counter() - data['started']
+        endpoint = (request.endpoint or 'unmatched',)
+        size = response.calculate_content_length()
+        if size is None:
+            size = int(response.headers.get('Content-Length', 0))
+
+        with self._lock:
+            self.requests.inc(endpoint + (request.method, str(response.status_code)))
+            self.latency.observe(endpoint, duration)
+            self.db_time.observe(endpoint, data['db_time'])
+            self.statements.observe(endpoint, data['statements'])
+            self.slowest.observe(endpoint, data['slowest_time'])
+            self.rows.observe(endpoint, data['rows'])
+            self.orm_objects.observe(endpoint, data['orm_objects'])
+            self.serialize_time.observe(endpoint, data['serialize_time'])
+            self.response_bytes.observe(endpoint, size)
+
+        if self.slow_request_ms and duration * 1000 >= self.slow_request_ms:
+            self.logger.warning(
+                'Yavaş istek: %s %s %.1f ms, %d SQL ifadesi (%.1f ms), en yavaş %.1f ms: %s',
+                request.method, request.path, duration * 1000, data['statements'],
+                data['db_time'] * 1000, data['slowest_time'] * 1000, data['slowest_sql']
+            )
+
+    # SQLAlchemy olayları
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('metrics_started', []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        started = conn.info['metrics_started'].pop()
+        if not has_request_context() or 'request_metrics' not in g:
+            return
+        elapsed = time.perf_counter() - started
+        data = g.request_metrics
+        data['statements'] += 1
+        data['db_time'] += elapsed
+        if elapsed > data['slowest_time']:
+            data['slowest_time'] = elapsed
+            data['slowest_sql'] = ' '.join(statement.split())
+        # SQLite'ta SELECT için -1; okunan satırlar RowCountingCursor'da sayılır
+        if cursor.rowcount and cursor.rowcount > 0:
+            data['rows'] += cursor.rowcount
+
+    def _orm_load(self, target, context):
+        if has_request_context() and 'request_metrics' in g:
+            g.request_metrics['orm_objects'] += 1
+
+    def render(self):
+        with self._lock:
+            lines = []
+            for metric in (self.requests, self.latency, self.db_time, self.statements, self.slowest,
+                           self.rows, self.orm_objects, self.serialize_time, self.response_bytes):
+                lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
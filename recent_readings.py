@@ -0,0 +1,177 @@
+"""
+Robot başına son okumaların bellek içi halka tamponu.
+
+Dashboard grafiği her açılışta aynı son N okumayı ister. Her robot için
+okumalar sabit boyutlu array('d') sütunlarında (zaman, sıcaklık, nem, hız)
+tutulur; robot başına bellek 4 × N × 8 byte ile sınırlıdır ve en fazla
+max_robots robot LRU ile saklanır.
+
+Her tampon robotun data_version değeriyle etiketlenir. Okuyan taraf
+güncel sürümü verir; sürüm tutmuyorsa (başka bir worker yazmış olabilir)
+ıska sayılır ve veri veritabanından yeniden yüklenir. Yazma yolları commit
+sonrası apply() ile tamponu ve sürümünü birlikte ilerletir.
+"""
+
+import heapq
+import threading
+from array import array
+from bisect import insort
+from collections import OrderedDict
+from datetime import datetime
+
+EPOCH = datetime(1970, 1, 1)
+
+
+def _seconds(timestamp):
+    return (timestamp - EPOCH).total_seconds()
+
+
+def _clock(seconds):
+    seconds = int(seconds) % 86400
+    return f'{seconds // 3600:02d}:{seconds // 60 % 60:02d}:{seconds % 60:02d}'
+
+
+class RobotBuffer:
+    """Zamana göre sıralı, sabit kapasiteli halka tampon"""
+    __slots__ = ('version', 'start', 'size', 'timestamps', 'temperature', 'humidity', 'speed')
+
+    def __init__(self, capacity, version):
+        self.version = version
+        self.start = 0
+        self.size = 0
+        self.timestamps = array('d', bytes(8 * capacity))
+        self.temperature = array('d', bytes(8 * capacity))
+        self.humidity = array('d', bytes(8 * capacity))
+        self.speed = array('d', bytes(8 * capacity))
+
+    @property
+    def capacity(self):
+        return len(self.timestamps)
+
+    def newest(self):
+        return self.timestamps[(self.start + self.size - 1) % self.capacity] if self.size else None
+
+    def append(self, ts, temperature, humidity, speed):
+        capacity = self.capacity
+        if self.size < capacity:
+            index = (self.start + self.size) % capacity
+            self.size += 1
+        else:
+            # Dolu: en eski kaydın üzerine yazılır
+            index = self.start
+            self.start = (self.start + 1) % capacity
+        self.timestamps[index] = ts
+        self.temperature[index] = temperature
+        self.humidity[index] = humidity
+        self.speed[index] = speed
+
+    def items(self):
+        """Eskiden yeniye (zaman, sıcaklık, nem, hız) demetleri"""
+        capacity = self.capacity
+        for offset in range(self.size):
+            index = (self.start + offset) % capacity
+            yield self.timestamps[index], self.temperature[index], self.humidity[index], self.speed[index]
+
+    def extend(self, items):
+        """Eskiden yeniye sıralı olmayan okumaları da doğru yere yerleştirir"""
+        newest = self.newest()
+        if newest is None or items[0][0] >= newest:
+            for item in items:
+                self.append(*item)
+            return
+        # Geç gelen okuma: mevcut kayıtlarla birleştirilip son N tanesi tutulur
+        merged = list(self.items())
+        for item in items:
+            insort(merged, item, key=lambda entry: entry[0])
+        self.start = self.size = 0
+        for item in merged[-self.capacity:]:
+            self.append(*item)
+
+    def to_list(self):
+        """Yeniden eskiye, /api/sensors yanıt biçiminde"""
+        capacity = self.capacity
+        result = []
+        for offset in range(self.size - 1, -1, -1):
+            index = (self.start + offset) % capacity
+            result.append({
+                'temperature': self.temperature[index],
+                'humidity': self.humidity[index],
+                'speed': self.speed[index],
+                'timestamp': _clock(self.timestamps[index])
+            })
+        return result
+
+
+class RecentReadings:
+    def __init__(self, capacity=50, max_robots=10000):
+        self.capacity = capacity
+        self.max_robots = max_robots
+        self.hits = 0
+        self.misses = 0
+        self._buffers = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _items(self, rows):
+        """Satırların en yeni N tanesi, eskiden yeniye"""
+        newest = heapq.nlargest(
+            self.capacity,
+            ((_seconds(row['timestamp']), row['temperature'], row['humidity'], row['speed']) for row in rows),
+            key=lambda item: item[0]
+        )
+        newest.reverse()
+        return newest
+
+    def get(self, robot_id, version):
+        """Tampon verilen sürümdeyse okumaları döndürür, değilse None"""
+        with self._lock:
+            buffer = self._buffers.get(robot_id)
+            if buffer is None or buffer.version != version:
+                self.misses += 1
+                return None
+            self._buffers.move_to_end(robot_id)
+            self.hits += 1
+            return buffer.to_list()
+
+    def load(self, robot_id, version, rows):
+        """Veritabanından okunan son okumalarla tamponu doldurur ve yanıt listesini döndürür"""
+        buffer = RobotBuffer(self.capacity, version)
+        items = self._items(rows)
+        if items:
+            buffer.extend(items)
+        if self.max_robots:
+            with self._lock:
+                self._buffers[robot_id] = buffer
+                self._buffers.move_to_end(robot_id)
+                while len(self._buffers) > self.max_robots:
+                    self._buffers.popitem(last=False)
+        return buffer.to_list()
+
+    def apply(self, bumps, rows_by_robot):
+        """Commit edilmiş yazmaları uygular: bumps robot -> sürüm artışı, rows_by_robot robot -> okumalar"""
+        with self._lock:
+            for robot_id, increment in bumps.items():
+                buffer = self._buffers.get(robot_id)
+                if buffer is None:
+                    continue
+                rows = rows_by_robot.get(robot_id)
+                if rows:
+                    buffer.extend(self._items(rows))
+                buffer.version += increment
+
+    def discard(self, robot_id):
+        with self._lock:
+            self._buffers.pop(robot_id, None)
+
+    def stats(self):
+        with self._lock:
+            robots = len(self._buffers)
+        lookups = self.hits + self.misses
+        return {
+            'robots': robots,
+            'capacity': self.capacity,
+            'max_robots': self.max_robots,
+            'bytes': robots * self.capacity * 4 * 8,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': round(self.hits / lookups, 3) if lookups else None
+        }
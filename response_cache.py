@@ -0,0 +1,198 @@
+"""
+Rapor ve istatistik yanıtları için önbellek.
+
+İki arka uç vardır:
+  MemoryCache  Worker içi LRU + TTL (varsayılan)
+  FileCache    Diskte paylaşılan önbellek; birden fazla gunicorn worker'ı aynı
+               girişleri görür ve geçersiz kılmalar tüm worker'lara yansır
+
+Anahtarlar 'u<kullanıcı id>:' önekiyle başlar; bir kullanıcının verisi
+değiştiğinde delete_prefix ile yalnızca onun girişleri silinir.
+"""
+
+import hashlib
+import os
+import pickle
+import threading
+import time
+from collections import OrderedDict
+
+
+class CacheStats:
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def as_dict(self):
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'invalidations': self.invalidations,
+        }
+
+
+class NullCache:
+    """Önbellek kapalıyken kullanılır; her okuma ıska sayılır"""
+    name = 'none'
+
+    def __init__(self):
+        self.stats = CacheStats()
+
+    def get(self, key):
+        self.stats.misses += 1
+        return None
+
+    def set(self, key, value):
+        pass
+
+    def delete_prefix(self, prefix):
+        pass
+
+    def __len__(self):
+        return 0
+
+
+class MemoryCache:
+    """Worker içi LRU + TTL önbellek"""
+    name = 'memory'
+
+    def __init__(self, max_entries=1024, ttl=300):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.stats = CacheStats()
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats.misses += 1
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                self.stats.evictions += 1
+                self.stats.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats.hits += 1
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats.evictions += 1
+
+    def delete_prefix(self, prefix):
+        with self._lock:
+            for key in [k for k in self._entries if k.startswith(prefix)]:
+                del self._entries[key]
+                self.stats.invalidations += 1
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class FileCache:
+    """Dizin tabanlı paylaşılan önbellek (worker'lar arası)"""
+    name = 'file'
+
+    def __init__(self, directory, max_entries=1024, ttl=300):
+        self.directory = directory
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.stats = CacheStats()
+        self._writes = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        # Önek dosya adında açık tutulur ki delete_prefix dizini taramakla yetinsin
+        prefix, _, rest = key.partition(':')
+        digest = hashlib.sha1(rest.encode()).hexdigest()
+        return os.path.join(self.directory, f'{prefix}-{digest}.cache')
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            if os.path.getmtime(path) + self.ttl < time.time():
+                os.remove(path)
+                self.stats.evictions += 1
+                self.stats.misses += 1
+                return None
+            with open(path, 'rb') as f:
+                stored_key, value = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            self.stats.misses += 1
+            return None
+        if stored_key != key:
+            self.stats.misses += 1
+            return None
+        self.stats.hits += 1
+        return value
+
+    def set(self, key, value):
+        path = self._path(key)
+        tmp = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(tmp, 'wb') as f:
+            pickle.dump((key, value), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+
+        # Sınır kontrolü her yazmada değil, belirli aralıklarla yapılır
+        self._writes += 1
+        if self._writes % 32 == 0:
+            self._evict()
+
+    def _evict(self):
+        entries = []
+        now = time.time()
+        for name in os.listdir(self.directory):
+            if not name.endswith('.cache'):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                mtime = os.path.getmtime(path)
+                if mtime + self.ttl < now:
+                    os.remove(path)
+                    self.stats.evictions += 1
+                else:
+                    entries.append((mtime, path))
+            except OSError:
+                continue
+        entries.sort()
+        for _, path in entries[:max(0, len(entries) - self.max_entries)]:
+            try:
+                os.remove(path)
+                self.stats.evictions += 1
+            except OSError:
+                pass
+
+    def delete_prefix(self, prefix):
+        file_prefix = prefix.rstrip(':') + '-'
+        for name in os.listdir(self.directory):
+            if name.startswith(file_prefix) and name.endswith('.cache'):
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                    self.stats.invalidations += 1
+                except OSError:
+                    pass
+
+    def __len__(self):
+        return sum(1 for name in os.listdir(self.directory) if name.endswith('.cache'))
+
+
+def create_cache(backend, directory=None, max_entries=1024, ttl=300):
+    """Yapılandırmadaki arka uç adına göre önbellek nesnesi oluşturur"""
+    if backend == 'memory':
+        return MemoryCache(max_entries=max_entries, ttl=ttl)
+    if backend == 'file':
+        return FileCache(directory, max_entries=max_entries, ttl=ttl)
+    if backend == 'none':
+        return NullCache()
+    raise ValueError(f'Bilinmeyen önbellek arka ucu: {backend}')
@@ -0,0 +1,63 @@
+"""
+Sabit aralıklı histogram skeçleri.
+
+Her değer floor(değer / genişlik) ile bir kovaya (bin) düşer; skeç
+{bin: adet} sözlüğüdür. Aynı genişlikteki skeçler kova kova toplanarak
+birleştirilir (veritabanında SUM(count) ... GROUP BY bin). Yüzdelikler
+birleştirilmiş skeçten kova içinde doğrusal varsayımla hesaplanır; hata en
+fazla bir kova genişliği kadardır.
+"""
+
+import math
+
+PERCENTILES = (50, 95, 99)
+
+
+def bin_index(value, width):
+    return math.floor(value / width)
+
+
+def merge(*sketches):
+    merged = {}
+    for sketch in sketches:
+        for index, count in sketch.items():
+            merged[index] = merged.get(index, 0) + count
+    return merged
+
+
+def quantile(sketch, width, q):
+    """q (0-1) yüzdeliğindeki değer; boş skeçte None"""
+    total = sum(sketch.values())
+    if not total:
+        return None
+    target = q * total
+    cumulative = 0
+    for index in sorted(sketch):
+        count = sketch[index]
+        if count and cumulative + count >= target:
+            return round((index + (target - cumulative) / count) * width, 3)
+        cumulative += count
+    return round((max(sketch) + 1) * width, 3)
+
+
+def percentiles(sketch, width, points=PERCENTILES):
+    values = {f'p{p}': quantile(sketch, width, p / 100) for p in points}
+    values['count'] = sum(sketch.values())
+    return values
+
+
+def distribution(sketch, width, max_bins=20):
+    """Dağılımı en fazla max_bins aralığa indirerek [{from, to, count}] döndürür"""
+    if not sketch:
+        return []
+    low, high = min(sketch), max(sketch)
+    step = max(1, math.ceil((high - low + 1) / max_bins))
+    counts = {}
+    for index, count in sketch.items():
+        group = low + (index - low) // step * step
+        counts[group] = counts.get(group, 0) + count
+    return [{
+        'from': round(group * width, 3),
+        'to': round((group + step) * width, 3),
+        'count': counts.get(group, 0)
+    } for group in range(low, high + 1, step)]
@@ -6,6 +6,20 @@ const API = {
         return await response.json();
     },
 
+    // Robot listesinin tek sayfası: {items, total, next_cursor}
+    async getRobotPage(params) {
+        const query = new URLSearchParams();
+        Object.entries(params).forEach(([key, value]) => {
+            if (value !== null && value !== undefined && value !== '') query.set(key, value);
+        });
+        const response = await fetch(`/api/robots/page?${query}`);
+        const result = await response.json();
+        if (!response.ok) {
+            throw new Error(result.error || 'Robot listesi alınamadı');
+        }
+        return result;
+    },
+
     async addRobot(name, model) {
         const response = await fetch('/api/robots', {
             method: 'POST',
@@ -82,21 +96,36 @@ const API = {
         return await response.json();
     },
 
-    // YENİ: Tek robot raporu indirme (blob olarak)
-    async downloadRobotReport(robotId) {
-        const response = await fetch(`/api/reports/robot/${robotId}/export`);
-        if (!response.ok) {
+    // Raporu arka planda hazırlatır, hazır olunca indirir (blob olarak)
+    async exportReport(options) {
+        let response = await fetch('/api/exports', {
+            method: 'POST',
+            headers: {'Content-Type': 'application/json'},
+            body: JSON.stringify(options)
+        });
+        let job = await response.json();
+        while (response.ok && (job.status === 'queued' || job.status === 'running')) {
+            await new Promise(resolve => setTimeout(resolve, 1000));
+            response = await fetch(job.status_url);
+            job = await response.json();
+        }
+        if (!response.ok || job.status !== 'done') {
+            throw new Error(job.error || 'Rapor oluşturulamadı');
+        }
+        const download = await fetch(job.download_url);
+        if (!download.ok) {
             throw new Error('Rapor indirilemedi');
         }
-        return await response.blob();
+        return await download.blob();
+    },
+
+    // YENİ: Tek robot raporu indirme (blob olarak)
+    async downloadRobotReport(robotId) {
+        return await this.exportReport({type: 'robot', robot_id: robotId});
     },
 
     // YENİ: Tüm robotlar raporu indirme
     async downloadAllRobotsReport() {
-        const response = await fetch('/api/reports/export-all');
-        if (!response.ok) {
-            throw new Error('Rapor indirilemedi');
-        }
-        return await response.blob();
+        return await this.exportReport({type: 'all'});
     }
 };
\ No newline at end of file
@@ -1,5 +1,20 @@
 // Ana Uygulama
 const App = {
+    // Yalnızca görünen sayfadaki robotlar; filo sunucuda sayfalanır
+    robots: [],
+    stats: null,
+    pageSize: 24,
+    filters: {q: '', status: '', model: '', sort: 'id'},
+    cursors: [null],    // her sayfanın başlangıç imleci (geri dönmek için)
+    pageIndex: 0,
+    nextCursor: null,
+    total: 0,
+    loadSeq: 0,
+    reloadTimer: null,
+    statsTimer: null,
+    pollTimer: null,
+    eventSource: null,
+
     // Uygulama başlangıcı
     async init() {
         console.log('🤖 Robot Fleet Monitoring başlatılıyor...');
@@ -14,8 +29,8 @@ const App = {
         // İlk yükleme
         await this.loadRobots();
         
-        // Otomatik yenileme (10 saniye)
-        setInterval(() => this.loadRobots(), 10000);
+        // Canlı güncellemeler (SSE); bağlantı koparsa 10 saniyelik yenilemeye düşülür
+        this.connectEvents();
         
         console.log('✅ Uygulama başarıyla başlatıldı!');
     },
@@ -66,14 +81,192 @@ const App = {
                 document.getElementById('bulkFileInput').value = '';
             });
         }
+
+        // Arama ve filtreler (yazarken her tuşta istek atılmaz)
+        let typingTimer = null;
+        [['robotSearch', 'q'], ['robotModelFilter', 'model']].forEach(([id, key]) => {
+            const input = document.getElementById(id);
+            if (input) {
+                input.addEventListener('input', () => {
+                    clearTimeout(typingTimer);
+                    typingTimer = setTimeout(() => this.setFilter(key, input.value.trim()), 300);
+                });
+            }
+        });
+        [['robotStatusFilter', 'status'], ['robotSort', 'sort']].forEach(([id, key]) => {
+            const select = document.getElementById(id);
+            if (select) {
+                select.addEventListener('change', () => this.setFilter(key, select.value));
+            }
+        });
+
+        const prevPageBtn = document.getElementById('prevPageBtn');
+        if (prevPageBtn) {
+            prevPageBtn.addEventListener('click', () => this.prevPage());
+        }
+        const nextPageBtn = document.getElementById('nextPageBtn');
+        if (nextPageBtn) {
+            nextPageBtn.addEventListener('click', () => this.nextPage());
+        }
+    },
+
+    // Filtre değişince ilk sayfaya dön
+    setFilter(key, value) {
+        if (this.filters[key] === value) return;
+        this.filters[key] = value;
+        this.cursors = [null];
+        this.pageIndex = 0;
+        this.loadRobots();
     },
 
-    // Robotları yükle
+    nextPage() {
+        if (!this.nextCursor) return;
+        this.cursors[this.pageIndex + 1] = this.nextCursor;
+        this.pageIndex++;
+        this.loadRobots();
+    },
+
+    prevPage() {
+        if (this.pageIndex === 0) return;
+        this.pageIndex--;
+        this.loadRobots();
+    },
+
+    hasFilters() {
+        return Boolean(this.filters.q || this.filters.status || this.filters.model);
+    },
+
+    // Sunucu olay kanalına bağlan
+    connectEvents() {
+        if (!window.EventSource) {
+            this.startPolling();
+            return;
+        }
+
+        this.eventSource = new EventSource('/api/events');
+
+        this.eventSource.onopen = () => {
+            // Kopukluk sırasında kaçan değişiklikler için bir kez tam yenile
+            if (this.pollTimer) {
+                this.stopPolling();
+                this.loadRobots();
+            }
+        };
+
+        this.eventSource.onerror = () => {
+            // Tarayıcı yeniden bağlanmayı dener; bu sürede yenilemeye devam et
+            this.startPolling();
+        };
+
+        ['robot_created', 'robot_updated', 'robot_deleted', 'readings'].forEach(type => {
+            this.eventSource.addEventListener(type, (e) => {
+                this.applyEvent(type, JSON.parse(e.data));
+            });
+        });
+    },
+
+    startPolling() {
+        if (!this.pollTimer) {
+            this.pollTimer = setInterval(() => this.loadRobots(), 10000);
+        }
+    },
+
+    stopPolling() {
+        clearInterval(this.pollTimer);
+        this.pollTimer = null;
+    },
+
+    // Sunucudan gelen değişikliği görünen sayfaya uygula
+    applyEvent(type, data) {
+        if (type === 'readings') {
+            // Kartlar okuma göstermez; sayfadaki robotun verisi güncellenir, yeniden çizilmez
+            const robot = this.robots.find(r => r.id === data.robot_id);
+            if (robot) {
+                robot.sensor_count = (robot.sensor_count || 0) + data.count;
+                robot.last_reading = data.last_reading;
+                robot.latest = data.latest;
+            }
+            return;
+        }
+        if (type === 'robot_updated') {
+            const robot = this.robots.find(r => r.id === data.id);
+            const changed = key => key in data && (!robot || robot[key] !== data[key]);
+            // Durum filtre sonucunu ve özet kartlarını, ad/model arama ve sıralamayı değiştirebilir;
+            // batarya gibi diğer alanlar yerinde uygulanır (simülasyon her çağrıda batarya yayınlar)
+            const reload = changed('status')
+                || (changed('name') && Boolean(this.filters.q || this.filters.sort.includes('name')))
+                || (changed('model') && Boolean(this.filters.model));
+            if (robot) {
+                const batteryOnly = Object.keys(data).every(key => key === 'id' || key === 'battery');
+                Object.assign(robot, data);
+                if (batteryOnly) {
+                    UI.updateRobotBattery(robot);
+                } else {
+                    UI.renderRobots(this.robots, this.hasFilters());
+                }
+            }
+            if (reload) {
+                this.scheduleReload();
+            } else if ('battery' in data) {
+                this.scheduleStatsRefresh();
+            }
+            return;
+        }
+        // Ekleme/silme sayfa sınırlarını, toplamları ve filtre sonucunu değiştirir
+        this.scheduleReload();
+    },
+
+    // Art arda gelen olaylar tek yenilemede birleştirilir
+    scheduleReload() {
+        clearTimeout(this.reloadTimer);
+        this.reloadTimer = setTimeout(() => this.loadRobots(), 500);
+    },
+
+    // Ortalama batarya kartı için yalnızca /api/stats, en fazla 10 saniyede bir
+    scheduleStatsRefresh() {
+        if (this.statsTimer) return;
+        this.statsTimer = setTimeout(async () => {
+            this.statsTimer = null;
+            try {
+                this.stats = await API.getStats();
+                UI.updateStats(this.stats);
+            } catch (error) {
+                console.error('İstatistikler yüklenirken hata:', error);
+            }
+        }, 10000);
+    },
+
+    render() {
+        if (this.stats) UI.updateStats(this.stats);
+        UI.renderRobots(this.robots, this.hasFilters());
+        UI.renderPager(this.pageIndex * this.pageSize, this.robots.length, this.total,
+                       this.pageIndex > 0, Boolean(this.nextCursor));
+    },
+
+    // Görünen sayfayı ve filo özetini yükle
     async loadRobots() {
+        const seq = ++this.loadSeq;
         try {
-            const robots = await API.getRobots();
-            UI.updateStats(robots);
-            UI.renderRobots(robots);
+            const [page, stats] = await Promise.all([
+                API.getRobotPage({
+                    ...this.filters,
+                    cursor: this.cursors[this.pageIndex],
+                    limit: this.pageSize
+                }),
+                API.getStats()
+            ]);
+            // Bu arada başka bir sayfa/filtre istendiyse eski yanıt atılır
+            if (seq !== this.loadSeq) return;
+            // Sayfadaki robotların hepsi silindiyse bir önceki sayfaya dön
+            if (page.items.length === 0 && this.pageIndex > 0) {
+                this.pageIndex--;
+                return this.loadRobots();
+            }
+            this.robots = page.items;
+            this.total = page.total;
+            this.nextCursor = page.next_cursor;
+            this.stats = stats;
+            this.render();
         } catch (error) {
             console.error('Robotlar yüklenirken hata:', error);
             UI.showToast('Robotlar yüklenirken hata oluştu!', 'error');
@@ -3,24 +3,46 @@ const UI = {
     currentRobotId: null,
     currentChart: null,
 
-    // İstatistikleri güncelle
-    updateStats(robots) {
-        document.getElementById('totalRobots').textContent = robots.length;
-        document.getElementById('activeRobots').textContent = 
-            robots.filter(r => r.status === 'active').length;
-        document.getElementById('idleRobots').textContent = 
-            robots.filter(r => r.status === 'idle').length;
-        
-        const avgBattery = robots.length > 0 
-            ? robots.reduce((sum, r) => sum + r.battery, 0) / robots.length 
-            : 0;
-        document.getElementById('avgBattery').textContent = Math.round(avgBattery) + '%';
+    // İstatistikleri güncelle (tüm filo; /api/stats)
+    updateStats(stats) {
+        document.getElementById('totalRobots').textContent = stats.total_robots;
+        document.getElementById('activeRobots').textContent = stats.active_robots;
+        document.getElementById('idleRobots').textContent = stats.idle_robots;
+        document.getElementById('avgBattery').textContent = Math.round(stats.avg_battery) + '%';
+    },
+
+    // Sayfa bilgisi ve önceki/sonraki butonları
+    renderPager(offset, count, total, hasPrev, hasNext) {
+        document.getElementById('robotPageInfo').textContent =
+            count > 0 ? `${offset + 1}-${offset + count} / ${total} robot` : '';
+        document.getElementById('prevPageBtn').disabled = !hasPrev;
+        document.getElementById('nextPageBtn').disabled = !hasNext;
+    },
+
+    // Tek kartın bataryasını sayfayı yeniden çizmeden güncelle
+    updateRobotBattery(robot) {
+        const card = document.querySelector(`#robotsContainer [data-robot-id="${robot.id}"]`);
+        if (!card) return;
+        card.querySelector('.battery-label').textContent = `Batarya: ${robot.battery}%`;
+        card.querySelector('.battery-fill').style.width = `${robot.battery}%`;
     },
 
-    // Robot kartlarını render et
-    renderRobots(robots) {
+    // Görünen sayfadaki robot kartlarını render et
+    renderRobots(robots, filtered = false) {
         const container = document.getElementById('robotsContainer');
         
+        if (robots.length === 0 && filtered) {
+            container.innerHTML = `
+                <div class="col-12">
+                    <div class="alert alert-secondary text-center">
+                        <i class="bi bi-search me-2"></i>
+                        Aramaya uyan robot bulunamadı.
+                    </div>
+                </div>
+            `;
+            return;
+        }
+
         if (robots.length === 0) {
             container.innerHTML = `
                 <div class="col-12">
@@ -34,7 +56,7 @@ const UI = {
         }
 
         container.innerHTML = robots.map(robot => `
-            <div class="col-md-4">
+            <div class="col-md-4" data-robot-id="${robot.id}">
                 <div class="robot-card card">
                     <div class="card-body">
                         <div class="d-flex justify-content-between align-items-start mb-3">
@@ -51,7 +73,7 @@ const UI = {
                             </button>
                         </div>
                         <div class="mb-2">
-                            <small class="text-muted">Batarya: ${robot.battery}%</small>
+                            <small class="text-muted battery-label">Batarya: ${robot.battery}%</small>
                             <div class="battery-bar">
                                 <div class="battery-fill" style="width: ${robot.battery}%"></div>
                             </div>
@@ -320,13 +342,7 @@ const UI = {
         try {
             UI.showToast('Rapor hazırlanıyor...', 'info');
             
-            const response = await fetch(`/api/reports/robot/${robotId}/export`);
-            
-            if (!response.ok) {
-                throw new Error('Rapor oluşturulamadı');
-            }
-            
-            const blob = await response.blob();
+            const blob = await API.downloadRobotReport(robotId);
             const url = window.URL.createObjectURL(blob);
             const a = document.createElement('a');
             a.href = url;
@@ -348,13 +364,7 @@ const UI = {
         try {
             UI.showToast('Toplu rapor hazırlanıyor...', 'info');
             
-            const response = await fetch('/api/reports/export-all');
-            
-            if (!response.ok) {
-                throw new Error('Rapor oluşturulamadı');
-            }
-            
-            const blob = await response.blob();
+            const blob = await API.downloadAllRobotsReport();
             const url = window.URL.createObjectURL(blob);
             const a = document.createElement('a');
             a.href = url;
@@ -0,0 +1,153 @@
+"""
+Sensör yazmaları için write-behind kuyruğu.
+
+İstekler okumaları sınırlı bir kuyruğa bırakır; arka plandaki tek yazıcı
+thread kuyruktaki işleri toplayıp tek transaction'da yazar (group commit).
+Bir parti batch_readings okumaya ulaşınca ya da ilk işten bu yana
+interval saniye geçince yazılır.
+
+Kuyrukta max_readings okuma varken gelen iş QueueFull ile reddedilir
+(uç 429 döndürür). Kuyruk boşken gelen iş, sınırdan büyük olsa bile kabul
+edilir ki büyük yüklemeler hiçbir zaman kalıcı olarak reddedilmesin.
+
+Yazıcı thread ilk işte başlatılır (gunicorn --preload ile fork sonrası
+her worker kendi thread'ini açar); close() kuyruğu boşaltıp durdurur.
+"""
+
+import os
+import threading
+import time
+from collections import deque
+
+
+class QueueFull(Exception):
+    pass
+
+
+class WriteJob:
+    """Kuyruktaki tek istek; wait() yazıldığında (veya hata olduğunda) döner"""
+    __slots__ = ('user_id', 'rows', 'battery', 'done', 'error')
+
+    def __init__(self, user_id, rows, battery=None):
+        self.user_id = user_id
+        self.rows = rows
+        self.battery = battery or {}
+        self.done = threading.Event()
+        self.error = None
+
+    @property
+    def size(self):
+        return max(1, len(self.rows))
+
+    def wait(self, timeout=None):
+        return self.done.wait(timeout)
+
+
+class WriteBehindQueue:
+    def __init__(self, app, flush, max_readings=100000, batch_readings=5000, interval=0.02):
+        self.app = app
+        self.flush = flush
+        self.max_readings = max_readings
+        self.batch_readings = batch_readings
+        self.interval = interval
+        self.queued = 0
+        self.committed = 0
+        self.rejected = 0
+        self.failed = 0
+        self.batches = 0
+        self._jobs = deque()
+        self._pending = 0
+        self._cond = threading.Condition()
+        self._thread = None
+        self._pid = None
+        self._closed = False
+
+    def submit(self, user_id, rows, battery=None):
+        job = WriteJob(user_id, rows, battery)
+        with self._cond:
+            if self._closed or (self._pending and self._pending + job.size > self.max_readings):
+                self.rejected += 1
+                raise QueueFull()
+            self._jobs.append(job)
+            self._pending += job.size
+            self.queued += 1
+            self._ensure_thread()
+            self._cond.notify_all()
+        return job
+
+    def _ensure_thread(self):
+        # Fork sonrası üst süreçten gelen thread nesnesi bu süreçte çalışmaz
+        if self._thread is None or self._pid != os.getpid() or not self._thread.is_alive():
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name='write-behind', daemon=True)
+            self._thread.start()
+
+    def _next_batch(self):
+        with self._cond:
+            while not self._jobs and not self._closed:
+                self._cond.wait()
+            if not self._jobs:
+                return None
+            # Partinin dolması için en fazla interval kadar beklenir
+            deadline = time.monotonic() + self.interval
+            while self._pending < self.batch_readings and not self._closed:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+
+            batch = []
+            size = 0
+            while self._jobs and (not batch or size + self._jobs[0].size <= self.batch_readings):
+                job = self._jobs.popleft()
+                batch.append(job)
+                size += job.size
+            self._pending -= size
+            return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+            self._write(batch)
+
+    def _write(self, batch):
+        try:
+            with self.app.app_context():
+                self.flush(batch)
+        except Exception as e:
+            self.app.logger.exception('Yazma kuyruğu: %d işlik parti yazılamadı', len(batch))
+            self.failed += len(batch)
+            for job in batch:
+                job.error = str(e)
+        else:
+            self.committed += len(batch)
+            self.batches += 1
+        finally:
+            for job in batch:
+                job.done.set()
+
+    def close(self, timeout=30):
+        """Yeni işleri reddeder, kuyruktakileri yazar ve yazıcıyı durdurur"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+            thread = self._thread if self._pid == os.getpid() else None
+        if thread is not None:
+            thread.join(timeout)
+
+    def stats(self):
+        with self._cond:
+            depth = len(self._jobs)
+            pending = self._pending
+        return {
+            'depth': depth,
+            'pending_readings': pending,
+            'max_readings': self.max_readings,
+            'queued': self.queued,
+            'committed': self.committed,
+            'rejected': self.rejected,
+            'failed': self.failed,
+            'batches': self.batches
+        }